@@ -10,12 +10,13 @@ src_dir = current_dir / "src"
 if str(src_dir) not in sys.path:
     sys.path.insert(0, str(src_dir))
 
-# Use shared theme and loaders
+# Use shared theme and loaders; import them as src.shared like the pages (and src.warmup) do,
+# so every page shares one set of cached artifacts
 try:
-    from shared import set_page, inject_theme, load_artifacts, load_training_data
+    from src.shared import set_page, inject_theme, load_artifacts, load_training_data, span
 except ImportError:
     # Fallback when run as a script
-    from src.shared import set_page, inject_theme, load_artifacts, load_training_data
+    from shared import set_page, inject_theme, load_artifacts, load_training_data, span
 
 set_page("🧬 Disease Predictor", "🧬")
 inject_theme()
@@ -23,12 +24,14 @@ inject_theme()
 st.markdown("<h1 class='neon'>🧬 Disease Prediction</h1>", unsafe_allow_html=True)
 st.caption("Toggle symptoms, predict likely diseases, and explore analytics.")
 
-artifacts = load_artifacts()
+with span('home.load_artifacts'):
+    artifacts = load_artifacts()
 model = artifacts["model"]
 features = artifacts["features"]
 label_enc = artifacts["label_encoder"]
 
-X_train, y_train, X_valid, y_valid, X_all = load_training_data(features)
+with span('home.load_training_data'):
+    X_train, y_train, X_valid, y_valid, X_all = load_training_data(features)
 
 col1, col2, col3, col4 = st.columns(4)
 with col1:
@@ -6,15 +6,25 @@ from pathlib import Path
 import time
 import json
 try:
-    from src.shared import set_page, inject_theme, load_artifacts, ui_toggle
+    from src.shared import set_page, inject_theme, load_artifacts, load_inference_pool, load_pattern_index, load_prediction_cache, load_prediction_log, load_serving_model, load_similar_case_index, span, ui_toggle
+    from src.prediction_cache import cached_predict_one
+    from src.pattern_index import lookup_disease
 except Exception:
-    from shared import set_page, inject_theme, load_artifacts, ui_toggle
+    from shared import set_page, inject_theme, load_artifacts, load_inference_pool, load_pattern_index, load_prediction_cache, load_prediction_log, load_serving_model, load_similar_case_index, span, ui_toggle
+    from prediction_cache import cached_predict_one
+    from pattern_index import lookup_disease
 
 set_page("🔮 Predictor • Disease Predictor", "🧬")
 inject_theme()
 
-artifacts = load_artifacts()
+with span('predictor.load_artifacts'):
+    artifacts = load_artifacts()
 model = artifacts["model"]
+serving_model = load_serving_model() or model
+# Scoring goes to the worker-process pool when INFERENCE_WORKERS is set
+fast_model = load_inference_pool() or serving_model
+# A multi-model vote carries its own version so its cached predictions never mix with the champion's
+model_version = getattr(serving_model, "model_version", None) or artifacts.get("model_version", "")
 features = artifacts["features"]
 label_enc = artifacts["label_encoder"]
 
@@ -100,7 +110,8 @@ else:
             }
         ))
         fig_live.update_layout(paper_bgcolor='rgba(0,0,0,0)', height=280)
-        st.plotly_chart(fig_live, width='stretch')
+        with span('predictor.render_plotly'):
+            st.plotly_chart(fig_live, width='stretch')
 
     predict_clicked = st.button("🚀 Run AI Prediction", type="primary")
 
@@ -113,23 +124,16 @@ else:
                 progress_bar.progress(i)
                 status_text.text("Running model..." if i > 40 else "Preparing input...")
 
-            input_df = pd.DataFrame([input_data])
-            input_df = input_df[[f for f in features if f in input_df.columns]]
-
-            pred = model.predict(input_df)
-            prob_pct = None
-            try:
-                p = model.predict_proba(input_df)[0]
-                idx = int(np.argmax(p))
-                prob_pct = float(p[idx]) * 100
-                pred_encoded = int(pred[0]) if not hasattr(model, 'classes_') else model.classes_[idx]
-            except Exception:
-                pred_encoded = int(pred[0])
-
-            try:
-                disease = label_enc.inverse_transform([pred_encoded])[0] if label_enc is not None else str(pred_encoded)
-            except Exception:
-                disease = str(pred_encoded)
+            prediction_cache = load_prediction_cache()
+            # Symptom patterns seen in training are answered from the index; others go to the model
+            with span('predictor.predict'):
+                indexed = lookup_disease(load_pattern_index(features, artifacts.get("model_version", "")), input_data, label_enc)
+                if indexed is not None:
+                    disease, prob_pct = indexed
+                else:
+                    disease, prob_pct, _ = cached_predict_one(
+                        prediction_cache, fast_model, input_data, features, label_enc, model_version
+                    )
 
             progress_bar.empty(); status_text.empty()
             prob_text = f"{prob_pct:.2f}%" if prob_pct is not None else "N/A"
@@ -186,7 +190,8 @@ else:
                     }
                 ))
                 fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', height=300)
-                st.plotly_chart(fig, width='stretch')
+                with span('predictor.render_plotly'):
+                    st.plotly_chart(fig, width='stretch')
 
             with right:
                 try:
@@ -206,34 +211,50 @@ else:
                 except Exception:
                     pass
 
+            # Most similar past cases (Hamming distance over the packed training records)
+            try:
+                case_index = load_similar_case_index(features)
+                if case_index is not None:
+                    selected_symptoms = [f for f, v in input_data.items() if v == 1]
+                    with span('predictor.similar_cases'):
+                        case_idx, case_dist = case_index.query(selected_symptoms, k=5)
+                        cases = case_index.describe(case_idx, case_dist, selected_symptoms, label_enc)
+                    st.markdown("<h3 class='section'>🩺 Similar Past Cases</h3>", unsafe_allow_html=True)
+                    st.dataframe(cases.rename(columns={
+                        'record': 'Record', 'diagnosis': 'Diagnosis', 'hamming_distance': 'Distance',
+                        'shared_symptoms': 'Shared Symptoms', 'symptoms': 'Symptoms',
+                    }), width='stretch', hide_index=True)
+            except Exception as e:
+                st.warning(f"Could not load similar cases: {e}")
+
             try:
-                out = Path(__file__).resolve().parents[1] / 'predictions.csv'
+                prediction_log = load_prediction_log(str(Path(__file__).resolve().parents[1] / 'predictions.db'))
                 selected_symptoms = [f for f, v in input_data.items() if v == 1]
-                row = pd.DataFrame([
-                    {
-                        'timestamp': pd.Timestamp.utcnow().isoformat(),
+                with span('predictor.log_append'):
+                    prediction_log.append({
+                        'timestamp': pd.Timestamp.now(tz='UTC'),
                         'predicted_disease': disease,
                         'confidence_percent': prob_pct if prob_pct is not None else np.nan,
                         'num_symptoms': len(selected_symptoms),
                         'selected_symptoms': '; '.join(selected_symptoms),
-                    }
-                ])
-                if out.exists():
-                    prev = pd.read_csv(out)
-                    pd.concat([prev, row], ignore_index=True).to_csv(out, index=False, encoding='utf-8')
-                else:
-                    row.to_csv(out, index=False, encoding='utf-8')
-                st.success("✅ Prediction saved to predictions.csv")
+                    })
+                st.success("✅ Prediction saved to the prediction log")
             except Exception as e:
+                prediction_log = None
                 st.warning(f"Could not save prediction: {e}")
 
             # Recent predictions summary
             try:
-                out = Path(__file__).resolve().parents[1] / 'predictions.csv'
-                if out.exists():
-                    recent = pd.read_csv(out).tail(5)
+                if prediction_log is not None:
+                    with span('predictor.recent_predictions'):
+                        recent = prediction_log.recent(5)
                     st.markdown("<h3 class='section'>Recent Predictions</h3>", unsafe_allow_html=True)
                     st.dataframe(recent, width='stretch')
+                cache_stats = prediction_cache.stats()
+                st.caption(
+                    f"⚡ Prediction cache: {cache_stats['hits']} hits • {cache_stats['misses']} misses • "
+                    f"{cache_stats['size']}/{cache_stats['maxsize']} entries"
+                )
             except Exception:
                 pass
         except Exception as e:
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Precomputed aggregates behind the Analytics page.
+
+One pass over the training data produces everything the page draws: class counts,
+symptom frequencies, the disease x symptom conditional-mean matrix and the
+correlation matrix. The result is stored as models/analytics_summary.pkl together
+with a fingerprint of the source data, so widget changes only slice small frames.
+
+    python -m src.analytics_summary        # rebuild models/analytics_summary.pkl
+"""
+
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+try:
+    from .data_cache import file_sha256
+    from .correlation import gram_correlation
+except ImportError:
+    from data_cache import file_sha256
+    from correlation import gram_correlation
+
+SUMMARY_FILENAME = 'analytics_summary.pkl'
+FORMAT_VERSION = 1
+SOURCE_FILES = [
+    Path('data') / 'processed' / 'X_train.csv',
+    Path('data') / 'processed' / 'X_valid.csv',
+    Path('data') / 'processed' / 'y_train.csv',
+    Path('data') / 'processed' / 'y_valid.csv',
+    Path('data') / 'processed' / 'label_encoder.pkl',
+]
+
+
+def data_fingerprint(base_dir, features: list[str] | None) -> str:
+    """Hash of the processed data files and the feature list the summary was built for"""
+    h = hashlib.sha256(f'v{FORMAT_VERSION}'.encode())
+    for rel in SOURCE_FILES:
+        path = Path(base_dir) / rel
+        h.update(str(rel).encode())
+        h.update(file_sha256(path).encode() if path.exists() else b'missing')
+    h.update(json.dumps(list(features or [])).encode())
+    return h.hexdigest()
+
+
+def build_analytics_summary(X_all: pd.DataFrame, y_decoded: pd.Series | None) -> dict:
+    """Aggregate `X_all` (and its decoded labels) into the frames the Analytics page renders"""
+    numeric_cols = X_all.select_dtypes(include=[np.number]).columns
+    X = X_all[numeric_cols].to_numpy(dtype=np.float64)
+    n = len(X)
+    col_means = X.mean(axis=0) if n else np.zeros(X.shape[1])
+    summary = {
+        'format_version': FORMAT_VERSION,
+        'n_records': int(n),
+        'columns': list(numeric_cols),
+        'column_means': pd.Series(col_means, index=numeric_cols),
+        'avg_value': float(col_means.mean()) if len(col_means) else 0.0,
+        'correlation': gram_correlation(X_all[numeric_cols]),
+        'class_counts': pd.Series(dtype=np.int64),
+        'diseases': [],
+        'most_common_disease': 'N/A',
+        'disease_symptom_means': pd.DataFrame(columns=numeric_cols),
+    }
+    if y_decoded is None or len(y_decoded) != n:
+        return summary
+
+    labels = pd.Series(np.asarray(y_decoded))
+    codes, diseases = pd.factorize(labels)  # diseases in order of first appearance
+    onehot = np.zeros((n, len(diseases)))
+    onehot[np.arange(n), codes] = 1.0
+    class_n = onehot.sum(axis=0)
+    class_sums = onehot.T @ X
+    summary.update(
+        class_counts=labels.value_counts(),
+        diseases=list(diseases),
+        most_common_disease=labels.mode().iloc[0] if n else 'N/A',
+        disease_symptom_means=pd.DataFrame(
+            class_sums / np.maximum(class_n, 1)[:, None], index=list(diseases), columns=numeric_cols
+        ),
+    )
+    return summary
+
+
+def save_summary(summary: dict, path, fingerprint: str):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    joblib.dump({**summary, 'fingerprint': fingerprint, 'built_at': time.time()}, tmp)
+    tmp.replace(path)
+
+
+def load_summary(path, fingerprint: str | None = None) -> dict | None:
+    """Stored summary, or None when missing, unreadable or built from different data"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        summary = joblib.load(path)
+    except Exception:
+        return None
+    if summary.get('format_version') != FORMAT_VERSION:
+        return None
+    if fingerprint is not None and summary.get('fingerprint') != fingerprint:
+        return None
+    return summary
+
+
+def main(argv=None):
+    """Rebuild models/analytics_summary.pkl from data/processed"""
+    try:
+        from .shared import load_artifacts, load_training_data, decode_labels
+    except ImportError:
+        from shared import load_artifacts, load_training_data, decode_labels
+
+    base_dir = Path.cwd()
+    artifacts = load_artifacts()
+    features = artifacts["features"]
+    _, y_train, _, y_valid, X_all = load_training_data(features)
+    if not isinstance(X_all, pd.DataFrame):
+        print("❌ Training data not found under data/processed/")
+        sys.exit(1)
+    y_all = pd.concat([y_train, y_valid], ignore_index=True) if y_train is not None and y_valid is not None else None
+    start = time.perf_counter()
+    summary = build_analytics_summary(X_all, decode_labels(y_all, artifacts["label_encoder"]))
+    out = base_dir / 'models' / SUMMARY_FILENAME
+    save_summary(summary, out, data_fingerprint(base_dir, features))
+    print(f"✅ Built analytics summary for {summary['n_records']:,} records in {time.perf_counter() - start:.2f}s → {out}")
+
+
+if __name__ == "__main__":
+    main()
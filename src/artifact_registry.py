@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Artifact manifest for the serving models.
+
+models/manifest.json records where the model, the feature list and the label
+encoder live, their SHA-256, size, serialization format and the library versions
+they were written with. load_artifacts resolves this one file instead of probing a
+dozen candidate paths, loads the artifacts concurrently and takes the model version
+from the recorded hash instead of re-hashing the pickle on every start.
+
+    python -m src.artifact_registry build                      # champion_model.pkl, selected_features.pkl, label_encoder.pkl
+    python -m src.artifact_registry build --model models/model_catboost.pkl
+    python -m src.artifact_registry verify
+    python -m src.artifact_registry benchmark --repeats 5      # process start → ready model
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+try:
+    from .data_cache import file_sha256
+    from .inference import model_features
+except ImportError:
+    from data_cache import file_sha256
+    from inference import model_features
+
+MANIFEST_FILENAME = 'manifest.json'
+FORMAT_VERSION = 1
+DEFAULT_PATHS = {
+    'model': Path('models') / 'champion_model.pkl',
+    'features': Path('models') / 'selected_features.pkl',
+    'label_encoder': Path('data') / 'processed' / 'label_encoder.pkl',
+}
+# Libraries whose version decides whether a pickle loads faithfully; the model's own library is added at build time
+TRACKED_LIBRARIES = ('scikit-learn', 'numpy', 'pandas', 'joblib')
+MODEL_LIBRARIES = {'sklearn': 'scikit-learn', 'xgboost': 'xgboost', 'lightgbm': 'lightgbm', 'catboost': 'catboost'}
+
+
+def library_versions(names=TRACKED_LIBRARIES) -> dict:
+    versions = {'python': platform.python_version()}
+    for name in names:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            continue
+    return versions
+
+
+def _format(path: Path) -> str:
+    return 'csv' if path.suffix == '.csv' else 'joblib'
+
+
+def _entry(base_dir: Path, path: Path) -> dict:
+    full = path if path.is_absolute() else base_dir / path
+    return {
+        'path': full.resolve().relative_to(base_dir.resolve()).as_posix(),
+        'sha256': file_sha256(full),
+        'size': full.stat().st_size,
+        'format': _format(full),
+    }
+
+
+def _read_features(path: Path, fmt: str):
+    if fmt == 'csv':
+        df = pd.read_csv(path)
+        return df.iloc[:, 0].tolist() if df.shape[1] == 1 else df.columns.tolist()
+    return list(joblib.load(path))
+
+
+# ---------- Build ----------
+
+def build_manifest(base_dir, model_path=None, features_path=None, label_encoder_path=None) -> dict:
+    """Describe the artifacts under `base_dir`; without a features file the model's own feature names are recorded"""
+    base_dir = Path(base_dir)
+    model_path = Path(model_path or DEFAULT_PATHS['model'])
+    features_path = Path(features_path or DEFAULT_PATHS['features'])
+    label_encoder_path = Path(label_encoder_path or DEFAULT_PATHS['label_encoder'])
+
+    model = joblib.load(base_dir / model_path)
+    library = MODEL_LIBRARIES.get(type(model).__module__.split('.')[0], 'scikit-learn')
+    artifacts = {'model': {**_entry(base_dir, model_path), 'class': type(model).__name__}}
+    if (base_dir / features_path).exists():
+        artifacts['features'] = _entry(base_dir, features_path)
+        n_features = len(_read_features(base_dir / features_path, artifacts['features']['format']))
+    else:
+        names = model_features(model)
+        if not names:
+            raise ValueError(f"{features_path} is missing and the model does not record its feature names")
+        artifacts['features'] = {'format': 'inline', 'names': list(names)}
+        n_features = len(names)
+    artifacts['features']['count'] = n_features
+    if (base_dir / label_encoder_path).exists():
+        artifacts['label_encoder'] = _entry(base_dir, label_encoder_path)
+    return {
+        'format_version': FORMAT_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'libraries': library_versions(TRACKED_LIBRARIES + (library,) if library not in TRACKED_LIBRARIES else TRACKED_LIBRARIES),
+        'artifacts': artifacts,
+    }
+
+
+def write_manifest(manifest: dict, path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    tmp.replace(path)
+    return path
+
+
+# ---------- Load ----------
+
+def read_manifest(path) -> dict:
+    manifest = json.loads(Path(path).read_text(encoding='utf-8'))
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported manifest format {manifest.get('format_version')!r}")
+    return manifest
+
+
+def version_mismatches(manifest: dict) -> dict:
+    """{library: (recorded, installed)} for tracked libraries whose version changed since the build"""
+    recorded = manifest.get('libraries', {})
+    installed = library_versions([name for name in recorded if name != 'python'])
+    return {
+        name: (recorded[name], installed.get(name))
+        for name in recorded
+        if name != 'python' and recorded[name] != installed.get(name)
+    }
+
+
+def _load_entry(base_dir: Path, name: str, entry: dict, verify: bool):
+    if entry.get('format') == 'inline':
+        return list(entry['names'])
+    path = base_dir / entry['path']
+    size = path.stat().st_size
+    if size != entry['size']:
+        raise ValueError(f"{name}: {path} is {size} bytes, manifest records {entry['size']}")
+    if verify and file_sha256(path) != entry['sha256']:
+        raise ValueError(f"{name}: {path} does not match the manifest hash")
+    if name == 'features':
+        return _read_features(path, entry['format'])
+    return joblib.load(path)
+
+
+def load_registered(manifest_path, parallel: bool = True, verify: bool = False) -> dict:
+    """Load every artifact listed in the manifest; returns the load_artifacts fields plus the manifest"""
+    manifest_path = Path(manifest_path)
+    base_dir = manifest_path.resolve().parent.parent
+    manifest = read_manifest(manifest_path)
+    entries = manifest['artifacts']
+    if parallel:
+        with ThreadPoolExecutor(max_workers=len(entries)) as pool:
+            futures = {name: pool.submit(_load_entry, base_dir, name, e, verify) for name, e in entries.items()}
+            loaded = {name: f.result() for name, f in futures.items()}
+    else:
+        loaded = {name: _load_entry(base_dir, name, e, verify) for name, e in entries.items()}
+    return {
+        'model': loaded.get('model'),
+        'features': loaded.get('features') or [],
+        'label_encoder': loaded.get('label_encoder'),
+        'model_version': entries['model']['sha256'][:16],
+        'manifest': manifest,
+        'manifest_path': str(manifest_path),
+    }
+
+
+# ---------- Cold-start benchmark ----------
+
+_COLD_START_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import numpy as np
+import pandas as pd
+from src import shared
+from src.artifact_registry import MANIFEST_FILENAME, load_registered
+from src.inference import model_features
+t_import = time.perf_counter()
+mode = sys.argv[1]
+if mode == 'probe':
+    loaded = shared.probe_artifacts()
+else:
+    loaded = load_registered(f'models/{MANIFEST_FILENAME}', parallel=(mode == 'manifest'))
+t_load = time.perf_counter()
+model = loaded['model']
+# Without selected_features.pkl the probe finds no feature list; the model's recorded names stand in,
+# and the row is a named frame as the app passes it
+features = list(loaded['features']) or model_features(model)
+if features:
+    model.predict_proba(pd.DataFrame(np.zeros((1, len(features))), columns=features))
+else:
+    model.predict_proba(np.zeros((1, model.n_features_in_)))
+t_ready = time.perf_counter()
+print(json.dumps({'import_s': t_import - t0, 'load_s': t_load - t_import, 'first_predict_s': t_ready - t_load}))
+"""
+
+
+def benchmark_cold_start(base_dir, repeats: int = 3, modes=('probe', 'manifest-serial', 'manifest')) -> pd.DataFrame:
+    """Fresh-interpreter time from process start to a model that has answered one predict_proba"""
+    base_dir = Path(base_dir).resolve()
+    repo_root = Path(__file__).resolve().parent.parent
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join([str(repo_root), os.environ.get('PYTHONPATH', '')])}
+    rows = []
+    for mode in modes:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            out = subprocess.run(
+                [sys.executable, '-c', _COLD_START_SCRIPT, mode],
+                cwd=base_dir, env=env, capture_output=True, text=True, check=True,
+            )
+            total = time.perf_counter() - start
+            rows.append({'mode': mode, 'process_to_ready_s': total, **json.loads(out.stdout.strip().splitlines()[-1])})
+    return pd.DataFrame(rows).groupby('mode', sort=False).median()
+
+
+def main(argv=None):
+    """Build or verify models/manifest.json, or benchmark cold starts"""
+    parser = argparse.ArgumentParser(description="Artifact manifest for the serving models")
+    parser.add_argument('--base-dir', default='.', help="Directory containing models/ and data/processed/")
+    sub = parser.add_subparsers(dest='command', required=True)
+    b = sub.add_parser('build', help="Write models/manifest.json")
+    b.add_argument('--model', default=None, help=f"Model pickle (default: {DEFAULT_PATHS['model'].as_posix()})")
+    b.add_argument('--features', default=None, help=f"Feature list .pkl/.csv (default: {DEFAULT_PATHS['features'].as_posix()})")
+    b.add_argument('--label-encoder', default=None, help=f"Label encoder (default: {DEFAULT_PATHS['label_encoder'].as_posix()})")
+    sub.add_parser('verify', help="Check sizes, hashes and library versions against the manifest")
+    bench = sub.add_parser('benchmark', help="Cold-start time: path probing vs manifest (serial and parallel)")
+    bench.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    base_dir = Path(args.base_dir)
+    path = base_dir / 'models' / MANIFEST_FILENAME
+    if args.command == 'build':
+        try:
+            manifest = build_manifest(base_dir, args.model, args.features, args.label_encoder)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        write_manifest(manifest, path)
+        for name, entry in manifest['artifacts'].items():
+            where = entry['path'] if 'path' in entry else f"{entry['count']} names inline"
+            print(f"✅ {name:<14} {where} {entry.get('sha256', '')[:16]}")
+        print(f"📄 Manifest written to {path}")
+        return
+
+    if not path.exists():
+        print(f"❌ {path} not found; run `python -m src.artifact_registry build` first")
+        sys.exit(1)
+    if args.command == 'verify':
+        try:
+            loaded = load_registered(path, verify=True)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ {len(loaded['manifest']['artifacts'])} artifacts match the manifest (model version {loaded['model_version']})")
+        for name, (recorded, installed) in version_mismatches(loaded['manifest']).items():
+            print(f"⚠️ {name} {recorded} at build time, {installed or 'not installed'} now")
+        return
+
+    try:
+        print(benchmark_cold_start(base_dir, repeats=args.repeats).round(3).to_string())
+    except subprocess.CalledProcessError as e:
+        lines = (e.stderr or '').strip().splitlines()
+        print(f"❌ Cold-start run failed: {lines[-1] if lines else e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
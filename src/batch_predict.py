@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Headless batch scoring for the champion model.
+
+Reads a symptom CSV of any size in chunks, scores each chunk with one
+predict_proba call and streams the decoded predictions to an output CSV.
+
+    python -m src.batch_predict data/raw/Testing.csv -o scored.csv --chunksize 50000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+try:
+    from .data_cache import file_sha256
+    from .shared import load_artifacts
+    from .inference import align_features, predict_batch, model_features
+    from .pattern_index import load_index, predict_with_index
+except ImportError:
+    from data_cache import file_sha256
+    from shared import load_artifacts
+    from inference import align_features, predict_batch, model_features
+    from pattern_index import load_index, predict_with_index
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def score_frame(model, features: list[str], label_encoder, chunk: pd.DataFrame, keep_columns: list[str] | None = None,
+                pattern_index=None) -> pd.DataFrame:
+    """Score one chunk and return the output rows for it"""
+    X = align_features(chunk, features, exclude=keep_columns)
+    out = chunk[keep_columns].reset_index(drop=True) if keep_columns else pd.DataFrame(index=range(len(chunk)))
+    if pattern_index is not None:
+        # Patterns seen in training are answered from the index; the model only sees the rest
+        diseases, confidence, from_index = predict_with_index(pattern_index, model, X, label_encoder)
+        out['predicted_disease'] = diseases
+        out['confidence_percent'] = confidence.round(4)
+        out['source'] = pd.Series(from_index).map({True: 'index', False: 'model'})
+        return out
+    _, _, diseases, confidence = predict_batch(model, X, label_encoder)
+    out['predicted_disease'] = diseases
+    out['confidence_percent'] = confidence.round(4)
+    return out
+
+
+def run_batch(input_path, output_path, model, features: list[str], label_encoder=None,
+              chunksize: int = DEFAULT_CHUNKSIZE, keep_columns: list[str] | None = None, pattern_index=None) -> dict:
+    """Stream `input_path` through the model chunk by chunk; returns row count and timings"""
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    chunks = 0
+    start = time.perf_counter()
+    for chunk in pd.read_csv(input_path, chunksize=chunksize):
+        chunk = chunk.loc[:, ~chunk.columns.str.contains('^Unnamed')]
+        scored = score_frame(model, features, label_encoder, chunk, keep_columns, pattern_index)
+        scored.to_csv(output_path, mode='w' if chunks == 0 else 'a', header=chunks == 0, index=False, encoding='utf-8')
+        rows += len(scored)
+        chunks += 1
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'chunks': chunks,
+        'seconds': elapsed,
+        'rows_per_second': rows / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Score a symptom CSV with the champion model")
+    parser.add_argument('input', help="CSV with one 0/1 column per symptom")
+    parser.add_argument('-o', '--output', default='batch_predictions.csv', help="Where to write the scored rows")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows read and scored per chunk")
+    parser.add_argument('--model', default=None, help="Score with this model pickle instead of models/champion_model.pkl")
+    parser.add_argument('--keep-columns', nargs='*', default=None, help="Input columns copied to the output (e.g. an id)")
+    parser.add_argument('--pattern-index', default=None, help="Answer exact training patterns from this index (see src.pattern_index)")
+    args = parser.parse_args(argv)
+
+    artifacts = load_artifacts()
+    model = joblib.load(args.model) if args.model else artifacts["model"]
+    features = artifacts["features"] or model_features(model)
+    if model is None or not features:
+        print("❌ Model or features are missing. Ensure artifacts exist in models/ and data/processed/ folders.")
+        sys.exit(1)
+
+    pattern_index = load_index(args.pattern_index) if args.pattern_index else None
+    model_version = file_sha256(args.model)[:16] if args.model else artifacts["model_version"]
+    if pattern_index is not None and not pattern_index.matches(features, model_version):
+        print("⚠️ Pattern index was built for a different feature list or model version; scoring every row with the model")
+        pattern_index = None
+
+    stats = run_batch(args.input, args.output, model, features, artifacts["label_encoder"],
+                      chunksize=args.chunksize, keep_columns=args.keep_columns, pattern_index=pattern_index)
+    print(f"✅ Scored {stats['rows']:,} rows in {stats['chunks']} chunks "
+          f"({stats['seconds']:.2f}s, {stats['rows_per_second']:,.0f} rows/s) → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Two-tier cascade: a cheap screening model answers the clear cases, the champion the rest.
+
+Most Predictor inputs are textbook symptom sets that any model gets right, yet
+each one pays for the full champion. The cascade scores every row with a screen —
+Bernoulli naive Bayes or L1 logistic regression on the same feature list, a few
+microseconds per row as one matrix product — and keeps its answer when the screen is
+confident enough; only the remaining rows are escalated to the champion.
+
+The screen's probabilities are not trusted as they are: naive Bayes rounds most of
+them to exactly 1.0. Its confidence is the log-probability margin between its top
+two classes (joint log-likelihoods for naive Bayes, which do not saturate), and the
+threshold on that margin is calibrated: the lowest margin at which the accepted rows
+still agree with the champion at least `target_agreement` of the time. The complete symptom sets of the validation split are agreed on by
+nearly every model, so calibration also uses copies with symptoms randomly dropped
+(src/distill.py), which look like the partial sets users enter. The screen, its threshold,
+the version of the champion it was calibrated against and the validation figures are
+stored in models/cascade_screen.pkl; SERVING_CASCADE=1 makes the Predictor wrap its
+serving model in the cascade, as long as that model is still the same champion.
+
+    python -m src.cascade build                                      # L1 logistic screen, 99.9% agreement
+    python -m src.cascade build --screen naive_bayes --target-agreement 0.995
+    python -m src.cascade report --traffic data/raw/Testing.csv      # escalation rate, latency, agreement
+    python -m src.cascade report --traffic predictions.db
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+try:
+    from .data_cache import file_sha256
+    from .inference import TARGET_COLUMN, align_features, decode_predictions, feature_row, model_features, model_input
+except ImportError:
+    from data_cache import file_sha256
+    from inference import TARGET_COLUMN, align_features, decode_predictions, feature_row, model_features, model_input
+
+CASCADE_FILENAME = 'cascade_screen.pkl'
+TARGET_AGREEMENT = 0.999
+# Symptom-dropped copies of the validation split added to the calibration set
+CALIBRATION_COPIES = 1
+SEED = 42
+
+
+def make_screen(kind: str):
+    if kind == 'naive_bayes':
+        from sklearn.naive_bayes import BernoulliNB
+        return BernoulliNB(alpha=0.01)
+    if kind == 'logistic':
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(penalty='l1', solver='liblinear', C=1.0, max_iter=1000, random_state=SEED)
+    raise ValueError(f"Unknown screen {kind!r} (expected naive_bayes or logistic)")
+
+
+def linear_screen(screen):
+    """(W, b, binarize, kind) with screen scores = X @ W + b, or None for screens without that form"""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.naive_bayes import BernoulliNB
+    if isinstance(screen, BernoulliNB):
+        log_p, log_q = screen.feature_log_prob_, np.log1p(-np.exp(screen.feature_log_prob_))
+        return (log_p - log_q).T, screen.class_log_prior_ + log_q.sum(axis=1), screen.binarize, 'joint'
+    if isinstance(screen, LogisticRegression) and screen.coef_.shape[0] == len(screen.classes_) and \
+            getattr(screen, 'multi_class', 'auto') != 'multinomial' and screen.solver == 'liblinear':
+        return screen.coef_.T, screen.intercept_, None, 'ovr'
+    return None
+
+
+def screen_margin(screen, X, linear=None) -> tuple[np.ndarray, np.ndarray]:
+    """(probabilities, top-1 minus top-2 log-probability) of the screen for each row"""
+    if linear is not None:
+        W, b, binarize, kind = linear
+        X = np.asarray(X, dtype=np.float64)
+        scores = (X > binarize if binarize is not None else X) @ W + b
+        if kind == 'joint':
+            log_p = scores - scores.max(axis=1, keepdims=True)
+            proba = np.exp(log_p)
+            proba /= proba.sum(axis=1, keepdims=True)
+        else:
+            # liblinear one-vs-rest: per-class sigmoids, normalized
+            proba = 1.0 / (1.0 + np.exp(-scores))
+            proba /= proba.sum(axis=1, keepdims=True)
+            log_p = np.log(np.clip(proba, 1e-300, 1.0))
+    else:
+        proba = np.asarray(screen.predict_proba(X))
+        if hasattr(screen, 'predict_joint_log_proba'):
+            log_p = np.asarray(screen.predict_joint_log_proba(X))
+        else:
+            log_p = np.log(np.clip(proba, 1e-300, 1.0))
+    if log_p.shape[1] == 1:
+        return proba, np.full(len(proba), np.inf)
+    top2 = np.partition(log_p, -2, axis=1)[:, -2:]
+    return proba, top2[:, 1] - top2[:, 0]
+
+
+def calibrate_threshold(confidence: np.ndarray, screen_pred: np.ndarray, champion_pred: np.ndarray,
+                        target: float = TARGET_AGREEMENT) -> float:
+    """Lowest margin whose accepted rows (margin ≥ it) agree with the champion ≥ `target`; inf if none"""
+    order = np.argsort(-confidence, kind='stable')
+    conf, agree = confidence[order], (screen_pred == champion_pred)[order].astype(np.float64)
+    rate = np.cumsum(agree) / np.arange(1, len(agree) + 1)
+    # Rows with equal confidence are accepted together, so only the last of each tie is a valid cut
+    last_of_tie = np.append(conf[1:] != conf[:-1], True)
+    ok = np.flatnonzero(last_of_tie & (rate >= target))
+    return float(conf[ok[-1]]) if len(ok) else float('inf')
+
+
+class CascadeModel:
+    accepts_arrays = True
+
+    def __init__(self, screen, champion, features: list[str], threshold: float, version: str = ''):
+        self.screen = screen
+        self.champion = champion
+        self.feature_names_ = list(features)
+        self.n_features_in_ = len(self.feature_names_)
+        self.threshold = float(threshold)
+        self.classes_ = np.asarray(champion.classes_)
+        self._screen_index = np.searchsorted(self.classes_, np.asarray(screen.classes_))
+        # Naive Bayes and liblinear logistic screens are one matrix product; no DataFrame, no sklearn checks
+        self._linear = linear_screen(screen)
+        self.model_version = hashlib.sha256(f"cascade:{version}:{self.threshold!r}".encode()).hexdigest()[:16]
+        self.screened = 0
+        self.escalated = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _rows(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            X = align_features(X, self.feature_names_)
+        X = np.asarray(X, dtype=np.float64)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def route(self, X):
+        """(probabilities on the champion's classes, mask of rows escalated to the champion)"""
+        X = self._rows(X)
+        screen_input = X if self._linear is not None else model_input(self.screen, X, self.feature_names_)
+        screen_proba, margin = screen_margin(self.screen, screen_input, self._linear)
+        escalate = margin < self.threshold
+        proba = np.zeros((len(X), len(self.classes_)))
+        proba[np.ix_(~escalate, self._screen_index)] = screen_proba[~escalate]
+        if escalate.any():
+            proba[escalate] = np.asarray(self.champion.predict_proba(
+                model_input(self.champion, X[escalate], self.feature_names_)))
+        with self._lock:
+            self.screened += int((~escalate).sum())
+            self.escalated += int(escalate.sum())
+        return proba, escalate
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.route(X)[0]
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def escalation_rate(self) -> float:
+        total = self.screened + self.escalated
+        return self.escalated / total if total else 0.0
+
+
+def build_screen(kind: str, champion, features: list[str], X_train, y_train, X_valid,
+                 target: float = TARGET_AGREEMENT, copies: int = CALIBRATION_COPIES, champion_version: str = '') -> dict:
+    """Fit the screen on the training split and calibrate its threshold against the champion on validation"""
+    try:
+        from .distill import drop_symptoms
+    except ImportError:
+        from distill import drop_symptoms
+    X_train = align_features(X_train, features)
+    X_valid = align_features(X_valid, features)
+    X_valid = pd.concat([X_valid, drop_symptoms(X_valid, copies, seed=SEED)], ignore_index=True)
+    start = time.perf_counter()
+    screen = make_screen(kind).fit(X_train, np.asarray(y_train).ravel())
+    fit_seconds = time.perf_counter() - start
+    proba, confidence = screen_margin(screen, X_valid.to_numpy(dtype=np.float64), linear_screen(screen))
+    screen_pred = np.asarray(screen.classes_)[proba.argmax(axis=1)]
+    champion_pred = np.asarray(champion.classes_)[
+        np.asarray(champion.predict_proba(model_input(champion, X_valid.to_numpy(dtype=np.float64), features))).argmax(axis=1)]
+    threshold = calibrate_threshold(confidence, screen_pred, champion_pred, target)
+    accepted = confidence >= threshold
+    return {
+        'kind': kind,
+        'screen': screen,
+        'features': list(features),
+        'champion_version': champion_version,
+        'threshold': threshold,
+        'target_agreement': target,
+        'calibration_copies': copies,
+        'fit_seconds': fit_seconds,
+        'validation': {
+            'rows': int(len(X_valid)),
+            'escalation_rate': float(1 - accepted.mean()),
+            'screen_agreement': float((screen_pred == champion_pred).mean()),
+            'accepted_agreement': float((screen_pred[accepted] == champion_pred[accepted]).mean()) if accepted.any() else None,
+        },
+    }
+
+
+def cascade_from_env() -> str | None:
+    """SERVING_CASCADE: unset serves the model directly; '1' uses models/cascade_screen.pkl, anything else is a path"""
+    value = os.environ.get('SERVING_CASCADE', '').strip()
+    if not value or value.lower() in ('0', 'false', 'no'):
+        return None
+    return str(Path('models') / CASCADE_FILENAME) if value.lower() in ('1', 'true', 'yes') else value
+
+
+def load_cascade(path, champion, features: list[str], champion_version: str = '') -> CascadeModel | None:
+    """Wrap `champion` in the cascade stored at `path`; None when there is no usable screen"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    stored = joblib.load(path)
+    if list(stored['features']) != list(features):
+        raise ValueError(f"{path} was built for a different feature list; rebuild it with `python -m src.cascade build`")
+    # The threshold only guarantees its agreement with the model it was calibrated against; a retrained,
+    # online-updated or SERVING_MODELS champion needs its own calibration
+    if stored.get('champion_version') != champion_version:
+        raise ValueError(f"{path} was calibrated against model version {stored.get('champion_version') or 'unknown'}, "
+                         f"not {champion_version or 'unknown'}; rebuild it with `python -m src.cascade build`")
+    return CascadeModel(stored['screen'], champion, features, stored['threshold'],
+                        f"{champion_version}:{file_sha256(path)[:16]}")
+
+
+# ---------- Report ----------
+
+def latency_profile(model, rows: np.ndarray, features: list[str], repeats: int = 1) -> np.ndarray:
+    """Per-request milliseconds, each request one {feature: value} mapping scored end to end"""
+    records = [dict(zip(features, r)) for r in rows]
+    model.predict_proba(model_input(model, feature_row(records[0], features).reshape(1, -1), features))  # warm-up
+    samples = []
+    for _ in range(repeats):
+        for record in records:
+            start = time.perf_counter()
+            model.predict_proba(model_input(model, feature_row(record, features).reshape(1, -1), features))
+            samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1000
+
+
+def _load_champion(base_dir: Path, path):
+    """(champion, features, label encoder, version) from --champion, else the manifest, else champion_model.pkl"""
+    try:
+        from .artifact_registry import MANIFEST_FILENAME, load_registered
+    except ImportError:
+        from artifact_registry import MANIFEST_FILENAME, load_registered
+    manifest = base_dir / 'models' / MANIFEST_FILENAME
+    if path is None and manifest.exists():
+        loaded = load_registered(manifest)
+        return loaded['model'], loaded['features'] or model_features(loaded['model']), loaded['label_encoder'], loaded['model_version']
+    path = Path(path) if path else base_dir / 'models' / 'champion_model.pkl'
+    model = joblib.load(path)
+    encoder_path = base_dir / 'data' / 'processed' / 'label_encoder.pkl'
+    label_encoder = joblib.load(encoder_path) if encoder_path.exists() else None
+    return model, model_features(model), label_encoder, file_sha256(path)[:16]
+
+
+def main(argv=None):
+    """Build the cascade screen, or report how the cascade handles a traffic sample"""
+    parser = argparse.ArgumentParser(description="Two-tier cascade inference")
+    parser.add_argument('--base-dir', default='.')
+    parser.add_argument('--champion', default=None, help="Escalation model (default: the manifest's, else champion_model.pkl)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    b = sub.add_parser('build', help=f"Fit the screen and calibrate its threshold → models/{CASCADE_FILENAME}")
+    b.add_argument('--screen', default='logistic', choices=['naive_bayes', 'logistic'])
+    b.add_argument('--target-agreement', type=float, default=TARGET_AGREEMENT,
+                   help="Required agreement with the champion on the rows the screen answers")
+    b.add_argument('--copies', type=int, default=CALIBRATION_COPIES,
+                   help="Symptom-dropped copies of the validation split used for calibration")
+    r = sub.add_parser('report', help="Escalation rate, latency distribution and agreement with the champion")
+    r.add_argument('--traffic', default=str(Path('data') / 'raw' / 'Testing.csv'), help="Symptom CSV or predictions.db")
+    r.add_argument('--repeats', type=int, default=20, help="Passes over the traffic for the latency distribution")
+    args = parser.parse_args(argv)
+
+    base_dir = Path(args.base_dir)
+    try:
+        champion, features, label_encoder, version = _load_champion(base_dir, args.champion)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if not features:
+        print("❌ The champion does not record its feature names; build models/manifest.json first")
+        sys.exit(1)
+    path = base_dir / 'models' / CASCADE_FILENAME
+
+    if args.command == 'build':
+        processed = base_dir / 'data' / 'processed'
+        paths = [processed / n for n in ('X_train.csv', 'y_train.csv', 'X_valid.csv')]
+        if not all(p.exists() for p in paths):
+            print(f"❌ Processed splits missing in {processed}; run `python -m src.pipeline --only prepare` first")
+            sys.exit(1)
+        X_train, y_train, X_valid = (pd.read_csv(p) for p in paths)
+        stored = build_screen(args.screen, champion, features, X_train, y_train.squeeze(), X_valid,
+                              args.target_agreement, args.copies, version)
+        joblib.dump(stored, path)
+        v = stored['validation']
+        answered = 'n/a' if v['accepted_agreement'] is None else f"{v['accepted_agreement']:.2%}"
+        print(f"✅ {args.screen} screen fitted in {stored['fit_seconds'] * 1000:.1f} ms • margin threshold {stored['threshold']:.3f}")
+        print(f"📐 Calibration ({v['rows']} rows): escalation {v['escalation_rate']:.1%} • agreement on answered rows "
+              f"{answered} • screen alone {v['screen_agreement']:.2%}")
+        print(f"💾 {path.as_posix()} — serve it with SERVING_CASCADE=1")
+        return
+
+    try:
+        cascade = load_cascade(path, champion, features, version)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if cascade is None:
+        print(f"❌ {path} not found; run `python -m src.cascade build` first")
+        sys.exit(1)
+    try:
+        from .pattern_index import traffic_frame
+    except ImportError:
+        from pattern_index import traffic_frame
+    traffic = base_dir / args.traffic
+    X = traffic_frame(traffic, features)
+    if not len(X):
+        print(f"❌ No rows in {traffic}")
+        sys.exit(1)
+    rows = X.to_numpy(dtype=np.float64)
+
+    proba, escalate = cascade.route(rows)
+    cascade_pred = cascade.classes_[proba.argmax(axis=1)]
+    champion_pred = cascade.classes_[np.asarray(champion.predict_proba(model_input(champion, rows, features))).argmax(axis=1)]
+    print(f"🧭 {len(rows)} requests from {traffic.name} • margin threshold {cascade.threshold:.3f}")
+    print(f"   Escalated to the champion: {escalate.mean():.1%} • agreement with champion-only: "
+          f"{(cascade_pred == champion_pred).mean():.2%}")
+    if traffic.suffix == '.csv' and label_encoder is not None:
+        labels = pd.read_csv(traffic).get(TARGET_COLUMN)
+        if labels is not None:
+            # Both sides stripped: the encoder's classes keep the sheet's trailing spaces ('Diabetes ')
+            truth = labels.astype(str).str.strip().to_numpy()
+            decoded = lambda p: pd.Series(decode_predictions(p, label_encoder)).astype(str).str.strip().to_numpy()
+            print(f"   Accuracy on {TARGET_COLUMN}: cascade {(decoded(cascade_pred) == truth).mean():.2%} • "
+                  f"champion {(decoded(champion_pred) == truth).mean():.2%}")
+
+    champion_ms = latency_profile(champion, rows, features, args.repeats)
+    cascade_ms = latency_profile(cascade, rows, features, args.repeats)
+    table = pd.DataFrame({
+        name: {f'p{q}': np.percentile(ms, q) for q in (50, 90, 95, 99)} | {'mean': ms.mean()}
+        for name, ms in (('champion', champion_ms), ('cascade', cascade_ms))
+    }).T
+    print(f"⏱️ Single-request latency (ms, {len(cascade_ms)} requests):")
+    print(table.round(3).to_string())
+    print(f"🚀 Mean speedup {champion_ms.mean() / cascade_ms.mean():.1f}x")
+
+
+if __name__ == "__main__":
+    main()
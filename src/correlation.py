@@ -0,0 +1,114 @@
+"""
+Pearson correlation from a co-occurrence (Gram) product.
+
+For a data matrix X with n rows, every pairwise correlation follows from three
+sufficient statistics: n, the column sums s = 1^T X and the Gram matrix G = X^T X.
+For 0/1 symptom flags G is exactly the symptom co-occurrence count matrix. Those
+statistics add across row chunks, so they can be accumulated incrementally as data
+arrives and in parallel (NumPy's matmul releases the GIL), and the correlation
+matrix is a single O(m^2) step at the end instead of a generic DataFrame.corr().
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_ROWS = 65_536
+
+
+class GramAccumulator:
+    def __init__(self, columns):
+        self.columns = list(columns)
+        m = len(self.columns)
+        self.n = 0
+        self.sums = np.zeros(m, dtype=np.float64)
+        self.gram = np.zeros((m, m), dtype=np.float64)
+
+    def update(self, X) -> 'GramAccumulator':
+        """Fold a chunk of rows (DataFrame or 2-D array, same column order) into the statistics"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        self.n += len(X)
+        self.sums += X.sum(axis=0)
+        self.gram += X.T @ X
+        return self
+
+    def update_packed(self, bits: np.ndarray, n_symptoms: int) -> 'GramAccumulator':
+        """Fold in bit-packed 0/1 rows (see symptom_matrix.pack_rows)"""
+        X = np.unpackbits(bits, axis=1, count=n_symptoms, bitorder='little')
+        return self.update(X)
+
+    def merge(self, other: 'GramAccumulator') -> 'GramAccumulator':
+        self.n += other.n
+        self.sums += other.sums
+        self.gram += other.gram
+        return self
+
+    def covariance(self, ddof: int = 1) -> np.ndarray:
+        centered = self.gram - np.outer(self.sums, self.sums) / max(self.n, 1)
+        return centered / max(self.n - ddof, 1)
+
+    def correlation(self) -> pd.DataFrame:
+        """Pearson correlation; constant columns give NaN, as in DataFrame.corr()"""
+        cov = self.covariance()
+        std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.outer(std, std)
+        corr[:, std == 0] = np.nan
+        corr[std == 0, :] = np.nan
+        np.clip(corr, -1.0, 1.0, out=corr)
+        idx = np.arange(len(std))
+        corr[idx[std > 0], idx[std > 0]] = 1.0
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def _partial(X: np.ndarray, columns) -> GramAccumulator:
+    return GramAccumulator(columns).update(X)
+
+
+def accumulate(X, columns=None, chunk_rows: int = DEFAULT_CHUNK_ROWS, n_jobs: int | None = None) -> GramAccumulator:
+    """Build the sufficient statistics for X, one chunk of rows per worker thread"""
+    if isinstance(X, pd.DataFrame):
+        columns = list(X.columns) if columns is None else columns
+        X = X.to_numpy()
+    X = np.asarray(X)
+    columns = list(range(X.shape[1])) if columns is None else columns
+    chunks = [X[i:i + chunk_rows] for i in range(0, len(X), chunk_rows)]
+    total = GramAccumulator(columns)
+    workers = min(len(chunks), n_jobs or os.cpu_count() or 1)
+    if workers <= 1:
+        for chunk in chunks:
+            total.update(chunk)
+        return total
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_partial, chunks, [columns] * len(chunks)):
+            total.merge(part)
+    return total
+
+
+def gram_correlation(X: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNK_ROWS, n_jobs: int | None = None) -> pd.DataFrame:
+    """Drop-in for X.corr() on numeric, NaN-free frames"""
+    if X.isnull().values.any():
+        return X.corr()  # pairwise NaN handling needs per-pair row sets
+    return accumulate(X, chunk_rows=chunk_rows, n_jobs=n_jobs).correlation()
+
+
+def symptom_matrix_correlation(matrix, chunk_rows: int = DEFAULT_CHUNK_ROWS, n_jobs: int | None = None) -> pd.DataFrame:
+    """Correlation over a SymptomMatrix's packed symptoms plus its extra numeric columns"""
+    def partial(start: int) -> GramAccumulator:
+        stop = min(start + chunk_rows, len(matrix))
+        X = np.unpackbits(matrix.bits[start:stop], axis=1, count=len(matrix.symptoms), bitorder='little')
+        if len(matrix.extra.columns):
+            X = np.hstack([X, matrix.extra.iloc[start:stop].to_numpy()])
+        return GramAccumulator(columns).update(X)
+
+    columns = matrix.symptoms + list(matrix.extra.columns)
+    total = GramAccumulator(columns)
+    starts = range(0, len(matrix), chunk_rows)
+    with ThreadPoolExecutor(max_workers=max(1, min(len(starts), n_jobs or os.cpu_count() or 1))) as pool:
+        for part in pool.map(partial, starts):
+            total.merge(part)
+    return total.correlation().loc[matrix.columns, matrix.columns]
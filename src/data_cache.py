@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Binary columnar cache for the CSVs in data/processed/.
+
+Each CSV is parsed once and written as an uncompressed Arrow IPC (Feather v2) file
+under data/processed/.cache/. Later loads memory-map that file, so reading costs
+roughly a page-in instead of a CSV parse. Entries are keyed by the source's
+SHA-256; size and mtime are recorded so unchanged files are not re-hashed, and a
+touched-but-identical file keeps its cache entry.
+
+    python -m src.data_cache              # warm the cache for every processed CSV
+    python -m src.data_cache --clear      # drop all cache entries
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # pyarrow ships with streamlit, but keep plain CSV reads working without it
+    pa = None
+    ipc = None
+
+CACHE_DIRNAME = '.cache'
+MANIFEST_NAME = 'manifest.json'
+FORMAT_VERSION = 1
+
+_lock = threading.Lock()
+
+
+def file_sha256(path, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _cache_dir(source: Path, cache_dir=None) -> Path:
+    return Path(cache_dir) if cache_dir is not None else source.parent / CACHE_DIRNAME
+
+
+def _read_manifest(cache_dir: Path) -> dict:
+    try:
+        manifest = json.loads((cache_dir / MANIFEST_NAME).read_text(encoding='utf-8'))
+        return manifest if manifest.get('format_version') == FORMAT_VERSION else {'format_version': FORMAT_VERSION, 'entries': {}}
+    except Exception:
+        return {'format_version': FORMAT_VERSION, 'entries': {}}
+
+
+def _write_manifest(cache_dir: Path, manifest: dict):
+    tmp = cache_dir / f'{MANIFEST_NAME}.tmp'
+    tmp.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    tmp.replace(cache_dir / MANIFEST_NAME)
+
+
+def _fingerprint(source: Path, entry: dict | None) -> str:
+    """Content hash of `source`, reusing the recorded one while size and mtime are unchanged"""
+    st = source.stat()
+    if entry and entry.get('size') == st.st_size and entry.get('mtime_ns') == st.st_mtime_ns:
+        return entry['sha256']
+    return file_sha256(source)
+
+
+def _write_arrow(df: pd.DataFrame, path: Path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp = path.with_suffix('.tmp')
+    with pa.OSFile(str(tmp), 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    tmp.replace(path)
+
+
+def _read_arrow(path: Path) -> pd.DataFrame:
+    source = pa.memory_map(str(path), 'r')
+    table = ipc.open_file(source).read_all()
+    # split_blocks keeps one block per column so null-free numeric columns stay zero-copy views
+    return table.to_pandas(split_blocks=True)
+
+
+def read_processed_csv(path, cache_dir=None) -> pd.DataFrame | None:
+    """Drop-in for pd.read_csv(path) on processed data, served from the binary cache when valid"""
+    source = Path(path)
+    if not source.exists():
+        return None
+    if pa is None:
+        return pd.read_csv(source)
+
+    cdir = _cache_dir(source, cache_dir)
+    key = source.name
+    with _lock:
+        manifest = _read_manifest(cdir)
+        entry = manifest['entries'].get(key)
+        st = source.stat()
+        sha = _fingerprint(source, entry)
+        cache_file = cdir / f'{source.stem}-{sha[:16]}.arrow'
+        if entry and entry.get('sha256') == sha and cache_file.exists():
+            if entry.get('mtime_ns') != st.st_mtime_ns or entry.get('size') != st.st_size:
+                entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+                _write_manifest(cdir, manifest)
+            try:
+                return _read_arrow(cache_file)
+            except Exception:
+                pass  # corrupt or truncated entry: rebuild below
+
+        df = pd.read_csv(source)
+        try:
+            cdir.mkdir(parents=True, exist_ok=True)
+            _write_arrow(df, cache_file)
+            stale = entry.get('cache_file') if entry else None
+            if stale and stale != cache_file.name:
+                (cdir / stale).unlink(missing_ok=True)
+            manifest['entries'][key] = {
+                'sha256': sha,
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+                'cache_file': cache_file.name,
+                'rows': int(len(df)),
+                'columns': int(df.shape[1]),
+            }
+            _write_manifest(cdir, manifest)
+        except Exception:
+            pass  # read-only filesystem etc.: still return the parsed frame
+        return df
+
+
+def warm_cache(directory, cache_dir=None) -> list[str]:
+    """Build cache entries for every CSV in `directory`; returns the file names processed"""
+    done = []
+    for csv_path in sorted(Path(directory).glob('*.csv')):
+        read_processed_csv(csv_path, cache_dir)
+        done.append(csv_path.name)
+    return done
+
+
+def clear_cache(directory, cache_dir=None) -> int:
+    cdir = Path(cache_dir) if cache_dir is not None else Path(directory) / CACHE_DIRNAME
+    removed = 0
+    if cdir.exists():
+        for f in cdir.iterdir():
+            f.unlink()
+            removed += 1
+    return removed
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Build or clear the binary cache for data/processed")
+    parser.add_argument('directory', nargs='?', default=str(Path('data') / 'processed'))
+    parser.add_argument('--clear', action='store_true', help="Remove all cache entries")
+    args = parser.parse_args(argv)
+
+    if args.clear:
+        print(f"🧹 Removed {clear_cache(args.directory)} cache files")
+        return
+    if pa is None:
+        print("❌ pyarrow is not installed; the cache is disabled and CSVs are parsed directly")
+        return
+    for name in warm_cache(args.directory):
+        print(f"✅ Cached {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Distil the champion into compact student models.
+
+After model_selection.ipynb, the teacher (the champion, or a soft vote over several
+stored models) labels a transfer set: the training records plus copies with some
+symptoms dropped, the way partial symptom lists reach the Predictor. Each student is
+fitted on the teacher's soft labels — every (row, class) pair with teacher
+probability above MIN_SOFT_LABEL becomes a training row weighted by that probability —
+so it learns the teacher's confidence, not only its arg-max.
+
+Students are plain scikit-learn estimators written to models/distilled/model_<name>.pkl,
+so every loader, the tree compiler and the artifact manifest take them unchanged.
+The report lists file size, load time, single-row latency, validation and test
+accuracy and agreement with the teacher, and names the smallest student that meets
+the accuracy floor:
+
+    python -m src.distill --teacher models/champion_model.pkl --accuracy-floor 0.97
+    python -m src.distill --teacher models/model_catboost.pkl models/model_randomforest.pkl
+    python -m src.artifact_registry build --model models/distilled/model_logistic.pkl
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import BernoulliNB
+from sklearn.tree import DecisionTreeClassifier
+
+try:
+    from .inference import ENGINEERED_COLUMNS, TARGET_COLUMN, align_features, model_features
+    from .data_cache import read_processed_csv
+except ImportError:
+    from inference import ENGINEERED_COLUMNS, TARGET_COLUMN, align_features, model_features
+    from data_cache import read_processed_csv
+
+SEED = 42
+DISTILLED_DIR = Path('models') / 'distilled'
+REPORT_FILENAME = 'distillation_report.csv'
+# Teacher probabilities below this are dropped from the soft-label expansion
+MIN_SOFT_LABEL = 0.05
+# Chance that each present symptom is removed in an augmented copy
+DROP_PROBABILITY = 0.25
+
+STUDENTS = {
+    'forest_25x12': lambda: RandomForestClassifier(n_estimators=25, max_depth=12, random_state=SEED, n_jobs=1),
+    'tree': lambda: DecisionTreeClassifier(min_samples_leaf=2, random_state=SEED),
+    'naive_bayes': lambda: BernoulliNB(alpha=0.01),
+    'logistic': lambda: LogisticRegression(C=1.0, max_iter=2000),
+}
+
+
+def drop_symptoms(X: pd.DataFrame, copies: int, p: float = DROP_PROBABILITY, seed: int = SEED) -> pd.DataFrame:
+    """`copies` perturbed versions of X with each present symptom removed with probability p"""
+    if copies <= 0:
+        return X.iloc[:0]
+    rng = np.random.default_rng(seed)
+    symptoms = [c for c in X.columns if c not in ENGINEERED_COLUMNS and c != TARGET_COLUMN]
+    out = []
+    for _ in range(copies):
+        Xc = X.copy()
+        values = Xc[symptoms].to_numpy()
+        values[(values > 0) & (rng.random(values.shape) < p)] = 0
+        Xc[symptoms] = values
+        if 'symptom_count' in Xc.columns:
+            Xc['symptom_count'] = values.sum(axis=1)
+        out.append(Xc)
+    return pd.concat(out, ignore_index=True)
+
+
+def distinct_rows(X: pd.DataFrame):
+    """(unique rows, multiplicity); the symptom sheets repeat a few hundred patterns thousands of times"""
+    counts = X.groupby(list(X.columns), sort=False).size()
+    return counts.index.to_frame(index=False), counts.to_numpy()
+
+
+def soft_label_rows(X: pd.DataFrame, proba: np.ndarray, classes, weight=None, min_prob: float = MIN_SOFT_LABEL):
+    """(X, y, sample_weight) with one row per (record, class) whose teacher probability is ≥ min_prob"""
+    rows, cols = np.nonzero(proba >= min_prob)
+    sample_weight = proba[rows, cols] * (1.0 if weight is None else np.asarray(weight)[rows])
+    return X.iloc[rows].reset_index(drop=True), np.asarray(classes)[cols], sample_weight
+
+
+def fit_students(X: pd.DataFrame, teacher_proba: np.ndarray, classes, weight=None, names=None) -> dict:
+    X_soft, y_soft, weight = soft_label_rows(X, teacher_proba, classes, weight)
+    students = {}
+    for name in names or STUDENTS:
+        start = time.perf_counter()
+        students[name] = STUDENTS[name]().fit(X_soft, y_soft, sample_weight=weight)
+        print(f"✅ {name:<12} fitted on {len(X_soft):,} soft-label rows in {time.perf_counter() - start:.1f}s")
+    return students
+
+
+# ---------- Report ----------
+
+def _median_ms(fn, repeats: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples) * 1000)
+
+
+def evaluate(name: str, path: Path | None, model, features: list[str], eval_sets: dict, teacher_pred: dict,
+             repeats: int = 200) -> dict:
+    """Size, load time, single-row latency and accuracy of one saved model"""
+    row = {'model': name}
+    if path is not None:
+        row['size_kb'] = path.stat().st_size / 1024
+        row['load_ms'] = _median_ms(lambda: joblib.load(path), 5)
+    one = align_features(eval_sets['valid'][0].iloc[:1], features)
+    row['single_row_ms'] = _median_ms(lambda: model.predict_proba(one), repeats)
+    for split, (X, y) in eval_sets.items():
+        pred = np.asarray(model.predict(align_features(X, features))).ravel()
+        if y is not None:
+            row[f'{split}_accuracy'] = float((pred == y).mean())
+        if split in teacher_pred:
+            row[f'{split}_teacher_agreement'] = float((pred == teacher_pred[split]).mean())
+    return row
+
+
+def smallest_meeting(report: pd.DataFrame, floor: float, metric: str = 'test_accuracy'):
+    """Name of the smallest student whose `metric` is at least `floor`, or None"""
+    ok = report[(report.index != 'teacher') & (report[metric] >= floor)]
+    return None if ok.empty else ok['size_kb'].idxmin()
+
+
+def _load_teacher(paths: list[str]):
+    models = {Path(p).stem: joblib.load(p) for p in paths}
+    if len(models) == 1:
+        return next(iter(models.values()))
+    try:
+        from .multi_model import MultiModelScorer
+    except ImportError:
+        from multi_model import MultiModelScorer
+    return MultiModelScorer(models, model_features(next(iter(models.values()))))
+
+
+def main(argv=None):
+    """Fit compact students on the teacher's soft labels and report size/latency/accuracy"""
+    try:
+        from .artifact_registry import DEFAULT_PATHS
+    except ImportError:
+        from artifact_registry import DEFAULT_PATHS
+    parser = argparse.ArgumentParser(description="Distil the champion into compact student models")
+    parser.add_argument('--teacher', nargs='+', default=[DEFAULT_PATHS['model'].as_posix()],
+                        help="Teacher model pickle(s); several are soft-voted")
+    parser.add_argument('--students', nargs='+', choices=list(STUDENTS), default=list(STUDENTS))
+    parser.add_argument('--augment', type=int, default=2, help="Copies of the training set with symptoms dropped")
+    parser.add_argument('--accuracy-floor', type=float, default=0.97, help="Minimum test accuracy to recommend")
+    parser.add_argument('--out-dir', default=str(DISTILLED_DIR))
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    missing = [p for p in args.teacher if not Path(p).exists()]
+    if missing:
+        print(f"❌ Teacher not found: {', '.join(missing)} (pass --teacher models/model_<name>.pkl)")
+        sys.exit(1)
+    teacher = _load_teacher(args.teacher)
+    features = model_features(teacher) or getattr(teacher, 'feature_names_', [])
+    if not features:
+        print("❌ The teacher does not record its feature names")
+        sys.exit(1)
+
+    processed = Path('data') / 'processed'
+    X_train = read_processed_csv(processed / 'X_train_selected.csv')
+    X_valid = read_processed_csv(processed / 'X_valid_selected.csv')
+    y_valid = read_processed_csv(processed / 'y_valid.csv')
+    test_df = read_processed_csv(processed / 'test_processed.csv')
+    if X_train is None or X_valid is None or y_valid is None:
+        print(f"❌ Processed data missing in {processed}; run data_preparation.ipynb first")
+        sys.exit(1)
+    X_train = align_features(X_train, features)
+
+    def teacher_proba(X):
+        X = align_features(X, features)
+        return np.asarray(teacher.predict_proba(X.to_numpy() if getattr(teacher, 'accepts_arrays', False) else X))
+
+    transfer, counts = distinct_rows(pd.concat([X_train, drop_symptoms(X_train, args.augment)], ignore_index=True))
+    start = time.perf_counter()
+    proba = teacher_proba(transfer)
+    print(f"🎓 Teacher labelled {len(transfer):,} distinct transfer rows ({counts.sum():,} total) "
+          f"in {time.perf_counter() - start:.1f}s")
+    classes = np.asarray(teacher.classes_)
+    students = fit_students(transfer, proba, classes, counts, args.students)
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for name, student in students.items():
+        paths[name] = out_dir / f'model_{name}.pkl'
+        joblib.dump(student, paths[name])
+
+    eval_sets = {'valid': (X_valid, y_valid.iloc[:, 0].to_numpy()),
+                 'valid_partial': (drop_symptoms(align_features(X_valid, features), 1, seed=SEED + 1), None)}
+    if test_df is not None and TARGET_COLUMN in test_df.columns:
+        eval_sets['test'] = (test_df.drop(columns=[TARGET_COLUMN]), test_df[TARGET_COLUMN].to_numpy())
+    teacher_pred = {split: classes[teacher_proba(X).argmax(axis=1)] for split, (X, _) in eval_sets.items()}
+
+    rows = []
+    if len(args.teacher) == 1:
+        rows.append(evaluate('teacher', Path(args.teacher[0]), teacher, features, eval_sets, teacher_pred, args.repeats))
+    for name, student in students.items():
+        rows.append(evaluate(name, paths[name], student, features, eval_sets, teacher_pred, args.repeats))
+    report = pd.DataFrame(rows).set_index('model')
+    report.to_csv(out_dir / REPORT_FILENAME)
+
+    print(f"\n🧮 {os.cpu_count()} CPU(s) • report written to {out_dir / REPORT_FILENAME}")
+    print(report.round(4).to_string())
+    metric = 'test_accuracy' if 'test_accuracy' in report.columns else 'valid_accuracy'
+    best = smallest_meeting(report, args.accuracy_floor, metric)
+    if best is None:
+        print(f"⚠️ No student reaches {metric} ≥ {args.accuracy_floor}")
+    else:
+        print(f"🏆 Smallest student with {metric} ≥ {args.accuracy_floor}: {best} ({report.loc[best, 'size_kb']:.0f} KB)")
+        print(f"   python -m src.artifact_registry build --model {paths[best].as_posix()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Soft-voting ensemble assembled from already-fitted base models.
+
+model_training.ipynb builds VotingEnsemble with VotingClassifier.fit, which refits
+its top-3 members from scratch and then five more times inside cross_val_score.
+Every one of those fits already happened when the members were cross-validated:
+same folds, same hyperparameters, same seeds. So the ensemble here is assembled from
+the fitted members, and its cross-validation score is computed from the members'
+stored out-of-fold probabilities (the fold models a refit would have produced).
+The member weights are tuned on the same out-of-fold probabilities, minimising
+log-loss over a grid on the weight simplex; every member keeps at least one grid
+step of weight, so a member is never voted out of the ensemble.
+
+The result is a regular sklearn VotingClassifier (fitted attributes set from the
+prefit members), so it pickles to models/model_votingensemble.pkl and loads anywhere
+the notebook's ensemble did.
+
+    python -m src.ensemble                              # top-3 cached fits from `python -m src.pipeline`
+    python -m src.ensemble --members CatBoost LightGBM --no-tune
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import VotingClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.preprocessing import LabelEncoder
+from sklearn.utils import Bunch
+
+try:
+    from . import training
+except ImportError:
+    import training
+
+WEIGHT_GRID_STEP = 0.1
+# Probabilities are clipped before the log so one confident miss cannot make the loss infinite
+LOG_LOSS_EPS = 1e-15
+
+
+def prefit_voting_classifier(estimators: list[tuple], classes, weights=None) -> VotingClassifier:
+    """VotingClassifier(voting='soft') whose fitted state comes from already-fitted estimators"""
+    vc = VotingClassifier(estimators=estimators, voting='soft', weights=None if weights is None else list(weights))
+    vc.estimators_ = [est for _, est in estimators]
+    vc.named_estimators_ = Bunch(**dict(estimators))
+    vc.le_ = LabelEncoder().fit(classes)
+    vc.classes_ = vc.le_.classes_
+    first = vc.estimators_[0]
+    if hasattr(first, 'feature_names_in_'):
+        vc.feature_names_in_ = np.asarray(first.feature_names_in_, dtype=object)
+    return vc
+
+
+def blend(probas: list[np.ndarray], weights) -> np.ndarray:
+    return np.average(np.stack(probas), axis=0, weights=weights)
+
+
+def log_loss(proba: np.ndarray, y_index: np.ndarray) -> float:
+    return float(-np.mean(np.log(np.clip(proba[np.arange(len(y_index)), y_index], LOG_LOSS_EPS, 1.0))))
+
+
+def simplex_grid(n: int, step: float = WEIGHT_GRID_STEP):
+    """Every weight vector of length n on a `step` grid that sums to 1, each member getting at least `step`"""
+    units = int(round(1 / step))
+    for combo in itertools.product(range(1, units + 1), repeat=n - 1):
+        if sum(combo) < units:
+            yield np.array((*combo, units - sum(combo))) / units
+
+
+def tune_weights(oof_probas: list[np.ndarray], y_index: np.ndarray, step: float = WEIGHT_GRID_STEP):
+    """(weights, log_loss) minimising out-of-fold log-loss; equal weights win ties"""
+    best_w = np.full(len(oof_probas), 1 / len(oof_probas))
+    best_loss = log_loss(blend(oof_probas, best_w), y_index)
+    for w in simplex_grid(len(oof_probas), step):
+        loss = log_loss(blend(oof_probas, w), y_index)
+        if loss < best_loss - 1e-12:
+            best_w, best_loss = w, loss
+    return best_w, best_loss
+
+
+def build_ensemble(members: dict, X_train, y_train, X_valid, y_valid, tune: bool = True,
+                   step: float = WEIGHT_GRID_STEP, verbose: bool = True) -> dict:
+    """train_evaluate_model-style results for a soft vote over `members` (scheduler results with OOF probabilities)"""
+    start = time.time()
+    names = list(members)
+    classes = members[names[0]]['oof_classes']
+    folds = members[names[0]]['oof_folds']
+    y_index = np.searchsorted(classes, np.asarray(y_train))
+    oof = [members[n]['oof_proba'] for n in names]
+
+    weights = np.full(len(names), 1 / len(names))
+    equal_loss = log_loss(blend(oof, weights), y_index)
+    tuned_loss = equal_loss
+    if tune:
+        weights, tuned_loss = tune_weights(oof, y_index, step)
+
+    ensemble = prefit_voting_classifier([(n, members[n]['model']) for n in names], classes,
+                                        None if not tune else weights)
+    oof_pred = blend(oof, weights).argmax(axis=1)
+    fold_scores = np.array([(oof_pred[folds == f] == y_index[folds == f]).mean() for f in np.unique(folds)])
+    results = {
+        'model': ensemble,
+        'train_acc': accuracy_score(y_train, ensemble.predict(X_train)),
+        'valid_acc': accuracy_score(y_valid, ensemble.predict(X_valid)),
+        'cv_mean': fold_scores.mean(),
+        'cv_std': fold_scores.std(),
+        'training_time': time.time() - start,
+        'weights': dict(zip(names, map(float, weights))),
+        'oof_log_loss': {'equal': equal_loss, 'tuned': tuned_loss},
+    }
+    if verbose:
+        shown = ', '.join(f"{n} {w:.2f}" for n, w in results['weights'].items())
+        print(f"   {training.ENSEMBLE_NAME:<15} train {results['train_acc']:.4f} • valid {results['valid_acc']:.4f} • "
+              f"CV {results['cv_mean']:.4f} ± {results['cv_std']:.4f} • {results['training_time']:.2f}s")
+        print(f"   {'':<15} weights {shown} • OOF log-loss {equal_loss:.4f} equal → {tuned_loss:.4f} tuned")
+    return results
+
+
+def main(argv=None):
+    """Build VotingEnsemble from the cached base-model fits of the training pipeline"""
+    parser = argparse.ArgumentParser(description="Soft-voting ensemble from prefit base models")
+    parser.add_argument('--base-dir', default='.')
+    parser.add_argument('--members', nargs='+', default=None, help="Base models (default: top ensemble_size by CV)")
+    parser.add_argument('--no-tune', action='store_true', help="Equal weights, like the notebook")
+    parser.add_argument('--step', type=float, default=WEIGHT_GRID_STEP, help="Weight grid resolution")
+    parser.add_argument('--refit', action='store_true', help="Also time the notebook's VotingClassifier refit + CV")
+    args = parser.parse_args(argv)
+
+    try:
+        from .pipeline import cached_base_models, load_training_frames
+    except ImportError:
+        from pipeline import cached_base_models, load_training_frames
+    base_dir = Path(args.base_dir)
+    try:
+        X_train, y_train, X_valid, y_valid = load_training_frames(base_dir)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    fitted = cached_base_models(base_dir)
+    fitted = {n: r for n, r in fitted.items() if 'oof_proba' in r}
+    if args.members:
+        missing = [m for m in args.members if m not in fitted]
+        if missing:
+            print(f"❌ No cached fit for {', '.join(missing)}; run `python -m src.pipeline --only train` first")
+            sys.exit(1)
+        members = {m: fitted[m] for m in args.members}
+    else:
+        members = dict(sorted(fitted.items(), key=lambda x: x[1]['cv_mean'], reverse=True)[:training.ENSEMBLE_SIZE])
+    if len(members) < 2:
+        print("❌ Need at least two cached base-model fits; run `python -m src.pipeline --only train` first")
+        sys.exit(1)
+
+    print(f"🎯 Ensemble of {', '.join(members)} from prefit models")
+    build_ensemble(members, X_train, y_train, X_valid, y_valid, tune=not args.no_tune, step=args.step)
+    if args.refit:
+        print("🐢 Notebook path: VotingClassifier.fit + cross_val_score")
+        training.train_evaluate_model(
+            VotingClassifier(estimators=[(n, r['model']) for n, r in members.items()], voting='soft'),
+            X_train, y_train, X_valid, y_valid, training.ENSEMBLE_NAME,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Feature-selection engine with cached per-method scores.
+
+feature_selection.ipynb runs five selectors (Chi2, mutual information, RandomForest
+importance, RFECV with ExtraTrees, L1 logistic regression) and keeps the features
+that at least two of them pick. Chi2 and mutual information come from one
+class × feature count table (src/contingency.py); mutual information is the exact
+value for the discrete symptoms rather than the notebook's nearest-neighbour
+estimate. Only the scoring is expensive; which features a method picks at a given
+k, and the vote over methods, are cheap functions of the scores. So each method's
+per-feature scores are persisted under .cache/feature_selection/, keyed by a
+fingerprint of the (variance-filtered) data and the method's own parameters, and
+consensus at any k / vote threshold is derived from them in milliseconds. A method
+recomputes only when the data or its parameters change.
+
+    python -m src.feature_selection                       # notebook settings: k=60, ≥2 votes
+    python -m src.feature_selection --k 40 --min-votes 3  # instant once the scores are cached
+    python -m src.feature_selection --k 40 --write        # also write selected_features.pkl, X_*_selected.csv, ...
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .contingency import ContingencyTable
+except ImportError:
+    from contingency import ContingencyTable
+
+CACHE_DIR = Path('.cache') / 'feature_selection'
+SEED = 42
+
+# Method name → how its scores become a selection: top-k by score, or a k-independent rule
+METHODS = {
+    'Chi2': 'top_k',
+    'Mutual_Info': 'top_k',
+    'Random_Forest': 'top_k_ranked',
+    'RFE': 'support',
+    'Lasso': 'at_least_median',
+}
+DEFAULT_PARAMS = {
+    'seed': SEED, 'variance_threshold': 0.01, 'k': 60, 'rfecv_step': 5, 'rfecv_folds': 3,
+    'lasso_c': 0.1, 'min_votes': 2, 'min_features': 30,
+}
+
+
+def data_fingerprint(X: pd.DataFrame, y) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps(list(map(str, X.columns))).encode('utf-8'))
+    h.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+    h.update(np.ascontiguousarray(np.asarray(y)).tobytes())
+    return h.hexdigest()
+
+
+def _method_params(method: str, params: dict) -> dict:
+    return {
+        'Chi2': {},
+        'Mutual_Info': {'estimator': 'contingency'},
+        'Random_Forest': {'seed': params['seed'], 'n_estimators': 100},
+        'RFE': {'seed': params['seed'], 'step': params['rfecv_step'], 'folds': params['rfecv_folds'], 'n_estimators': 50},
+        'Lasso': {'seed': params['seed'], 'C': params['lasso_c']},
+    }[method]
+
+
+def compute_scores(method: str, X: pd.DataFrame, y, params: dict, table: ContingencyTable | None = None) -> pd.Series:
+    """Per-feature score of one method (higher = more relevant); RFE scores are 1 - ranking, so 0 means selected"""
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.feature_selection import RFECV
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import StratifiedKFold
+
+    p = _method_params(method, params)
+    if method in ('Chi2', 'Mutual_Info'):
+        # Both are exact functions of the class × feature counts (src/contingency.py)
+        table = table or ContingencyTable.from_frame(X, y)
+        values = (table.chi2()[0] if method == 'Chi2' else table.mutual_info())[X.columns].to_numpy()
+    elif method == 'Random_Forest':
+        values = RandomForestClassifier(n_estimators=p['n_estimators'], random_state=p['seed'], n_jobs=-1).fit(X, y).feature_importances_
+    elif method == 'RFE':
+        rfe = RFECV(
+            estimator=ExtraTreesClassifier(n_estimators=p['n_estimators'], random_state=p['seed'], n_jobs=-1),
+            step=p['step'],
+            cv=StratifiedKFold(p['folds'], shuffle=True, random_state=p['seed']),
+            scoring='accuracy',
+            n_jobs=-1,
+        ).fit(X, y)
+        values = 1 - rfe.ranking_.astype(np.float64)
+    elif method == 'Lasso':
+        lasso = LogisticRegression(penalty='l1', solver='liblinear', C=p['C'], random_state=p['seed'], max_iter=1000).fit(X, y)
+        # SelectFromModel's importance for a multi-class linear model: L1 norm of the coefficients per feature
+        values = np.linalg.norm(lasso.coef_, ord=1, axis=0)
+    else:
+        raise ValueError(f"Unknown method {method!r}")
+    return pd.Series(np.asarray(values, dtype=np.float64), index=X.columns, name=method)
+
+
+def select_from_scores(method: str, scores: pd.Series, k: int) -> list[str]:
+    """Features one method picks, in the order the notebook's selector lists them"""
+    rule = METHODS[method]
+    if rule == 'top_k':
+        # SelectKBest: NaN scores rank lowest, ties resolved by a stable argsort; listed in column order
+        values = np.where(np.isnan(scores.to_numpy()), np.finfo(np.float64).min, scores.to_numpy())
+        mask = np.zeros(len(values), dtype=bool)
+        mask[np.argsort(values, kind='mergesort')[len(values) - k:]] = True
+        return scores.index[mask].tolist()
+    if rule == 'top_k_ranked':
+        return scores.sort_values(ascending=False).head(k).index.tolist()
+    if rule == 'support':
+        return scores.index[scores.to_numpy() >= 0].tolist()
+    if rule == 'at_least_median':
+        return scores.index[scores.to_numpy() >= np.median(scores.to_numpy())].tolist()
+    raise ValueError(f"Unknown selection rule {rule!r}")
+
+
+def consensus(scores: dict, k: int, min_votes: int = 2, min_features: int = 30):
+    """(consensus_df, final_features) from cached method scores, exactly as the notebook votes"""
+    k = min(k, len(next(iter(scores.values()))))
+    feature_votes = {}
+    for method, method_scores in scores.items():
+        for feature in select_from_scores(method, method_scores, k):
+            entry = feature_votes.setdefault(feature, {'votes': 0, 'methods': []})
+            entry['votes'] += 1
+            entry['methods'].append(method)
+    consensus_df = pd.DataFrame([
+        {'feature': f, 'vote_count': d['votes'], 'methods': ', '.join(d['methods'])}
+        for f, d in feature_votes.items()
+    ]).sort_values('vote_count', ascending=False)
+
+    final_features = consensus_df[consensus_df.vote_count >= min_votes]['feature'].tolist()
+    if len(final_features) < min_features:
+        additional = consensus_df[
+            (consensus_df.vote_count == 1) & (~consensus_df.feature.isin(final_features))
+        ].head(min_features - len(final_features))['feature'].tolist()
+        final_features.extend(additional)
+    return consensus_df, final_features
+
+
+class FeatureSelectionEngine:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.computed = []
+        self.reused = []
+
+    def _path(self, method: str, fingerprint: str, params: dict) -> Path:
+        key = hashlib.sha256(json.dumps([fingerprint, _method_params(method, params)], sort_keys=True).encode()).hexdigest()
+        return self.cache_dir / f"{method.lower()}-{key[:20]}.csv"
+
+    def variance_filter(self, X: pd.DataFrame, threshold: float) -> pd.DataFrame:
+        from sklearn.feature_selection import VarianceThreshold
+        return X.loc[:, VarianceThreshold(threshold=threshold).fit(X).get_support()]
+
+    def scores(self, X: pd.DataFrame, y, params: dict | None = None) -> dict:
+        """{method: per-feature scores} for the variance-filtered X, computing only uncached methods"""
+        params = {**DEFAULT_PARAMS, **(params or {})}
+        X_filtered = self.variance_filter(X, params['variance_threshold'])
+        fingerprint = data_fingerprint(X_filtered, y)
+        out, table = {}, None
+        for method in METHODS:
+            path = self._path(method, fingerprint, params)
+            if path.exists():
+                out[method] = pd.read_csv(path, index_col=0).iloc[:, 0].rename(method)
+                out[method].index.name = None
+                self.reused.append(method)
+                continue
+            start = time.perf_counter()
+            if method in ('Chi2', 'Mutual_Info') and table is None:
+                table = ContingencyTable.from_frame(X_filtered, y)
+            out[method] = compute_scores(method, X_filtered, y, params, table)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + '.tmp')
+            out[method].to_csv(tmp, float_format='%.17g')
+            tmp.replace(path)
+            self.computed.append((method, time.perf_counter() - start))
+        return out
+
+    def select(self, X: pd.DataFrame, y, params: dict | None = None):
+        """(consensus_df, final_features, scores)"""
+        params = {**DEFAULT_PARAMS, **(params or {})}
+        scores = self.scores(X, y, params)
+        consensus_df, final_features = consensus(scores, params['k'], params['min_votes'], params['min_features'])
+        return consensus_df, final_features, scores
+
+
+def write_outputs(base_dir: Path, X_train: pd.DataFrame, X_valid: pd.DataFrame, consensus_df: pd.DataFrame,
+                  final_features: list[str]):
+    """The files feature_selection.ipynb saves"""
+    import joblib
+    models, processed = base_dir / 'models', base_dir / 'data' / 'processed'
+    models.mkdir(parents=True, exist_ok=True)
+    joblib.dump(final_features, models / 'selected_features.pkl')
+    pd.DataFrame({'feature_name': final_features}).to_csv(models / 'selected_features.csv', index=False)
+    consensus_df.to_csv(models / 'feature_consensus.csv', index=False)
+    X_train[final_features].to_csv(processed / 'X_train_selected.csv', index=False)
+    X_valid[final_features].to_csv(processed / 'X_valid_selected.csv', index=False)
+    summary = {
+        'original_features': X_train.shape[1],
+        'selected_features': len(final_features),
+        'reduction_ratio': len(final_features) / X_train.shape[1],
+        'methods_used': list(METHODS),
+    }
+    (models / 'feature_selection_summary.json').write_text(json.dumps(summary, indent=2), encoding='utf-8')
+
+
+def main(argv=None):
+    """Feature consensus from cached per-method scores"""
+    parser = argparse.ArgumentParser(description="Cached feature-selection engine")
+    parser.add_argument('--base-dir', default='.', help="Directory containing data/processed/")
+    parser.add_argument('--k', type=int, default=DEFAULT_PARAMS['k'], help="Features each top-k method picks")
+    parser.add_argument('--min-votes', type=int, default=DEFAULT_PARAMS['min_votes'])
+    parser.add_argument('--min-features', type=int, default=DEFAULT_PARAMS['min_features'])
+    parser.add_argument('--write', action='store_true', help="Write the selection files like the notebook")
+    args = parser.parse_args(argv)
+
+    base_dir = Path(args.base_dir)
+    processed = base_dir / 'data' / 'processed'
+    paths = [processed / n for n in ('X_train.csv', 'y_train.csv', 'X_valid.csv')]
+    missing = [p.as_posix() for p in paths if not p.exists()]
+    if missing:
+        print(f"❌ Missing {', '.join(missing)}; run `python -m src.pipeline --only prepare` first")
+        sys.exit(1)
+    X_train, y_train, X_valid = (pd.read_csv(p) for p in paths)
+    y_train = y_train.squeeze()
+
+    engine = FeatureSelectionEngine(base_dir / CACHE_DIR)
+    params = {'k': args.k, 'min_votes': args.min_votes, 'min_features': args.min_features}
+    start = time.perf_counter()
+    scores = engine.scores(X_train, y_train, params)
+    scored = time.perf_counter() - start
+    start = time.perf_counter()
+    consensus_df, final_features = consensus(scores, args.k, args.min_votes, args.min_features)
+    voted = time.perf_counter() - start
+
+    for method, seconds in engine.computed:
+        print(f"🧮 {method:<14} scored in {seconds:.2f}s")
+    if engine.reused:
+        print(f"♻️  Cached scores: {', '.join(engine.reused)}")
+    print(f"⏱️ Scores {scored * 1000:.1f} ms • consensus {voted * 1000:.1f} ms")
+    print(f"✅ {X_train.shape[1]} → {len(final_features)} features (k={args.k}, ≥{args.min_votes} votes)")
+    print(consensus_df.head(15).to_string(index=False))
+    if args.write:
+        write_outputs(base_dir, X_train, X_valid, consensus_df, final_features)
+        print("💾 Wrote selected_features.pkl/.csv, feature_consensus.csv, X_*_selected.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Model-agnostic scoring helpers shared by the Predictor page and headless tools."""
+
+import numpy as np
+import pandas as pd
+
+# Engineered columns produced by data_preparation.ipynb on top of the raw symptoms
+ENGINEERED_COLUMNS = ('symptom_count', 'rare_symptom_flag', 'fever_cough')
+TARGET_COLUMN = 'prognosis'
+
+
+def align_features(df: pd.DataFrame, features: list[str], exclude=()) -> pd.DataFrame:
+    """Return `df` restricted to `features` in model order, filling absent symptoms with 0.
+
+    Columns in `exclude` (passthrough ids and the like) are not symptoms and do not count towards symptom_count.
+    """
+    X = df.reindex(columns=features, fill_value=0)
+    if 'symptom_count' in features and 'symptom_count' not in df.columns:
+        # Raw symptom sheets do not carry the engineered count; rebuild it the same way
+        skip = set(ENGINEERED_COLUMNS) | {TARGET_COLUMN} | set(exclude or ())
+        symptom_cols = [c for c in df.columns if c not in skip]
+        X['symptom_count'] = df[symptom_cols].sum(axis=1).to_numpy() if symptom_cols else 0
+    return X.fillna(0)
+
+
+def model_features(model) -> list[str]:
+    """Feature names recorded on a fitted model (sklearn or CatBoost), or [] when unknown"""
+    for attr in ('feature_names_in_', 'feature_names_'):
+        names = getattr(model, attr, None)
+        if names is not None and len(names) > 0:
+            return [str(n) for n in names]
+    return []
+
+
+def decode_predictions(encoded, label_encoder) -> np.ndarray:
+    if label_encoder is None:
+        return np.asarray(encoded).astype(str)
+    try:
+        return np.asarray(label_encoder.inverse_transform(np.asarray(encoded).astype(int)))
+    except Exception:
+        return np.asarray(encoded).astype(str)
+
+
+def match_labels(names, classes) -> np.ndarray:
+    """Each disease name spelled as in `classes`, or None where there is no such class.
+
+    Names are compared without surrounding whitespace: the training sheet's classes include
+    'Diabetes ' and 'Hypertension ' with a trailing space, which user input rarely carries.
+    """
+    lookup = {str(c).strip(): c for c in classes}
+    return np.array([lookup.get(str(n).strip()) for n in names], dtype=object)
+
+
+def predict_batch(model, X: pd.DataFrame, label_encoder=None):
+    """Score a prepared frame with a single predict_proba call.
+
+    Returns (encoded_labels, probabilities, diseases, confidence_percent), one entry per row.
+    """
+    proba = np.asarray(model.predict_proba(X))
+    best = proba.argmax(axis=1)
+    classes = getattr(model, 'classes_', None)
+    encoded = np.asarray(classes)[best] if classes is not None else best
+    encoded = np.asarray(encoded).ravel()
+    confidence = proba[np.arange(len(best)), best] * 100.0
+    return encoded, proba, decode_predictions(encoded, label_encoder), confidence
+
+
+def feature_row(input_data: dict, features: list[str]) -> np.ndarray:
+    """Model-ordered float row for one {feature: value} mapping, deriving symptom_count when absent"""
+    row = np.array([input_data.get(f, 0) or 0 for f in features], dtype=np.float64)
+    if 'symptom_count' in features and 'symptom_count' not in input_data:
+        row[features.index('symptom_count')] = sum(
+            v or 0 for k, v in input_data.items() if k not in ENGINEERED_COLUMNS and k != TARGET_COLUMN
+        )
+    return row
+
+
+def model_input(model, rows: np.ndarray, features: list[str]):
+    """Compiled evaluators take the array (reordered by name if their order differs); library models get named columns"""
+    if not getattr(model, 'accepts_arrays', False):
+        return pd.DataFrame(rows, columns=features)
+    names = getattr(model, 'feature_names_', None)
+    if names is not None and list(names) != list(features):
+        position = {f: j for j, f in enumerate(features)}
+        missing = [n for n in names if n not in position]
+        if missing:
+            raise ValueError(f"Model features not in the serving list: {', '.join(missing[:5])}")
+        return rows[:, [position[n] for n in names]]
+    return rows
+
+
+def predict_one(model, input_data: dict, features: list[str], label_encoder=None):
+    """Score a single {feature: 0/1} mapping; returns (disease, confidence_percent, probabilities)"""
+    X = model_input(model, feature_row(input_data, features).reshape(1, -1), features)
+    _, proba, diseases, confidence = predict_batch(model, X, label_encoder)
+    return str(diseases[0]), float(confidence[0]), proba[0]
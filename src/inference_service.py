@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Standalone HTTP inference service (ASGI, Starlette + uvicorn).
+
+Concurrent requests are queued and scored together: a single batching task takes
+whatever arrived within `max_wait_ms` of the first queued request (up to
+`max_batch_size` rows), runs one predict_proba call off the event loop and resolves
+every waiting request from the result.
+
+    python -m src.inference_service --port 8000 --max-batch-size 64 --max-wait-ms 5
+    curl -X POST localhost:8000/predict -H 'Content-Type: application/json' \\
+         -d '{"symptoms": ["itching", "skin_rash", "nodal_skin_eruptions"]}'
+    python -m src.inference_service --benchmark --concurrency 256
+
+Request bodies: {"symptoms": [...]}, {"features": {name: value}} or
+{"instances": [<either form>, ...]}; add "top_k": n for the n most likely diseases.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import numpy as np
+
+try:
+    from .inference import decode_predictions, feature_row, model_input, predict_batch
+except ImportError:
+    from inference import decode_predictions, feature_row, model_input, predict_batch
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+class MicroBatcher:
+    def __init__(self, model, features: list[str], label_encoder=None,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        self.model = model
+        self.features = list(features)
+        self.label_encoder = label_encoder
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.batches = 0
+        self.rows = 0
+        self._queue = None
+        self._task = None
+        # One scoring thread: batches run back to back while the event loop keeps accepting requests
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='micro-batch')
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def predict(self, rows: np.ndarray):
+        """(encoded, probabilities, diseases, confidence_percent) for a block of feature rows"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((np.atleast_2d(rows), future))
+        return await future
+
+    def _score(self, X: np.ndarray):
+        return predict_batch(self.model, model_input(self.model, X, self.features), self.label_encoder)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            n_rows = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while n_rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    item = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                pending.append(item)
+                n_rows += len(item[0])
+
+            X = np.vstack([rows for rows, _ in pending])
+            try:
+                encoded, proba, diseases, confidence = await loop.run_in_executor(self._executor, self._score, X)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(X)
+            start = 0
+            for rows, future in pending:
+                stop = start + len(rows)
+                if not future.done():
+                    future.set_result((encoded[start:stop], proba[start:stop], diseases[start:stop], confidence[start:stop]))
+                start = stop
+
+    def stats(self) -> dict:
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': self.rows / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+def parse_instance(instance: dict, features: list[str]) -> np.ndarray:
+    """Feature row for one request instance: {"symptoms": [...]} or {"features": {...}}"""
+    if not isinstance(instance, dict):
+        raise ValueError("each instance must be a JSON object")
+    if 'symptoms' in instance:
+        symptoms = instance['symptoms']
+        if not isinstance(symptoms, list):
+            raise ValueError("'symptoms' must be a list of symptom names")
+        unknown = sorted(set(symptoms) - set(features))
+        if unknown:
+            raise ValueError(f"unknown symptoms: {', '.join(map(str, unknown))}")
+        return feature_row({s: 1 for s in symptoms}, features)
+    if 'features' in instance and isinstance(instance['features'], dict):
+        return feature_row(instance['features'], features)
+    raise ValueError("expected 'symptoms' (list) or 'features' (object)")
+
+
+def _result(disease, confidence, proba_row, classes, label_encoder, top_k: int) -> dict:
+    out = {'disease': str(disease), 'confidence_percent': float(confidence)}
+    if top_k > 0:
+        best = np.argsort(proba_row)[::-1][:top_k]
+        names = decode_predictions(classes[best], label_encoder)
+        out['top'] = [{'disease': str(n), 'probability': float(proba_row[i])} for n, i in zip(names, best)]
+    return out
+
+
+def create_app(artifacts: dict | None = None, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+               max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+    """Starlette app; `artifacts` defaults to shared.load_artifacts()"""
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    if artifacts is None:
+        try:
+            from .shared import load_artifacts
+        except ImportError:
+            from shared import load_artifacts
+        artifacts = load_artifacts()
+    model = artifacts.get("fast_model") or artifacts["model"]
+    features = list(artifacts["features"] or [])
+    label_encoder = artifacts.get("label_encoder")
+    if model is None or not features:
+        raise RuntimeError("Model or features are missing. Ensure artifacts exist in models/ and data/processed/ folders.")
+    classes = np.asarray(getattr(model, 'classes_', np.arange(len(getattr(label_encoder, 'classes_', [])))))
+    batcher = MicroBatcher(model, features, label_encoder, max_batch_size, max_wait_ms)
+
+    async def predict(request):
+        try:
+            body = await request.json()
+            if not isinstance(body, dict):
+                raise ValueError("request body must be a JSON object")
+            instances = body['instances'] if 'instances' in body else [body]
+            if not isinstance(instances, list) or not instances:
+                raise ValueError("'instances' must be a non-empty list")
+            rows = np.vstack([parse_instance(i, features) for i in instances])
+            top_k = int(body.get('top_k', 0))
+        except (ValueError, TypeError, KeyError) as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+        _, proba, diseases, confidence = await batcher.predict(rows)
+        results = [_result(d, c, p, classes, label_encoder, top_k) for d, c, p in zip(diseases, confidence, proba)]
+        payload = {'predictions': results} if 'instances' in body else results[0]
+        payload['model_version'] = artifacts.get("model_version", "")
+        return JSONResponse(payload)
+
+    async def health(request):
+        return JSONResponse({'status': 'ok', 'model_version': artifacts.get("model_version", ""), 'batching': batcher.stats()})
+
+    async def list_features(request):
+        return JSONResponse({'features': features})
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await batcher.start()
+        yield
+        await batcher.stop()
+
+    app = Starlette(routes=[
+        Route('/predict', predict, methods=['POST']),
+        Route('/health', health),
+        Route('/features', list_features),
+    ], lifespan=lifespan)
+    app.state.batcher = batcher
+    return app
+
+
+# ---------- Benchmark ----------
+
+async def _drive(batcher: MicroBatcher, rows: np.ndarray, concurrency: int) -> float:
+    await batcher.start()
+    try:
+        await batcher.predict(rows[:1])  # warm-up
+        start = time.perf_counter()
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with sem:
+                await batcher.predict(rows[i % len(rows)])
+
+        await asyncio.gather(*(one(i) for i in range(len(rows))))
+        return time.perf_counter() - start
+    finally:
+        await batcher.stop()
+
+
+def benchmark(model, features, rows: np.ndarray, concurrency: int = 256,
+              max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: float = DEFAULT_MAX_WAIT_MS) -> dict:
+    """Requests/s for one-row-per-call scoring vs micro-batching at the same concurrency"""
+    out = {}
+    for name, size, wait in (('one_row_per_call', 1, 0.0), ('micro_batched', max_batch_size, max_wait_ms)):
+        batcher = MicroBatcher(model, features, None, size, wait)
+        seconds = asyncio.run(_drive(batcher, rows, concurrency))
+        out[name] = {'requests_per_s': len(rows) / seconds, 'mean_batch_size': batcher.stats()['mean_batch_size']}
+    out['speedup'] = out['micro_batched']['requests_per_s'] / out['one_row_per_call']['requests_per_s']
+    return out
+
+
+def main(argv=None):
+    """Serve the champion model over HTTP, or benchmark micro-batching"""
+    parser = argparse.ArgumentParser(description="HTTP inference service with asyncio micro-batching")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument('--model', default=None, help="Serve this model pickle instead of the champion")
+    parser.add_argument('--benchmark', action='store_true', help="Compare one-row calls with micro-batching and exit")
+    parser.add_argument('--concurrency', type=int, default=256)
+    parser.add_argument('--requests', type=int, default=4096)
+    args = parser.parse_args(argv)
+
+    try:
+        from .shared import compile_fast_model, load_artifacts
+        from .inference import model_features
+        from .data_cache import file_sha256
+    except ImportError:
+        from shared import compile_fast_model, load_artifacts
+        from inference import model_features
+        from data_cache import file_sha256
+    artifacts = dict(load_artifacts())
+    if args.model:
+        import joblib
+        artifacts["model"] = joblib.load(args.model)
+        artifacts["fast_model"] = compile_fast_model(artifacts["model"])
+        artifacts["features"] = model_features(artifacts["model"]) or artifacts["features"]
+        artifacts["model_version"] = file_sha256(args.model)[:16]
+    if artifacts["model"] is None or not artifacts["features"]:
+        print("❌ Model or features are missing. Ensure artifacts exist in models/ and data/processed/ folders.")
+        sys.exit(1)
+
+    if args.benchmark:
+        model = artifacts.get("fast_model") or artifacts["model"]
+        rng = np.random.default_rng(0)
+        rows = (rng.random((args.requests, len(artifacts["features"]))) < 0.05).astype(np.float64)
+        report = benchmark(model, artifacts["features"], rows, args.concurrency, args.max_batch_size, args.max_wait_ms)
+        for name in ('one_row_per_call', 'micro_batched'):
+            r = report[name]
+            print(f"{name:>18}: {r['requests_per_s']:10,.0f} req/s • mean batch {r['mean_batch_size']:.1f}")
+        print(f"{'speedup':>18}: {report['speedup']:.1f}x")
+        return
+
+    import uvicorn
+    app = create_app(artifacts, args.max_batch_size, args.max_wait_ms)
+    print(f"🚀 Serving {type(artifacts['model']).__name__} on http://{args.host}:{args.port}/predict")
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == "__main__":
+    main()
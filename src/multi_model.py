@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Soft-voting over several stored models, scored in parallel.
+
+The training notebook saves every model it fits as models/model_<name>.pkl and
+builds its VotingEnsemble as a soft-voting VotingClassifier over the best of them.
+MultiModelScorer reproduces that vote from the saved members without refitting:
+each member's predict_proba runs on its own thread (tree libraries and NumPy release
+the GIL in their native loops) and the probabilities are averaged, optionally
+weighted, on the union of the members' classes. Ensemble latency is then close to
+the slowest member rather than the sum of all of them.
+
+    SERVING_MODELS=all streamlit run app.py                  # every models/model_*.pkl
+    SERVING_MODELS=catboost,randomforest streamlit run app.py
+    python -m src.multi_model --models catboost randomforest  # latency / accuracy vs single models
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .inference import align_features, model_features
+except ImportError:
+    from inference import align_features, model_features
+
+MODEL_PREFIX = 'model_'
+# The notebook's VotingClassifier is refit from its members, so its pickle is never a voter itself
+EXCLUDED_MODELS = ('votingensemble',)
+
+
+def discover_models(models_dir) -> dict:
+    """{name: path} for every models/model_<name>.pkl, excluding the notebook's own ensemble"""
+    found = {}
+    for path in sorted(Path(models_dir).glob(f'{MODEL_PREFIX}*.pkl')):
+        name = path.stem[len(MODEL_PREFIX):].lower()
+        if name not in EXCLUDED_MODELS:
+            found[name] = path
+    return found
+
+
+def select_models(available: dict, spec: str | list[str] | None) -> dict:
+    """Subset of `available` named by `spec` ('all', 'catboost,randomforest' or a list)"""
+    if spec is None:
+        return {}
+    names = [s.strip().lower() for s in (spec.split(',') if isinstance(spec, str) else spec) if s.strip()]
+    if names == ['all']:
+        return dict(available)
+    missing = [n for n in names if n not in available]
+    if missing:
+        raise ValueError(f"no stored model for {', '.join(missing)} (available: {', '.join(available) or 'none'})")
+    return {n: available[n] for n in names}
+
+
+class MultiModelScorer:
+    accepts_arrays = True
+
+    def __init__(self, models: dict, features: list[str], weights=None, versions: dict | None = None,
+                 n_jobs: int | None = None):
+        if not models:
+            raise ValueError("at least one model is required")
+        self.names = list(models)
+        self.models = [models[n] for n in self.names]
+        self.feature_names_ = list(features)
+        self.n_features_in_ = len(self.feature_names_)
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        if self.weights is not None and len(self.weights) != len(self.models):
+            raise ValueError(f"{len(self.weights)} weights for {len(self.models)} models")
+        self.n_jobs = max(1, int(n_jobs or len(self.models)))
+
+        # Union of member classes; each member's columns are scattered into it
+        self.classes_ = np.unique(np.concatenate([np.asarray(m.classes_) for m in self.models]))
+        self._class_index = [np.searchsorted(self.classes_, np.asarray(m.classes_)) for m in self.models]
+        # Column positions of each member's features in the serving order (-1 → absent, scored as 0)
+        position = {f: i for i, f in enumerate(self.feature_names_)}
+        self._member_features = [model_features(m) or self.feature_names_ for m in self.models]
+        self._columns = [np.array([position.get(f, -1) for f in names]) for names in self._member_features]
+
+        digest = hashlib.sha256()
+        for name in self.names:
+            digest.update(f"{name}:{(versions or {}).get(name, '')};".encode())
+        if self.weights is not None:
+            digest.update(self.weights.tobytes())
+        self.model_version = digest.hexdigest()[:16]
+        self._executor = None
+        self._pid = None
+
+    def __getstate__(self):
+        # Thread pools neither pickle nor survive a fork; each process starts its own
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_pid'] = None
+        return state
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.n_jobs, thread_name_prefix='multi-model')
+            self._pid = os.getpid()
+        return self._executor
+
+    def _rows(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            X = align_features(X, self.feature_names_)
+        X = np.asarray(X, dtype=np.float64)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def _member_input(self, i: int, X: np.ndarray):
+        cols = self._columns[i]
+        rows = X[:, np.maximum(cols, 0)]
+        if (cols < 0).any():
+            rows[:, cols < 0] = 0.0
+        if getattr(self.models[i], 'accepts_arrays', False):
+            return rows
+        return pd.DataFrame(rows, columns=self._member_features[i])
+
+    def _member_proba(self, i: int, X: np.ndarray) -> np.ndarray:
+        proba = np.zeros((len(X), len(self.classes_)))
+        proba[:, self._class_index[i]] = np.asarray(self.models[i].predict_proba(self._member_input(i, X)))
+        return proba
+
+    def member_probas(self, X) -> list[np.ndarray]:
+        """Each member's probabilities on the shared class axis, scored concurrently"""
+        X = self._rows(X)
+        if len(self.models) == 1:
+            return [self._member_proba(0, X)]
+        futures = [self._pool().submit(self._member_proba, i, X) for i in range(len(self.models))]
+        return [f.result() for f in futures]
+
+    def predict_proba(self, X) -> np.ndarray:
+        # Same rule as VotingClassifier(voting='soft'): weighted mean of the member probabilities
+        return np.average(np.stack(self.member_probas(X)), axis=0, weights=self.weights)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def load_scorer(models_dir, spec, features: list[str] | None = None, weights=None, compile_members=None):
+    """MultiModelScorer over the stored models named by `spec`, or None when `spec` selects nothing.
+
+    `compile_members(model)` may return a faster drop-in evaluator for a member (or None to keep it).
+    """
+    import joblib
+    try:
+        from .data_cache import file_sha256
+    except ImportError:
+        from data_cache import file_sha256
+
+    paths = select_models(discover_models(models_dir), spec)
+    if not paths:
+        return None
+    models, versions = {}, {}
+    for name, path in paths.items():
+        model = joblib.load(path)
+        if hasattr(model, 'n_jobs'):
+            # Parallelism is across members; a per-model joblib pool only adds dispatch cost per row
+            model.n_jobs = 1
+        if features is None:
+            features = model_features(model)
+        models[name] = (compile_members(model) if compile_members else None) or model
+        versions[name] = file_sha256(path)[:16]
+    return MultiModelScorer(models, features or [], weights, versions)
+
+
+def models_from_env() -> str | None:
+    """SERVING_MODELS: unset/empty serves the single champion; 'all' or a comma list of names votes"""
+    return os.environ.get('SERVING_MODELS', '').strip() or None
+
+
+def weights_from_env():
+    value = os.environ.get('SERVING_MODEL_WEIGHTS', '').strip()
+    return [float(w) for w in value.split(',')] if value else None
+
+
+# ---------- Benchmark ----------
+
+def _latency_ms(fn, rows: np.ndarray, repeats: int) -> float:
+    fn(rows[:1])
+    samples = []
+    for i in range(repeats):
+        row = rows[i % len(rows)].reshape(1, -1)
+        start = time.perf_counter()
+        fn(row)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples) * 1000)
+
+
+def benchmark(scorer: MultiModelScorer, X_valid: np.ndarray, y_valid: np.ndarray, repeats: int = 200) -> pd.DataFrame:
+    """Single-row latency and validation accuracy of each member, sequential voting and parallel voting"""
+    rows = []
+    for i, name in enumerate(scorer.names):
+        proba = scorer._member_proba(i, X_valid)
+        rows.append({
+            'scorer': name,
+            'single_row_ms': _latency_ms(lambda r, i=i: scorer._member_proba(i, r), X_valid, repeats),
+            'accuracy': float((scorer.classes_[proba.argmax(axis=1)] == y_valid).mean()),
+        })
+
+    def sequential(r):
+        return np.average(np.stack([scorer._member_proba(i, r) for i in range(len(scorer.models))]), axis=0,
+                          weights=scorer.weights)
+
+    accuracy = float((scorer.predict(X_valid) == y_valid).mean())
+    rows.append({'scorer': 'soft vote (sequential)', 'single_row_ms': _latency_ms(sequential, X_valid, repeats),
+                 'accuracy': accuracy})
+    rows.append({'scorer': f'soft vote ({scorer.n_jobs} threads)',
+                 'single_row_ms': _latency_ms(scorer.predict_proba, X_valid, repeats), 'accuracy': accuracy})
+    return pd.DataFrame(rows).set_index('scorer')
+
+
+def main(argv=None):
+    """Compare soft voting over stored models with each model on its own"""
+    parser = argparse.ArgumentParser(description="Parallel soft-voting over stored models")
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--models', nargs='+', default=['all'], help="Model names (model_<name>.pkl) or 'all'")
+    parser.add_argument('--weights', type=float, nargs='+', default=None)
+    parser.add_argument('--compiled', action='store_true', help="Score members through their compiled node tables")
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    try:
+        from .data_cache import read_processed_csv
+        from .tree_compiler import compile_model
+    except ImportError:
+        from data_cache import read_processed_csv
+        from tree_compiler import compile_model
+
+    def compile_or_keep(model):
+        try:
+            return compile_model(model)
+        except Exception:
+            return None
+
+    try:
+        scorer = load_scorer(args.models_dir, args.models, weights=args.weights,
+                             compile_members=compile_or_keep if args.compiled else None)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if scorer is None:
+        print(f"❌ No model_*.pkl files found in {args.models_dir}")
+        sys.exit(1)
+
+    processed = Path('data') / 'processed'
+    X_valid = read_processed_csv(processed / 'X_valid.csv')
+    y_valid = read_processed_csv(processed / 'y_valid.csv')
+    if X_valid is None or y_valid is None:
+        print(f"❌ Validation data missing: expected X_valid.csv and y_valid.csv in {processed}")
+        sys.exit(1)
+    y_valid = y_valid.iloc[:, 0].to_numpy()
+    X = scorer._rows(X_valid)
+    print(f"🧮 {os.cpu_count()} CPU(s) • {len(scorer.models)} models • {len(X):,} validation rows")
+    print(benchmark(scorer, X, y_valid, args.repeats).round(4).to_string())
+    scorer.shutdown()
+
+
+if __name__ == "__main__":
+    main()
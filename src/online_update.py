@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Online model updates from newly confirmed cases.
+
+Folding confirmed diagnoses back in used to mean rerunning every notebook from
+data_preparation onward. Here the deployed model is updated in place from the
+labelled delta alone:
+
+    partial_fit models (naive Bayes, linear)  partial_fit on the delta; exact for naive Bayes
+    RandomForest / ExtraTrees                 warm_start: new trees grown on the delta
+    LightGBM / XGBoost / CatBoost             more boosting rounds starting from the current model
+    VotingClassifier                          each member updated, then re-assembled
+
+Trees and boosting rounds are fitted on the delta plus a fixed stratified replay of
+REPLAY_PER_CLASS training rows per disease, which keeps every class present (the
+class set of a tree ensemble cannot change) and anchors the new trees to the
+original distribution; the cost of an update therefore grows with the delta, not
+with the training set. Each update is published as a new file under models/online/
+(new hash = new model_version, so prediction caches roll over), recorded in
+models/online/updates.json together with the last confirmation consumed, and with
+--publish written into models/manifest.json for the app to load.
+
+    python -m src.online_update confirm --id 42 --disease "Malaria"    # label a logged prediction
+    python -m src.online_update update --publish                       # fold in confirmations since the last update
+    python -m src.online_update update --labels data/raw/Testing.csv --compare-refit
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+try:
+    from .artifact_registry import MANIFEST_FILENAME, build_manifest, load_registered, write_manifest
+    from .data_cache import file_sha256
+    from .inference import TARGET_COLUMN, align_features, match_labels, model_features
+    from .prediction_log import PredictionLog
+except ImportError:
+    from artifact_registry import MANIFEST_FILENAME, build_manifest, load_registered, write_manifest
+    from data_cache import file_sha256
+    from inference import TARGET_COLUMN, align_features, match_labels, model_features
+    from prediction_log import PredictionLog
+
+ONLINE_DIR = Path('models') / 'online'
+HISTORY_FILENAME = 'updates.json'
+PREDICTION_DB = Path('predictions.db')
+SEED = 42
+REPLAY_PER_CLASS = 2
+ADDED_TREES = 10
+ADDED_ROUNDS = 10
+
+
+def replay_sample(X: pd.DataFrame, y: pd.Series, per_class: int = REPLAY_PER_CLASS, seed: int = SEED):
+    """`per_class` training rows of every class (all of them for smaller classes)"""
+    rng = np.random.default_rng(seed)
+    y = np.asarray(y)
+    picks = [rng.permutation(np.flatnonzero(y == c))[:per_class] for c in np.unique(y)]
+    idx = np.sort(np.concatenate(picks))
+    return X.iloc[idx].reset_index(drop=True), pd.Series(y[idx])
+
+
+def update_strategy(model) -> str:
+    from sklearn.ensemble import VotingClassifier
+    if isinstance(model, VotingClassifier):
+        return 'members'
+    if hasattr(model, 'partial_fit'):
+        return 'partial_fit'
+    if hasattr(model, 'warm_start') and hasattr(model, 'estimators_'):
+        return 'add_trees'
+    if type(model).__module__.split('.')[0] in ('lightgbm', 'xgboost', 'catboost'):
+        return 'add_rounds'
+    raise ValueError(f"No incremental update for {type(model).__name__}; retrain with `python -m src.pipeline`")
+
+
+def update_model(model, X_delta: pd.DataFrame, y_delta, X_replay: pd.DataFrame | None = None, y_replay=None,
+                 trees: int = ADDED_TREES, rounds: int = ADDED_ROUNDS):
+    """Model updated with the labelled delta (the same object for partial_fit and warm_start, a new one otherwise)"""
+    strategy = update_strategy(model)
+    if strategy == 'partial_fit':
+        model.partial_fit(X_delta, np.asarray(y_delta), classes=model.classes_)
+        return model
+    if strategy == 'members':
+        try:
+            from .ensemble import prefit_voting_classifier
+        except ImportError:
+            from ensemble import prefit_voting_classifier
+        members = [(name, update_model(est, X_delta, y_delta, X_replay, y_replay, trees, rounds))
+                   for name, est in zip(model.named_estimators_, model.estimators_)]
+        return prefit_voting_classifier(members, model.classes_, model.weights)
+
+    if X_replay is None:
+        raise ValueError(f"{strategy} needs replay rows so every class stays present")
+    X_fit = pd.concat([X_delta, X_replay[X_delta.columns]], ignore_index=True)
+    y_fit = np.concatenate([np.asarray(y_delta), np.asarray(y_replay)])
+    if strategy == 'add_trees':
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + trees)
+        model.fit(X_fit, y_fit)
+        model.set_params(warm_start=False)
+        return model
+
+    library = type(model).__module__.split('.')[0]
+    if library == 'lightgbm':
+        import lightgbm as lgb
+        updated = lgb.LGBMClassifier(**{**model.get_params(), 'n_estimators': rounds})
+        return updated.fit(X_fit, y_fit, init_model=model.booster_)
+    if library == 'xgboost':
+        import xgboost as xgb
+        updated = xgb.XGBClassifier(**{**model.get_params(), 'n_estimators': rounds})
+        return updated.fit(X_fit, y_fit, xgb_model=model.get_booster())
+    import catboost as cb
+    updated = cb.CatBoostClassifier(**{**model.get_params(), 'iterations': rounds})
+    return updated.fit(X_fit, y_fit, init_model=model)
+
+
+# ---------- Delta sources ----------
+
+def confirmed_delta(db_path, features: list[str], after_id: int = 0):
+    """(X, diseases, last confirmation id) for confirmations newer than `after_id` in the prediction log"""
+    confirmed = PredictionLog(db_path).confirmed(after_id)
+    rows = [{s.strip(): 1 for s in str(sel).split(';') if s.strip()} for sel in confirmed['selected_symptoms'].fillna('')]
+    X = align_features(pd.DataFrame(rows, index=range(len(rows))), features)
+    last = int(confirmed['confirmation_id'].max()) if len(confirmed) else after_id
+    return X, confirmed['confirmed_disease'].astype(str).to_numpy(), last
+
+
+def csv_delta(path, features: list[str]):
+    """(X, diseases) from a labelled symptom sheet such as data/raw/Testing.csv"""
+    df = pd.read_csv(path).loc[:, lambda d: ~d.columns.str.contains('^Unnamed')]
+    if TARGET_COLUMN not in df.columns:
+        raise ValueError(f"{path} has no {TARGET_COLUMN!r} column")
+    diseases = df.pop(TARGET_COLUMN).astype(str).to_numpy()
+    return align_features(df, features), diseases
+
+
+def encode_labels(diseases, label_encoder, classes) -> tuple[np.ndarray, np.ndarray]:
+    """(encoded labels, mask of rows kept): diseases the model has no class for are dropped"""
+    # Matched ignoring surrounding whitespace, so 'Diabetes' and the encoder's 'Diabetes ' are one class
+    matched = match_labels(diseases, label_encoder.classes_)
+    mask = np.array([m is not None for m in matched], dtype=bool)
+    encoded = label_encoder.transform(matched[mask].astype(str)) if mask.any() else np.array([], dtype=int)
+    in_model = np.isin(encoded, classes)
+    mask[np.flatnonzero(mask)[~in_model]] = False
+    return encoded[in_model], mask
+
+
+# ---------- Versions ----------
+
+def read_history(base_dir: Path) -> list[dict]:
+    path = base_dir / ONLINE_DIR / HISTORY_FILENAME
+    return json.loads(path.read_text(encoding='utf-8')) if path.exists() else []
+
+
+def lineage(model_path: Path) -> str:
+    """Name shared by a base model and its online versions: model_lightgbm for model_lightgbm-v3.pkl"""
+    stem, sep, number = Path(model_path).stem.rpartition('-v')
+    return stem if sep and number.isdigit() else Path(model_path).stem
+
+
+def publish(base_dir: Path, model, source_path: Path, entry: dict, history: list[dict]) -> Path:
+    """Write the updated model as the next version of its lineage and append it to updates.json"""
+    out_dir = base_dir / ONLINE_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    name = lineage(source_path)
+    version = sum(h.get('lineage') == name for h in history) + 1
+    path = out_dir / f"{name}-v{version}.pkl"
+    joblib.dump(model, path)
+    history.append({'lineage': name, 'version': version, 'path': path.relative_to(base_dir).as_posix(),
+                    'model_version': file_sha256(path)[:16],
+                    'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'), **entry})
+    tmp = out_dir / (HISTORY_FILENAME + '.tmp')
+    tmp.write_text(json.dumps(history, indent=2), encoding='utf-8')
+    tmp.replace(out_dir / HISTORY_FILENAME)
+    return path
+
+
+def _load_label_encoder(base_dir: Path):
+    """The label encoder the manifest names, else data/processed/label_encoder.pkl"""
+    manifest_path = base_dir / 'models' / MANIFEST_FILENAME
+    artifacts = json.loads(manifest_path.read_text(encoding='utf-8'))['artifacts'] if manifest_path.exists() else {}
+    return joblib.load(base_dir / artifacts.get('label_encoder', {}).get('path', Path('data') / 'processed' / 'label_encoder.pkl'))
+
+
+def _load_current(base_dir: Path, model_path):
+    """(model, model path, features, label encoder) from --model, else the manifest, else the champion"""
+    manifest_path = base_dir / 'models' / MANIFEST_FILENAME
+    registered = load_registered(manifest_path) if manifest_path.exists() else None
+    if model_path is None and registered is not None:
+        model_path = base_dir / registered['manifest']['artifacts']['model']['path']
+        model = registered['model']
+    else:
+        model_path = Path(model_path or base_dir / 'models' / 'champion_model.pkl')
+        model = joblib.load(model_path)
+    features = model_features(model) or (registered or {}).get('features') or []
+    label_encoder = (registered or {}).get('label_encoder')
+    if label_encoder is None:
+        label_encoder = joblib.load(base_dir / 'data' / 'processed' / 'label_encoder.pkl')
+    return model, Path(model_path), list(features), label_encoder
+
+
+def main(argv=None):
+    """Confirm logged predictions, or fold confirmed cases into the deployed model"""
+    parser = argparse.ArgumentParser(description="Online model updates from confirmed cases")
+    parser.add_argument('--base-dir', default='.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    c = sub.add_parser('confirm', help="Record the confirmed diagnosis of a logged prediction")
+    c.add_argument('--id', type=int, required=True, help="Prediction log row id")
+    c.add_argument('--disease', required=True)
+    c.add_argument('--db', default=str(PREDICTION_DB))
+    u = sub.add_parser('update', help="Update the model with confirmations (or --labels) and write a new version")
+    u.add_argument('--model', default=None, help="Model to update (default: the manifest's, else champion_model.pkl)")
+    u.add_argument('--db', default=str(PREDICTION_DB))
+    u.add_argument('--labels', default=None, help="Labelled symptom CSV to use instead of the prediction log")
+    u.add_argument('--trees', type=int, default=ADDED_TREES, help="Trees added to a forest")
+    u.add_argument('--rounds', type=int, default=ADDED_ROUNDS, help="Boosting rounds added")
+    u.add_argument('--publish', action='store_true', help="Point models/manifest.json at the new version")
+    u.add_argument('--compare-refit', action='store_true', help="Also time a from-scratch refit on train + delta")
+    args = parser.parse_args(argv)
+
+    base_dir = Path(args.base_dir)
+    if args.command == 'confirm':
+        try:
+            # Only diseases the model can learn are accepted; they are stored as the encoder spells them
+            classes = _load_label_encoder(base_dir).classes_
+            cid = PredictionLog(base_dir / args.db).confirm(args.id, args.disease, classes=classes)
+        except KeyError as e:
+            print(f"❌ {e.args[0]}")
+            sys.exit(1)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ Prediction {args.id} confirmed as {args.disease} (confirmation {cid})")
+        return
+
+    try:
+        model, model_path, features, label_encoder = _load_current(base_dir, args.model)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    history = read_history(base_dir)
+    # Confirmations already folded into this model's lineage are not applied twice
+    after_id = max((h.get('last_confirmation_id', 0) for h in history if h.get('lineage') == lineage(model_path)),
+                   default=0)
+    if args.labels:
+        X_delta, diseases = csv_delta(base_dir / args.labels, features)
+        source, last_id = {'labels': args.labels, 'labels_sha256': file_sha256(base_dir / args.labels)}, after_id
+    else:
+        X_delta, diseases, last_id = confirmed_delta(base_dir / args.db, features, after_id)
+        source = {'prediction_log': args.db, 'first_confirmation_id': after_id + 1}
+    if not len(X_delta):
+        print(f"✅ No confirmations after id {after_id}; the model is up to date")
+        return
+    y_delta, keep = encode_labels(diseases, label_encoder, np.asarray(model.classes_))
+    if (~keep).any():
+        print(f"⚠️ Skipping {int((~keep).sum())} rows whose disease the model has no class for: "
+              f"{', '.join(sorted(set(np.asarray(diseases)[~keep])))[:200]}")
+    X_delta = X_delta[keep].reset_index(drop=True)
+    if not len(X_delta):
+        print("❌ Nothing left to learn from")
+        sys.exit(1)
+
+    try:
+        strategy = update_strategy(model)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    X_replay = y_replay = None
+    train_path, y_path = base_dir / 'data' / 'processed' / 'X_train.csv', base_dir / 'data' / 'processed' / 'y_train.csv'
+    if strategy != 'partial_fit':
+        X_train, y_train = align_features(pd.read_csv(train_path), features), pd.read_csv(y_path).squeeze()
+        X_replay, y_replay = replay_sample(X_train, y_train)
+
+    print(f"🔁 {type(model).__name__} ({strategy}) ← {len(X_delta):,} labelled rows"
+          + (f" + {len(X_replay)} replay rows" if X_replay is not None else ""))
+    reference = joblib.load(model_path) if args.compare_refit else None
+    start = time.perf_counter()
+    updated = update_model(model, X_delta, y_delta, X_replay, y_replay, args.trees, args.rounds)
+    seconds = time.perf_counter() - start
+    path = publish(base_dir, updated, model_path, {
+        'parent': model_path.resolve().relative_to(base_dir.resolve()).as_posix(), 'strategy': strategy,
+        'rows': int(len(X_delta)), 'seconds': round(seconds, 4), 'last_confirmation_id': int(last_id), **source,
+    }, history)
+    print(f"✅ Updated in {seconds * 1000:.1f} ms → {path.as_posix()} (model version {history[-1]['model_version']})")
+
+    if args.compare_refit:
+        from sklearn.base import clone
+        X_train, y_train = align_features(pd.read_csv(train_path), features), pd.read_csv(y_path).squeeze()
+        X_all = pd.concat([X_train, X_delta], ignore_index=True)
+        y_all = np.concatenate([np.asarray(y_train), y_delta])
+        start = time.perf_counter()
+        refit = clone(reference).fit(X_all, y_all)
+        refit_seconds = time.perf_counter() - start
+        agree = float((np.asarray(refit.predict(X_delta)).ravel() == np.asarray(updated.predict(X_delta)).ravel()).mean())
+        print(f"🐢 From-scratch refit on {len(X_all):,} rows: {refit_seconds * 1000:.1f} ms "
+              f"({refit_seconds / max(seconds, 1e-9):.0f}x) • agreement on the delta {agree:.1%}")
+
+    if args.publish:
+        manifest_path = base_dir / 'models' / MANIFEST_FILENAME
+        # Keep serving the same feature list and label encoder the current manifest points at
+        current = json.loads(manifest_path.read_text(encoding='utf-8'))['artifacts'] if manifest_path.exists() else {}
+        try:
+            write_manifest(build_manifest(base_dir, path.relative_to(base_dir),
+                                          current.get('features', {}).get('path'),
+                                          current.get('label_encoder', {}).get('path')), manifest_path)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"📄 {manifest_path.as_posix()} now serves version {history[-1]['version']}")
+
+
+if __name__ == "__main__":
+    main()
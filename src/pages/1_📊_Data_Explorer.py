@@ -5,16 +5,20 @@ import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
 try:
-    from ..shared import set_page, inject_theme, load_artifacts, load_training_data, ensure_arrow_compatibility, safe_dataframe_display
+    from ..shared import set_page, inject_theme, load_artifacts, load_training_data, load_similar_case_index, ensure_arrow_compatibility, safe_dataframe_display, span
+    from ..correlation import gram_correlation
 except Exception:
-    from shared import set_page, inject_theme, load_artifacts, load_training_data, ensure_arrow_compatibility, safe_dataframe_display
+    from shared import set_page, inject_theme, load_artifacts, load_training_data, load_similar_case_index, ensure_arrow_compatibility, safe_dataframe_display, span
+    from correlation import gram_correlation
 
 set_page("📊 Data Explorer • Disease Predictor", "🧬")
 inject_theme()
 
-artifacts = load_artifacts()
+with span('data_explorer.load_artifacts'):
+    artifacts = load_artifacts()
 features = artifacts["features"]
-X_train, y_train, X_valid, y_valid, X_all = load_training_data(features)
+with span('data_explorer.load_training_data'):
+    X_train, y_train, X_valid, y_valid, X_all = load_training_data(features)
 
 st.markdown("<h1 class='neon'>📊 Data Explorer</h1>", unsafe_allow_html=True)
 
@@ -69,7 +73,8 @@ if isinstance(X_all, pd.DataFrame):
                     color_continuous_scale="Viridis"
                 )
                 fig_missing.update_layout(height=400, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-                st.plotly_chart(fig_missing, width='stretch')
+                with span('data_explorer.render_plotly'):
+                    st.plotly_chart(fig_missing, width='stretch')
             else:
                 st.success("✅ No missing values detected")
         
@@ -82,7 +87,8 @@ if isinstance(X_all, pd.DataFrame):
                 title="Feature Data Types"
             )
             fig_dtypes.update_layout(height=400, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-            st.plotly_chart(fig_dtypes, width='stretch')
+            with span('data_explorer.render_plotly'):
+                st.plotly_chart(fig_dtypes, width='stretch')
     
     else:  # Custom Filter
         st.markdown("<h3 class='section'>Custom Data Filter</h3>", unsafe_allow_html=True)
@@ -179,12 +185,14 @@ if isinstance(X_all, pd.DataFrame):
                     title=f"Distribution of {selected_feature}"
                 )
                 fig_dist.update_layout(height=400, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-                st.plotly_chart(fig_dist, width='stretch')
+                with span('data_explorer.render_plotly'):
+                    st.plotly_chart(fig_dist, width='stretch')
     
     with viz_col2:
         # Correlation heatmap
         if len(numeric_features) > 1:
-            corr_matrix = X_all[numeric_features].corr()
+            with span('data_explorer.correlation'):
+                corr_matrix = gram_correlation(X_all[numeric_features])
             fig_corr = go.Figure(data=go.Heatmap(
                 z=corr_matrix.values,
                 x=corr_matrix.columns,
@@ -201,8 +209,30 @@ if isinstance(X_all, pd.DataFrame):
                 paper_bgcolor='rgba(0,0,0,0)',
                 plot_bgcolor='rgba(0,0,0,0)'
             )
-            st.plotly_chart(fig_corr, width='stretch')
+            with span('data_explorer.render_plotly'):
+                st.plotly_chart(fig_corr, width='stretch')
     
+    # Similar cases: nearest records to a chosen record by Hamming distance over symptom flags
+    st.markdown("<h3 class='section'>Similar Cases</h3>", unsafe_allow_html=True)
+    try:
+        case_index = load_similar_case_index(features)
+        if case_index is not None:
+            sim_col1, sim_col2 = st.columns([1, 1])
+            with sim_col1:
+                record_id = int(st.number_input("Record", min_value=0, max_value=len(case_index) - 1, value=0, step=1))
+            with sim_col2:
+                k_cases = st.slider("Number of similar cases", 1, 20, 5)
+            record_symptoms = case_index.describe([record_id], [0])['symptoms'].iloc[0]
+            st.caption(f"Record {record_id}: {record_symptoms or 'no symptoms'}")
+            with span('data_explorer.similar_cases'):
+                case_idx, case_dist = case_index.query_row(record_id, k=k_cases)
+                cases = case_index.describe(case_idx, case_dist, record_symptoms.split('; '), artifacts["label_encoder"])
+            safe_dataframe_display(cases, "Most Similar Records")
+        else:
+            st.info("Similar-case search needs data/processed/X_train.csv")
+    except Exception as e:
+        st.warning(f"Could not search similar cases: {e}")
+
     # Export functionality
     st.markdown("<h3 class='section'>Export Data</h3>", unsafe_allow_html=True)
     export_col1, export_col2, export_col3 = st.columns([1, 1, 1])
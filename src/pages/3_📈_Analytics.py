@@ -5,17 +5,22 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 try:
-    from ..shared import set_page, inject_theme, load_artifacts, load_training_data, decode_labels
+    from ..shared import set_page, inject_theme, load_artifacts, load_training_data, load_analytics_summary, decode_labels, span
 except Exception:
-    from shared import set_page, inject_theme, load_artifacts, load_training_data, decode_labels
+    from shared import set_page, inject_theme, load_artifacts, load_training_data, load_analytics_summary, decode_labels, span
 
 set_page("📈 Analytics • Disease Predictor", "🧬")
 inject_theme()
 
-artifacts = load_artifacts()
+with span('analytics.load_artifacts'):
+    artifacts = load_artifacts()
 features = artifacts["features"]
 label_enc = artifacts["label_encoder"]
-X_train, y_train, X_valid, y_valid, X_all = load_training_data(features)
+with span('analytics.load_training_data'):
+    X_train, y_train, X_valid, y_valid, X_all = load_training_data(features)
+# Counts, frequencies, per-disease means and correlations come precomputed from one pass
+with span('analytics.load_summary'):
+    summary = load_analytics_summary(features)
 
 st.markdown("<h1 class='neon'>📈 Analytics</h1>", unsafe_allow_html=True)
 
@@ -39,7 +44,7 @@ if isinstance(X_all, pd.DataFrame) and y_all is not None:
         unique_diseases = len(y_all.unique()) if y_all is not None else 0
         st.markdown(f"<div class='glass'><h3>🦠 Disease Types</h3><h2>{unique_diseases}</h2></div>", unsafe_allow_html=True)
     with col4:
-        avg_symptoms = X_all.mean().mean() if isinstance(X_all, pd.DataFrame) else 0
+        avg_symptoms = summary['avg_value'] if summary is not None else 0
         st.markdown(f"<div class='glass'><h3>📈 Avg Symptoms</h3><h2>{avg_symptoms:.1f}</h2></div>", unsafe_allow_html=True)
 
 # Interactive filters
@@ -58,7 +63,7 @@ with filter_col3:
 if y_all is not None:
     y_decoded = decode_labels(y_all, label_enc)
     try:
-        counts = y_decoded.value_counts().reset_index()
+        counts = summary['class_counts'].reset_index()
         counts.columns = ['Disease', 'Count']
         
         # Interactive chart based on selection
@@ -84,7 +89,8 @@ if y_all is not None:
                             customdata=[(count/total)*100 for count in counts.head(top_n)['Count']])
         
         fig.update_layout(height=450, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig, width='stretch')
+        with span('analytics.render_plotly'):
+            st.plotly_chart(fig, width='stretch')
     except Exception as e:
         st.warning(f"Could not render label distribution: {e}")
 else:
@@ -94,7 +100,7 @@ else:
 if isinstance(X_all, pd.DataFrame) and features:
     try:
         usable = [f for f in features if f in X_all.columns]
-        freq = (X_all[usable].mean(numeric_only=True).sort_values(ascending=False)).head(top_n)
+        freq = summary['column_means'].reindex(usable).dropna().sort_values(ascending=False).head(top_n)
         freq_df = freq.reset_index(); freq_df.columns = ['Symptom', 'Frequency']
         
         # Interactive symptom chart
@@ -119,7 +125,8 @@ if isinstance(X_all, pd.DataFrame) and features:
                             customdata=[(freq/total_freq)*100 for freq in freq_df['Frequency']])
         
         fig2.update_layout(height=450, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig2, width='stretch')
+        with span('analytics.render_plotly'):
+            st.plotly_chart(fig2, width='stretch')
     except Exception as e:
         st.warning(f"Could not render symptom frequencies: {e}")
 else:
@@ -130,10 +137,10 @@ st.markdown("<h3 class='section'>Advanced Analytics</h3>", unsafe_allow_html=Tru
 
 if isinstance(X_all, pd.DataFrame) and y_all is not None:
     # Correlation analysis
-    numeric_cols = X_all.select_dtypes(include=[np.number]).columns
+    numeric_cols = summary['columns']
     if len(numeric_cols) > 1:
         st.markdown("#### 🔗 Feature Correlations")
-        corr_matrix = X_all[numeric_cols].corr()
+        corr_matrix = summary['correlation']
         
         fig_corr = go.Figure(data=go.Heatmap(
             z=corr_matrix.values,
@@ -151,21 +158,21 @@ if isinstance(X_all, pd.DataFrame) and y_all is not None:
             paper_bgcolor='rgba(0,0,0,0)',
             plot_bgcolor='rgba(0,0,0,0)'
         )
-        st.plotly_chart(fig_corr, width='stretch')
+        with span('analytics.render_plotly'):
+            st.plotly_chart(fig_corr, width='stretch')
     
     # Disease vs symptom analysis
     st.markdown("#### 🎯 Disease vs Symptom Analysis")
     disease_symptom_col1, disease_symptom_col2 = st.columns([1, 1])
     
     with disease_symptom_col1:
-        selected_disease = st.selectbox("Select Disease", y_decoded.unique() if y_decoded is not None else [])
+        selected_disease = st.selectbox("Select Disease", summary['diseases'])
     with disease_symptom_col2:
         symptom_threshold = st.slider("Symptom Threshold", 0.0, 1.0, 0.3, 0.1)
     
     if selected_disease and isinstance(X_all, pd.DataFrame):
         try:
-            disease_mask = y_decoded == selected_disease
-            disease_symptoms = X_all[disease_mask].mean()
+            disease_symptoms = summary['disease_symptom_means'].loc[selected_disease]
             top_symptoms = disease_symptoms[disease_symptoms > symptom_threshold].sort_values(ascending=False)
             
             if len(top_symptoms) > 0:
@@ -178,7 +185,8 @@ if isinstance(X_all, pd.DataFrame) and y_all is not None:
                     color_continuous_scale='Viridis'
                 )
                 fig_disease.update_layout(height=400, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-                st.plotly_chart(fig_disease, width='stretch')
+                with span('analytics.render_plotly'):
+                    st.plotly_chart(fig_disease, width='stretch')
             else:
                 st.info(f"No symptoms above threshold {symptom_threshold} for {selected_disease}")
         except Exception as e:
@@ -195,9 +203,9 @@ with export_col1:
                 "total_records": len(X_all) if isinstance(X_all, pd.DataFrame) else 0,
                 "total_features": len(features),
                 "unique_diseases": len(y_all.unique()) if y_all is not None else 0,
-                "avg_symptoms_per_record": float(X_all.mean().mean()) if isinstance(X_all, pd.DataFrame) else 0,
-                "most_common_disease": y_decoded.mode().iloc[0] if y_decoded is not None and len(y_decoded) > 0 else "N/A",
-                "most_common_symptom": X_all.mean().idxmax() if isinstance(X_all, pd.DataFrame) else "N/A"
+                "avg_symptoms_per_record": float(summary['avg_value']) if summary is not None else 0,
+                "most_common_disease": summary['most_common_disease'] if summary is not None else "N/A",
+                "most_common_symptom": summary['column_means'].idxmax() if summary is not None and len(summary['column_means']) else "N/A"
             }
             st.download_button(
                 label="📊 Download Summary (JSON)",
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Exact-pattern lookup index over the training data.
+
+The 4,920 training rows collapse to a few hundred distinct symptom patterns. The
+index maps each observed pattern of the served symptom columns (0/1 columns packed
+8 per byte) to the empirical disease distribution seen for it. Engineered columns
+are left out of the key: symptom_count is counted over all raw symptoms during data
+preparation, which the Predictor's feature checkboxes cannot reproduce. Exact
+matches are answered from the index; anything unseen falls back to the model. The index records the model version it was built
+against; loaders ignore it once the model is retrained or updated online.
+
+    python -m src.pattern_index build                                # → models/pattern_index.pkl
+    python -m src.pattern_index report --traffic data/raw/Testing.csv
+    python -m src.pattern_index report --traffic predictions.db      # replay the prediction log
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+try:
+    from .data_cache import file_sha256
+    from .inference import ENGINEERED_COLUMNS, align_features, decode_predictions, model_features, predict_batch, predict_one
+    from .symptom_matrix import is_binary_column
+except ImportError:
+    from data_cache import file_sha256
+    from inference import ENGINEERED_COLUMNS, align_features, decode_predictions, model_features, predict_batch, predict_one
+    from symptom_matrix import is_binary_column
+
+INDEX_FILENAME = 'pattern_index.pkl'
+
+
+class PatternIndex:
+    def __init__(self, features, binary_mask, keys, counts, classes, min_support: int = 1, model_version: str = '',
+                 key_columns=None):
+        self.features = list(features)
+        # Columns the pattern keys are built from, and their positions in a features-ordered row
+        self.key_columns = list(key_columns) if key_columns is not None else list(self.features)
+        self._key_index = np.array([self.features.index(c) for c in self.key_columns], dtype=np.int64)
+        self.binary_mask = np.asarray(binary_mask, dtype=bool)
+        self.keys = keys            # sorted void-typed pattern keys
+        self.counts = counts        # (patterns, classes) training counts
+        self.classes_ = np.asarray(classes)
+        self.min_support = int(min_support)
+        self.model_version = model_version
+        self._lookup = {k.tobytes(): i for i, k in enumerate(self.keys)}
+
+    # ---------- Keys ----------
+
+    @staticmethod
+    def _encode(X: np.ndarray, binary_mask: np.ndarray) -> np.ndarray:
+        """One fixed-width byte string per row"""
+        X = np.asarray(X)
+        binary = np.packbits(X[:, binary_mask] != 0, axis=1, bitorder='little')
+        rest = np.clip(X[:, ~binary_mask], -32768, 32767).astype('<i2').view(np.uint8).reshape(len(X), -1)
+        raw = np.ascontiguousarray(np.hstack([binary, rest]))
+        return raw.view(np.dtype((np.void, raw.shape[1]))).ravel()
+
+    def _valid(self, X: np.ndarray) -> np.ndarray:
+        # Binary columns must really be 0/1 for a packed key to be exact
+        return np.isin(X[:, self.binary_mask], (0, 1)).all(axis=1)
+
+    # ---------- Build ----------
+
+    @classmethod
+    def build(cls, X: pd.DataFrame, y, features: list[str] | None = None, min_support: int = 1,
+              model_version: str = '') -> 'PatternIndex':
+        features = list(features or X.columns)
+        X = align_features(X, features)
+        key_columns = [c for c in features if c not in ENGINEERED_COLUMNS]
+        binary_mask = np.array([is_binary_column(X[c]) for c in key_columns])
+        keys = cls._encode(X[key_columns].to_numpy(), binary_mask)
+        classes, y_codes = np.unique(np.asarray(y), return_inverse=True)
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        counts = np.zeros((len(uniq), len(classes)), dtype=np.int32)
+        np.add.at(counts, (inverse.ravel(), y_codes.ravel()), 1)
+        return cls(features, binary_mask, uniq, counts, classes, min_support, model_version, key_columns)
+
+    def matches(self, features: list[str] | None = None, model_version: str | None = None) -> bool:
+        """True if the index was built for this feature list and model version (None skips a check)"""
+        if features is not None and self.features != list(features):
+            return False
+        return model_version is None or getattr(self, 'model_version', '') == model_version
+
+    # ---------- Lookup ----------
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, X) -> np.ndarray:
+        """Pattern row for each input row, or -1 where there is no (well-supported) exact match"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        X = X[:, self._key_index]
+        out = np.full(len(X), -1, dtype=np.int64)
+        valid = self._valid(X)
+        if not valid.any() or len(self.keys) == 0:
+            return out
+        keys = self._encode(X[valid], self.binary_mask)
+        pos = np.clip(np.searchsorted(self.keys, keys), 0, len(self.keys) - 1)
+        found = self.keys[pos] == keys
+        pos = np.where(found, pos, -1)
+        if self.min_support > 1:
+            pos = np.where((pos >= 0) & (self.counts[np.maximum(pos, 0)].sum(axis=1) >= self.min_support), pos, -1)
+        out[valid] = pos
+        return out
+
+    def distribution(self, rows: np.ndarray) -> np.ndarray:
+        counts = self.counts[rows].astype(np.float64)
+        return counts / counts.sum(axis=1, keepdims=True)
+
+    def lookup_one(self, input_data: dict):
+        """(encoded_label, confidence_percent, distribution) for an exact match, else None"""
+        # Only the key columns count: a symptom_count entry (e.g. the Predictor's checkbox) is ignored
+        row = np.array([[input_data.get(c, 0) or 0 for c in self.key_columns]], dtype=np.float64)
+        if not self._valid(row)[0]:
+            return None
+        i = self._lookup.get(self._encode(row, self.binary_mask)[0].tobytes())
+        if i is None or self.counts[i].sum() < self.min_support:
+            return None
+        dist = self.distribution(np.array([i]))[0]
+        best = int(dist.argmax())
+        return self.classes_[best], float(dist[best] * 100.0), dist
+
+    def coverage(self, X) -> float:
+        hits = self.lookup(X) >= 0
+        return float(hits.mean()) if len(hits) else 0.0
+
+
+def predict_with_index(index: PatternIndex | None, model, X: pd.DataFrame, label_encoder=None):
+    """Like inference.predict_batch but exact matches come from the index.
+
+    Returns (diseases, confidence_percent, from_index mask).
+    """
+    n = len(X)
+    diseases = np.empty(n, dtype=object)
+    confidence = np.zeros(n, dtype=np.float64)
+    hit_rows = index.lookup(X.to_numpy()) if index is not None else np.full(n, -1)
+    hits = hit_rows >= 0
+    if hits.any():
+        dist = index.distribution(hit_rows[hits])
+        best = dist.argmax(axis=1)
+        diseases[hits] = decode_predictions(index.classes_[best], label_encoder)
+        confidence[hits] = dist[np.arange(len(best)), best] * 100.0
+    if (~hits).any():
+        _, _, d, c = predict_batch(model, X[~hits], label_encoder)
+        diseases[~hits] = d
+        confidence[~hits] = c
+    return diseases, confidence, hits
+
+
+def lookup_disease(index: PatternIndex | None, input_data: dict, label_encoder=None):
+    """(disease, confidence_percent) for an exact match, else None"""
+    hit = index.lookup_one(input_data) if index is not None else None
+    if hit is None:
+        return None
+    encoded, confidence, _ = hit
+    return str(decode_predictions([encoded], label_encoder)[0]), confidence
+
+
+def predict_one_with_index(index: PatternIndex | None, model, input_data: dict, features: list[str], label_encoder=None):
+    """(disease, confidence_percent, from_index) for one {feature: 0/1} mapping"""
+    hit = lookup_disease(index, input_data, label_encoder)
+    if hit is not None:
+        return hit[0], hit[1], True
+    disease, confidence, _ = predict_one(model, input_data, features, label_encoder)
+    return disease, confidence, False
+
+
+def load_index(path) -> PatternIndex | None:
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        index = joblib.load(path)
+        # Indexes from before key_columns keyed on symptom_count too and need rebuilding
+        return index if hasattr(index, 'key_columns') else None
+    except Exception:
+        return None
+
+
+# ---------- Reporting ----------
+
+def traffic_frame(path, features: list[str]) -> pd.DataFrame:
+    """Rows to replay: a symptom CSV, or the Predictor's prediction log (predictions.db)"""
+    path = Path(path)
+    if path.suffix == '.db':
+        try:
+            from .prediction_log import PredictionLog
+        except ImportError:
+            from prediction_log import PredictionLog
+        log = PredictionLog(path).between()
+        rows = [
+            {s.strip(): 1 for s in str(sel).split(';') if s.strip()}
+            for sel in log['selected_symptoms'].fillna('')
+        ]
+        return align_features(pd.DataFrame(rows), features)
+    return align_features(pd.read_csv(path).loc[:, lambda d: ~d.columns.str.contains('^Unnamed')], features)
+
+
+def coverage_report(index: PatternIndex, model, X: pd.DataFrame, label_encoder=None, sample: int = 200) -> dict:
+    """Coverage on `X`, index/model agreement on hits and per-row latency of each path"""
+    hit_rows = index.lookup(X.to_numpy())
+    hits = hit_rows >= 0
+    agreement = None
+    if hits.any():
+        model_labels = np.asarray(model.classes_)[np.asarray(model.predict_proba(X[hits])).argmax(axis=1)]
+        index_labels = index.classes_[index.distribution(hit_rows[hits]).argmax(axis=1)]
+        agreement = float((model_labels == index_labels).mean())
+
+    records = X.head(sample).to_dict('records')
+    features = list(X.columns)
+    predict_one(model, records[0], features, label_encoder)  # warm-up
+    start = time.perf_counter()
+    for r in records:
+        predict_one(model, r, features, label_encoder)
+    model_ms = (time.perf_counter() - start) / len(records) * 1000
+    start = time.perf_counter()
+    for r in records:
+        index.lookup_one(r)
+    index_ms = (time.perf_counter() - start) / len(records) * 1000
+
+    n_hits = int(hits.sum())
+    return {
+        'rows': int(len(X)),
+        'patterns_indexed': len(index),
+        'exact_hits': n_hits,
+        'coverage': n_hits / len(X) if len(X) else 0.0,
+        'agreement_with_model_on_hits': agreement,
+        'model_ms_per_row': model_ms,
+        'index_ms_per_row': index_ms,
+        'latency_saved_ms': n_hits * max(model_ms - index_ms, 0.0),
+    }
+
+
+def main(argv=None):
+    """Build the index or report its coverage on real traffic"""
+    parser = argparse.ArgumentParser(description="Exact-pattern lookup index")
+    parser.add_argument('--model', default=None, help="Model pickle whose features/predictions to use (default: champion)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    b = sub.add_parser('build', help="Build models/pattern_index.pkl from data/processed")
+    b.add_argument('-o', '--output', default=str(Path('models') / INDEX_FILENAME))
+    b.add_argument('--min-support', type=int, default=1, help="Training rows a pattern needs before it is trusted")
+    r = sub.add_parser('report', help="Coverage and latency saved on a traffic sample")
+    r.add_argument('--traffic', default=str(Path('data') / 'raw' / 'Testing.csv'))
+    r.add_argument('--index', default=str(Path('models') / INDEX_FILENAME))
+    args = parser.parse_args(argv)
+
+    try:
+        from .shared import load_artifacts, load_training_data
+    except ImportError:
+        from shared import load_artifacts, load_training_data
+    artifacts = load_artifacts()
+    model = joblib.load(args.model) if args.model else artifacts["model"]
+    model_version = file_sha256(args.model)[:16] if args.model else artifacts["model_version"]
+    features = artifacts["features"] or model_features(model)
+    if not features:
+        print("❌ Feature list is missing. Ensure artifacts exist in models/ and data/processed/ folders.")
+        sys.exit(1)
+
+    if args.command == 'build':
+        _, y_train, _, y_valid, X_all = load_training_data(None)
+        if not isinstance(X_all, pd.DataFrame) or y_train is None or y_valid is None:
+            print("❌ Training data not found under data/processed/")
+            sys.exit(1)
+        y_all = pd.concat([y_train, y_valid], ignore_index=True)
+        index = PatternIndex.build(X_all, y_all, features, min_support=args.min_support, model_version=model_version)
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(index, args.output)
+        print(f"✅ Indexed {len(X_all):,} rows as {len(index):,} distinct patterns → {args.output}")
+        return
+
+    index = load_index(args.index)
+    if index is None or model is None:
+        print("❌ Index or model missing; run `python -m src.pattern_index build` first")
+        sys.exit(1)
+    if not index.matches(model_version=model_version):
+        print(f"⚠️ Index was built for model version {getattr(index, 'model_version', '') or 'unknown'}, "
+              f"not {model_version}; the app ignores it until it is rebuilt")
+    X = traffic_frame(args.traffic, index.features)
+    report = coverage_report(index, model, X, artifacts["label_encoder"])
+    for k, v in report.items():
+        print(f"{k:>30}: {v:.4f}" if isinstance(v, float) else f"{k:>30}: {v}")
+
+
+if __name__ == "__main__":
+    # Run from the importable module so pickled objects don't reference __main__
+    try:
+        from src.pattern_index import main as _main
+    except ImportError:
+        from pattern_index import main as _main
+    _main()
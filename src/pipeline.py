@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Scripted training pipeline: the four notebooks as cached stages.
+
+    prepare  (data_preparation.ipynb)   data/raw/*.csv            → data/processed/{X,y}_{train,valid}.csv, ...
+    features (feature_selection.ipynb)  X_train.csv, y_train.csv  → models/selected_features.pkl, X_*_selected.csv
+    train    (model_training.ipynb)     X_*_selected.csv, y_*.csv → models/model_<name>.pkl, training_results.json
+    select   (model_selection.ipynb)    trained models, test set  → models/champion_model.pkl, championship_results.json
+
+Each stage declares its input and output files. Its cache key is the SHA-256 of the
+input files' contents, the stage parameters and the stage function's source; when
+the key matches the last run and the outputs are still the files that run wrote,
+the stage is skipped. Because keys use content rather than timestamps, a stage whose
+upstream re-ran but produced identical files is skipped too. Inside `train`, every
+model fit is memoized the same way, so changing one model's parameters refits only
+that model; the VotingEnsemble is then assembled from the fitted members (src/ensemble.py).
+Likewise `features` keeps each selector's per-feature scores (src/feature_selection.py),
+so changing k or min_votes re-votes without rescoring.
+
+    python -m src.pipeline                          # run what is out of date
+    python -m src.pipeline --status                 # show which stages would run
+    python -m src.pipeline --force features         # rerun one stage (and whatever its outputs change)
+    python -m src.pipeline --set RandomForest.n_estimators=200 --set features.k=50
+    python -m src.pipeline --model-params models/tuning/best_params.json   # hyperparameters from src.tuning
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+try:
+    from .artifact_registry import MANIFEST_FILENAME, build_manifest, write_manifest
+    from .data_cache import file_sha256
+    from . import training
+    from .train_scheduler import TrainingScheduler, job_costs
+    from .ensemble import build_ensemble
+    from . import feature_selection
+    from .feature_selection import FeatureSelectionEngine
+except ImportError:
+    from artifact_registry import MANIFEST_FILENAME, build_manifest, write_manifest
+    from data_cache import file_sha256
+    import training
+    from train_scheduler import TrainingScheduler, job_costs
+    from ensemble import build_ensemble
+    import feature_selection
+    from feature_selection import FeatureSelectionEngine
+
+CACHE_DIR = Path('.cache') / 'pipeline'
+STATE_FILENAME = 'state.json'
+SEED = training.SEED
+
+RAW = Path('data') / 'raw'
+PROC = Path('data') / 'processed'
+MODELS = Path('models')
+
+DEFAULT_PARAMS = {
+    'prepare': {'seed': SEED, 'test_size': 0.2, 'expected_columns': 133, 'rare_symptom_frequency': 0.01},
+    'features': dict(feature_selection.DEFAULT_PARAMS),
+    'train': {'models': list(training.MODEL_PARAMS), 'ensemble_size': training.ENSEMBLE_SIZE,
+              'cv_folds': training.CV_FOLDS, 'model_params': {}, 'cores': None,
+              'tune_weights': True, 'weight_grid_step': 0.1},
+    'select': {},
+}
+
+
+def _hash_json(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class Stage:
+    def __init__(self, name: str, run, inputs: list, outputs: list, params: dict, code=()):
+        self.name = name
+        self.run = run
+        # Modules/functions besides `run` whose source decides the outputs
+        self.code = tuple(code)
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.params = params
+
+    def key(self, base_dir: Path) -> str:
+        """Content hash of the inputs, parameters and stage code"""
+        return _hash_json({
+            'stage': self.name,
+            'code': [inspect.getsource(obj) for obj in (self.run, *self.code)],
+            'params': self.params,
+            'inputs': {p.as_posix(): file_sha256(base_dir / p) for p in self.inputs},
+        })
+
+    def output_hashes(self, base_dir: Path) -> dict:
+        return {p.as_posix(): file_sha256(base_dir / p) for p in self.outputs if (base_dir / p).exists()}
+
+
+class FitCache:
+    """Memoizes expensive results (fitted models with their metrics) by a hash of everything that produced them"""
+
+    def __init__(self, cache_dir: Path):
+        self.dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, label: str, key_parts) -> Path:
+        return self.dir / f"{label.lower()}-{_hash_json(key_parts)[:20]}.pkl"
+
+    def get(self, label: str, key_parts):
+        """Cached result, or None"""
+        path = self.path(label, key_parts)
+        if path.exists():
+            try:
+                result = joblib.load(path)
+                self.hits += 1
+                return result
+            except Exception:
+                pass
+        return None
+
+    def put(self, label: str, key_parts, result):
+        path = self.path(label, key_parts)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        joblib.dump(result, tmp)
+        tmp.replace(path)
+        self.misses += 1
+        return result
+
+    def get_or_compute(self, label: str, key_parts, fn):
+        result = self.get(label, key_parts)
+        return result if result is not None else self.put(label, key_parts, fn())
+
+
+# ---------- Stages ----------
+
+def prepare_data(base_dir: Path, params: dict, cache: FitCache):
+    """data_preparation.ipynb: encode labels, engineer features, stratified train/valid split"""
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    train_df = pd.read_csv(base_dir / RAW / 'Training.csv')
+    test_df = pd.read_csv(base_dir / RAW / 'Testing.csv')
+    # Drop unnamed extra index columns that may appear if CSV saved with indices
+    train_df = train_df.loc[:, ~train_df.columns.str.contains('^Unnamed')]
+    test_df = test_df.loc[:, ~test_df.columns.str.contains('^Unnamed')]
+    if train_df.shape[1] != params['expected_columns']:
+        raise ValueError(f"Unexpected columns count: {train_df.shape[1]} (expected {params['expected_columns']})")
+    # Missing symptom values mean the symptom is absent
+    train_df = train_df.fillna(0)
+    test_df = test_df.fillna(0)
+
+    le = LabelEncoder()
+    train_df['prognosis'] = le.fit_transform(train_df['prognosis'])
+    test_df['prognosis'] = le.transform(test_df['prognosis'])
+    joblib.dump(le, base_dir / PROC / 'label_encoder.pkl')
+
+    symptom_cols = train_df.columns.difference(['prognosis'])
+    for col in symptom_cols:
+        if train_df[col].dtype == object:
+            mapping = {'present': 1, 'absent': 0, 'yes': 1, 'no': 0}
+            train_df[col] = train_df[col].replace(mapping).astype(int)
+            test_df[col] = test_df[col].replace(mapping).astype(int)
+
+    train_df['symptom_count'] = train_df[symptom_cols].sum(axis=1)
+    test_df['symptom_count'] = test_df[symptom_cols].sum(axis=1)
+    symptom_freq = train_df[symptom_cols].mean()
+    rare_symptoms = symptom_freq[symptom_freq < params['rare_symptom_frequency']].index.tolist()
+    train_df['rare_symptom_flag'] = train_df[rare_symptoms].any(axis=1).astype(int)
+    test_df['rare_symptom_flag'] = test_df[rare_symptoms].any(axis=1).astype(int)
+    if {'fever', 'cough'}.issubset(symptom_cols):
+        train_df['fever_cough'] = train_df['fever'] & train_df['cough']
+        test_df['fever_cough'] = test_df['fever'] & test_df['cough']
+
+    X = train_df.drop('prognosis', axis=1)
+    y = train_df['prognosis']
+    X_train, X_valid, y_train, y_valid = train_test_split(
+        X, y, test_size=params['test_size'], stratify=y, random_state=params['seed']
+    )
+    X_train.to_csv(base_dir / PROC / 'X_train.csv', index=False)
+    X_valid.to_csv(base_dir / PROC / 'X_valid.csv', index=False)
+    y_train.to_csv(base_dir / PROC / 'y_train.csv', index=False)
+    y_valid.to_csv(base_dir / PROC / 'y_valid.csv', index=False)
+    test_df.to_csv(base_dir / PROC / 'test_processed.csv', index=False)
+    print(f"   Train {X_train.shape} • valid {X_valid.shape} • {len(le.classes_)} classes")
+
+
+def select_features(base_dir: Path, params: dict, cache: FitCache):
+    """feature_selection.ipynb: five selectors vote; features with ≥ min_votes are kept"""
+    X_train = pd.read_csv(base_dir / PROC / 'X_train.csv')
+    y_train = pd.read_csv(base_dir / PROC / 'y_train.csv').squeeze()
+    X_valid = pd.read_csv(base_dir / PROC / 'X_valid.csv')
+
+    # Per-method scores are cached by data fingerprint, so a k / min_votes change only re-votes
+    engine = FeatureSelectionEngine(base_dir / feature_selection.CACHE_DIR)
+    consensus_df, final_features, _ = engine.select(X_train, y_train, params)
+    feature_selection.write_outputs(base_dir, X_train, X_valid, consensus_df, final_features)
+    if engine.reused:
+        print(f"   ♻️  cached scores: {', '.join(engine.reused)}")
+    print(f"   {X_train.shape[1]} → {len(final_features)} features")
+
+
+def load_training_frames(base_dir: Path):
+    """(X_train, y_train, X_valid, y_valid) on the selected features"""
+    paths = [base_dir / PROC / n for n in ('X_train_selected.csv', 'y_train.csv', 'X_valid_selected.csv', 'y_valid.csv')]
+    missing = [p.as_posix() for p in paths if not p.exists()]
+    if missing:
+        raise FileNotFoundError(f"missing {', '.join(missing)}; run `python -m src.pipeline --only prepare features` first")
+    X_train, y_train, X_valid, y_valid = (pd.read_csv(p) for p in paths)
+    return X_train, y_train.squeeze(), X_valid, y_valid.squeeze()
+
+
+def train_models(base_dir: Path, params: dict, cache: FitCache):
+    """model_training.ipynb: fit and cross-validate each family, then soft-vote the top ensemble_size"""
+    X_train, y_train, X_valid, y_valid = load_training_frames(base_dir)
+    inputs = ['X_train_selected.csv', 'y_train.csv', 'X_valid_selected.csv', 'y_valid.csv']
+    data_key = {name: file_sha256(base_dir / PROC / name) for name in inputs}
+    code_key = [inspect.getsource(training), inspect.getsource(inspect.getmodule(TrainingScheduler))]
+
+    trained, fit_keys, missing = {}, {}, {}
+    for name in params['models']:
+        model_params = params['model_params'].get(name, {})
+        fit_keys[name] = [name, model_params, params['cv_folds'], data_key, code_key]
+        trained[name] = cache.get(name, fit_keys[name])
+        if trained[name] is None:
+            missing[name] = model_params
+    if missing:
+        # Uncached families train together as model × fold jobs under one core budget
+        scheduler = TrainingScheduler(params['cores'], params['cv_folds'],
+                                      job_costs(missing, base_dir / MODELS / 'championship_results.json', params['cv_folds']))
+        for name, results in scheduler.run(missing, X_train, y_train, X_valid, y_valid).items():
+            trained[name] = cache.put(name, fit_keys[name], results)
+    fits = {name: cache.path(name, fit_keys[name]).name for name in fit_keys}
+
+    # Assembled from the fitted members and their out-of-fold probabilities; nothing is refit
+    best = sorted(trained.items(), key=lambda x: x[1]['cv_mean'], reverse=True)[:params['ensemble_size']]
+    if len(best) > 1:
+        trained[training.ENSEMBLE_NAME] = build_ensemble(
+            dict(best), X_train, y_train, X_valid, y_valid, params['tune_weights'], params['weight_grid_step'],
+        )
+
+    for name, results in trained.items():
+        joblib.dump(results['model'], base_dir / MODELS / f"model_{name.lower()}.pkl")
+    (base_dir / MODELS / 'training_results.json').write_text(
+        json.dumps(training.training_summary(trained), indent=2), encoding='utf-8'
+    )
+    return {'fits': fits}
+
+
+def cached_base_models(base_dir) -> dict:
+    """{name: fit results} for the base models of the last `train` run, read from the fit cache"""
+    cache_dir = Path(base_dir) / CACHE_DIR
+    fits = _read_state(cache_dir / STATE_FILENAME).get('train', {}).get('fits', {})
+    loaded = {}
+    for name, filename in fits.items():
+        path = cache_dir / 'fits' / filename
+        if path.exists():
+            loaded[name] = joblib.load(path)
+    return loaded
+
+
+def select_champion(base_dir: Path, params: dict, cache: FitCache):
+    """model_selection.ipynb: best validation accuracy wins; scored on the held-out test set"""
+    from sklearn.metrics import accuracy_score
+
+    training_results = json.loads((base_dir / MODELS / 'training_results.json').read_text(encoding='utf-8'))
+    comparison_df = pd.DataFrame(training_results).T.sort_values('valid_accuracy', ascending=False, kind='stable')
+    champion_name = comparison_df.index[0]
+    champion_model = joblib.load(base_dir / MODELS / f"model_{champion_name.lower()}.pkl")
+    champion_accuracy = comparison_df.iloc[0]['valid_accuracy']
+
+    test_df = pd.read_csv(base_dir / PROC / 'test_processed.csv')
+    selected_features = joblib.load(base_dir / MODELS / 'selected_features.pkl')
+    X_test = test_df.drop('prognosis', axis=1)[selected_features]
+    test_predictions = np.asarray(champion_model.predict(X_test)).ravel()
+    test_accuracy = accuracy_score(test_df['prognosis'], test_predictions)
+
+    joblib.dump(champion_model, base_dir / MODELS / 'champion_model.pkl')
+    pd.DataFrame({'prediction': test_predictions}).to_csv(base_dir / 'predictions.csv', index=False)
+    final_summary = {
+        'champion_model': champion_name,
+        'validation_accuracy': float(champion_accuracy),
+        'test_accuracy': float(test_accuracy),
+        'all_model_results': training_results,
+        'features_used': len(selected_features),
+        'test_samples': int(len(X_test)),
+    }
+    (base_dir / MODELS / 'championship_results.json').write_text(json.dumps(final_summary, indent=2), encoding='utf-8')
+    print(f"   Champion {champion_name} • valid {champion_accuracy:.4f} • test {test_accuracy:.4f}")
+
+    # The app loads whatever an existing manifest names (possibly an online update under models/online/),
+    # so a new champion is only served once the manifest points back at it
+    manifest_path = base_dir / MODELS / MANIFEST_FILENAME
+    if manifest_path.exists():
+        write_manifest(build_manifest(base_dir), manifest_path)
+        print(f"   {manifest_path.as_posix()} now serves champion_model.pkl")
+
+
+def build_stages(params: dict) -> list[Stage]:
+    model_names = list(params['train']['models'])
+    trained = [MODELS / f"model_{n.lower()}.pkl" for n in model_names]
+    if len(model_names) > 1 and params['train']['ensemble_size'] > 1:
+        trained.append(MODELS / f"model_{training.ENSEMBLE_NAME.lower()}.pkl")
+    return [
+        Stage('prepare', prepare_data,
+              [RAW / 'Training.csv', RAW / 'Testing.csv'],
+              [PROC / n for n in ('label_encoder.pkl', 'X_train.csv', 'X_valid.csv', 'y_train.csv', 'y_valid.csv',
+                                  'test_processed.csv')],
+              params['prepare']),
+        Stage('features', select_features,
+              [PROC / 'X_train.csv', PROC / 'y_train.csv', PROC / 'X_valid.csv'],
+              [MODELS / 'selected_features.pkl', MODELS / 'selected_features.csv', MODELS / 'feature_consensus.csv',
+               MODELS / 'feature_selection_summary.json', PROC / 'X_train_selected.csv', PROC / 'X_valid_selected.csv'],
+              params['features'], code=[feature_selection]),
+        Stage('train', train_models,
+              [PROC / 'X_train_selected.csv', PROC / 'y_train.csv', PROC / 'X_valid_selected.csv', PROC / 'y_valid.csv'],
+              trained + [MODELS / 'training_results.json'],
+              params['train'], code=[training, TrainingScheduler, build_ensemble]),
+        Stage('select', select_champion,
+              trained + [MODELS / 'training_results.json', MODELS / 'selected_features.pkl', PROC / 'test_processed.csv'],
+              [MODELS / 'champion_model.pkl', MODELS / 'championship_results.json', Path('predictions.csv')],
+              params['select']),
+    ]
+
+
+# ---------- Runner ----------
+
+def _read_state(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except Exception:
+        return {}
+
+
+def _write_state(path: Path, state: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(state, indent=2), encoding='utf-8')
+    tmp.replace(path)
+
+
+def stage_status(stage: Stage, base_dir: Path, state: dict) -> str:
+    """'up to date', or why the stage has to run"""
+    missing = [p.as_posix() for p in stage.inputs if not (base_dir / p).exists()]
+    if missing:
+        return f"waiting for {', '.join(missing)}"
+    recorded = state.get(stage.name)
+    if not recorded:
+        return 'never run'
+    if recorded.get('key') != stage.key(base_dir):
+        return 'inputs, parameters or code changed'
+    if recorded.get('outputs') != stage.output_hashes(base_dir):
+        return 'outputs missing or modified'
+    return 'up to date'
+
+
+def run_pipeline(base_dir, params: dict | None = None, force=(), only=None, cache_dir=None) -> list[dict]:
+    """Run every out-of-date stage in order; returns one {stage, status, seconds} row per stage"""
+    base_dir = Path(base_dir)
+    params = merge_params(DEFAULT_PARAMS, params or {})
+    cache_dir = Path(cache_dir) if cache_dir else base_dir / CACHE_DIR
+    state_path = cache_dir / STATE_FILENAME
+    state = _read_state(state_path)
+    cache = FitCache(cache_dir / 'fits')
+    (base_dir / PROC).mkdir(parents=True, exist_ok=True)
+    (base_dir / MODELS).mkdir(parents=True, exist_ok=True)
+
+    report = []
+    for stage in build_stages(params):
+        if only and stage.name not in only:
+            continue
+        start = time.perf_counter()
+        status = stage_status(stage, base_dir, state)
+        if status == 'up to date' and stage.name not in force:
+            report.append({'stage': stage.name, 'status': 'skipped', 'seconds': time.perf_counter() - start})
+            print(f"⏭️  {stage.name:<9} up to date")
+            continue
+        if status.startswith('waiting'):
+            raise FileNotFoundError(f"{stage.name}: {status}")
+        print(f"🚀 {stage.name:<9} running ({'forced' if stage.name in force else status})")
+        hits, misses = cache.hits, cache.misses
+        extra = stage.run(base_dir, stage.params, cache) or {}
+        state[stage.name] = {
+            'key': stage.key(base_dir),
+            'outputs': stage.output_hashes(base_dir),
+            'seconds': time.perf_counter() - start,
+            'finished_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            **extra,
+        }
+        _write_state(state_path, state)
+        row = {'stage': stage.name, 'status': 'ran', 'seconds': time.perf_counter() - start}
+        if cache.hits + cache.misses > hits + misses:
+            row['fits_reused'] = cache.hits - hits
+            row['fits_computed'] = cache.misses - misses
+        report.append(row)
+        print(f"✅ {stage.name:<9} finished in {row['seconds']:.2f}s")
+    return report
+
+
+def merge_params(defaults: dict, overrides: dict) -> dict:
+    merged = json.loads(json.dumps(defaults))
+    for stage, values in overrides.items():
+        merged.setdefault(stage, {}).update(values)
+    return merged
+
+
+def parse_override(text: str) -> tuple[str, str, object]:
+    """'features.k=50' → ('features', 'k', 50); '<ModelFamily>.<param>=v' targets train.model_params"""
+    target, _, raw = text.partition('=')
+    scope, _, name = target.partition('.')
+    if not name or not raw:
+        raise ValueError(f"expected <stage|model>.<param>=<value>, got {text!r}")
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError:
+        value = raw
+    return scope, name, value
+
+
+def main(argv=None):
+    """Run the training pipeline, skipping stages whose inputs are unchanged"""
+    parser = argparse.ArgumentParser(description="Cached training pipeline (prepare → features → train → select)")
+    parser.add_argument('--base-dir', default='.', help="Directory containing data/ and models/")
+    parser.add_argument('--status', action='store_true', help="Show which stages are out of date and exit")
+    parser.add_argument('--force', nargs='+', default=[], metavar='STAGE', help="Rerun these stages regardless")
+    parser.add_argument('--only', nargs='+', default=None, metavar='STAGE', help="Run only these stages")
+    parser.add_argument('--models', nargs='+', default=None, help=f"Model families (default: {' '.join(training.MODEL_PARAMS)})")
+    parser.add_argument('--set', action='append', default=[], metavar='SCOPE.PARAM=VALUE',
+                        help="Override a stage parameter (features.k=50) or model hyperparameter (XGBoost.max_depth=4)")
+    parser.add_argument('--model-params', default=None, metavar='JSON',
+                        help="{family: hyperparameters} file, e.g. models/tuning/best_params.json from src.tuning")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    try:
+        if args.model_params:
+            tuned = json.loads(Path(args.model_params).read_text(encoding='utf-8'))
+            unknown = [name for name in tuned if name not in training.MODEL_PARAMS]
+            if unknown:
+                raise ValueError(f"unknown model family {unknown[0]!r} in {args.model_params}")
+            overrides['train'] = {'model_params': tuned}
+        for text in args.set:
+            scope, name, value = parse_override(text)
+            if scope in DEFAULT_PARAMS:
+                overrides.setdefault(scope, {})[name] = value
+            elif scope in training.MODEL_PARAMS:
+                model_params = overrides.setdefault('train', {}).setdefault('model_params', {})
+                model_params.setdefault(scope, {})[name] = value
+            else:
+                raise ValueError(f"unknown stage or model family {scope!r}")
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if args.models:
+        overrides.setdefault('train', {})['models'] = args.models
+    base_dir = Path(args.base_dir)
+
+    if args.status:
+        params = merge_params(DEFAULT_PARAMS, overrides)
+        state = _read_state(base_dir / CACHE_DIR / STATE_FILENAME)
+        for stage in build_stages(params):
+            print(f"{stage.name:<9} {stage_status(stage, base_dir, state)}")
+        return
+
+    start = time.perf_counter()
+    try:
+        report = run_pipeline(base_dir, overrides, set(args.force), set(args.only) if args.only else None)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"\n🏁 Pipeline finished in {time.perf_counter() - start:.2f}s")
+    print(pd.DataFrame(report).set_index('stage').round(2).fillna('').to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Process-wide prediction cache shared by every Streamlit session.
+
+Keys are the model version plus the symptom vector packed into a bitmask
+(8 symptoms per byte), so identical symptom combinations from any session —
+presets, common flu-like patterns — are answered without running the model.
+Entries expire after a TTL and the least recently used entry is evicted once the
+cache is full.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    from .symptom_matrix import pack_rows
+    from .inference import feature_row, predict_one
+except ImportError:
+    from symptom_matrix import pack_rows
+    from inference import feature_row, predict_one
+
+DEFAULT_MAXSIZE = 4096
+DEFAULT_TTL_SECONDS = 3600.0
+
+
+def symptom_key(input_data: dict, features: list[str], model_version: str = '') -> tuple:
+    """Hashable key: model version + the packed 0/1 row that is scored (raw bytes if any value is not 0/1)"""
+    # feature_row derives symptom_count exactly as predict_one does, so inputs that score differently never share a key
+    row = feature_row(input_data, features)
+    if np.isin(row, (0.0, 1.0)).all():
+        body = pack_rows(row).tobytes()
+    else:
+        body = row.tobytes()
+    return (model_version, len(features), body)
+
+
+class PredictionCache:
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl_seconds: float | None = DEFAULT_TTL_SECONDS):
+        self.maxsize = int(maxsize)
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Cached value or None; expired entries count as misses"""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires, value = item
+                if expires is None or expires > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        expires = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            # Computed outside the lock: two sessions may both miss, but neither blocks the other
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._data)
+        lookups = self.hits + self.misses
+        return {
+            'size': size,
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def cached_predict_one(cache: PredictionCache, model, input_data: dict, features: list[str],
+                       label_encoder=None, model_version: str = ''):
+    """predict_one() through the cache; returns (disease, confidence_percent, probabilities)"""
+    key = symptom_key(input_data, features, model_version)
+
+    def compute():
+        disease, confidence, proba = predict_one(model, input_data, features, label_encoder)
+        proba = np.array(proba, copy=True)
+        proba.setflags(write=False)
+        return disease, confidence, proba
+
+    return cache.get_or_compute(key, compute)
@@ -0,0 +1,176 @@
+"""
+Append-only prediction log backed by SQLite in WAL mode.
+
+Replaces the read-concat-rewrite cycle on predictions.csv: every prediction is a
+single indexed INSERT, "most recent N" walks the primary key backwards and
+time-range queries use the timestamp index. WAL lets many Streamlit sessions
+write concurrently while readers keep going. Diagnoses confirmed later are appended
+to a separate confirmations table, so consumers can read only the labels added
+since their last run.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from .inference import match_labels
+except ImportError:
+    from inference import match_labels
+
+COLUMNS = ['timestamp', 'predicted_disease', 'confidence_percent', 'num_symptoms', 'selected_symptoms']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    predicted_disease TEXT,
+    confidence_percent REAL,
+    num_symptoms INTEGER,
+    selected_symptoms TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp);
+CREATE TABLE IF NOT EXISTS confirmations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    prediction_id INTEGER NOT NULL REFERENCES predictions (id),
+    confirmed_disease TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+"""
+
+INSERT_SQL = f"INSERT INTO predictions ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?)"
+CONFIRMED_COLUMNS = ['confirmation_id', 'prediction_id', 'selected_symptoms', 'predicted_disease', 'confirmed_disease']
+
+
+def to_utc_iso(ts) -> str:
+    """Fixed-width UTC ISO string so lexical order in SQLite matches time order"""
+    ts = pd.Timestamp(ts)
+    ts = ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+    return ts.strftime('%Y-%m-%dT%H:%M:%S.%f+00:00')
+
+
+class PredictionLog:
+    def __init__(self, path, busy_timeout_ms: int = 5000):
+        self.path = Path(path)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are bound to their thread; Streamlit runs each session in its own
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(record: dict) -> tuple:
+        confidence = record.get('confidence_percent')
+        return (
+            to_utc_iso(record.get('timestamp') or pd.Timestamp.now(tz='UTC')),
+            record.get('predicted_disease'),
+            None if confidence is None or pd.isna(confidence) else float(confidence),
+            int(record.get('num_symptoms') or 0),
+            record.get('selected_symptoms') or '',
+        )
+
+    def append(self, record: dict) -> int:
+        """Insert one prediction and return its row id"""
+        cur = self._conn().execute(INSERT_SQL, self._row(record))
+        return int(cur.lastrowid)
+
+    def append_many(self, records) -> int:
+        rows = [self._row(r) for r in records]
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN')
+            conn.executemany(INSERT_SQL, rows)
+        return len(rows)
+
+    def recent(self, n: int = 5) -> pd.DataFrame:
+        """Last `n` predictions in chronological order"""
+        rows = self._conn().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM predictions ORDER BY id DESC LIMIT ?", (int(n),)
+        ).fetchall()
+        return pd.DataFrame(rows[::-1], columns=COLUMNS)
+
+    def between(self, start=None, end=None) -> pd.DataFrame:
+        """Predictions with start <= timestamp < end (either bound may be None)"""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append('timestamp >= ?')
+            params.append(to_utc_iso(start))
+        if end is not None:
+            clauses.append('timestamp < ?')
+            params.append(to_utc_iso(end))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._conn().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM predictions {where} ORDER BY timestamp, id", params
+        ).fetchall()
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def count(self) -> int:
+        return int(self._conn().execute('SELECT COUNT(*) FROM predictions').fetchone()[0])
+
+    def confirm(self, prediction_id: int, disease: str, timestamp=None, classes=None) -> int:
+        """Record the clinician-confirmed diagnosis for a logged prediction; returns the confirmation id.
+
+        With `classes` (the label encoder's), the disease is stored as spelled there and an unknown one is a ValueError.
+        """
+        if classes is not None:
+            matched = match_labels([disease], classes)[0]
+            if matched is None:
+                raise ValueError(f"Unknown disease {disease!r}")
+            disease = matched
+        conn = self._conn()
+        if conn.execute('SELECT 1 FROM predictions WHERE id = ?', (int(prediction_id),)).fetchone() is None:
+            raise KeyError(f"No prediction with id {prediction_id}")
+        cur = conn.execute(
+            'INSERT INTO confirmations (prediction_id, confirmed_disease, timestamp) VALUES (?, ?, ?)',
+            (int(prediction_id), str(disease), to_utc_iso(timestamp or pd.Timestamp.now(tz='UTC'))),
+        )
+        return int(cur.lastrowid)
+
+    def confirmed(self, after_id: int = 0) -> pd.DataFrame:
+        """Confirmed predictions with confirmation id > `after_id`, oldest first"""
+        rows = self._conn().execute(
+            "SELECT c.id, p.id, p.selected_symptoms, p.predicted_disease, c.confirmed_disease "
+            "FROM confirmations c JOIN predictions p ON p.id = c.prediction_id WHERE c.id > ? ORDER BY c.id",
+            (int(after_id),),
+        ).fetchall()
+        return pd.DataFrame(rows, columns=CONFIRMED_COLUMNS)
+
+    def import_csv(self, csv_path) -> int:
+        """One-off migration of a legacy predictions.csv written by the Predictor page"""
+        csv_path = Path(csv_path)
+        if not csv_path.exists():
+            return 0
+        df = pd.read_csv(csv_path)
+        if 'timestamp' not in df.columns or 'predicted_disease' not in df.columns:
+            return 0
+        return self.append_many(df.reindex(columns=COLUMNS).to_dict('records'))
+
+    def export_csv(self, csv_path) -> int:
+        df = self.between()
+        df.to_csv(csv_path, index=False, encoding='utf-8')
+        return len(df)
+
+
+def open_prediction_log(db_path, legacy_csv=None) -> PredictionLog:
+    """Open (creating if needed) the log at `db_path`, importing `legacy_csv` the first time"""
+    is_new = not Path(db_path).exists()
+    log = PredictionLog(db_path)
+    if is_new and legacy_csv is not None:
+        try:
+            log.import_csv(legacy_csv)
+        except Exception:
+            pass
+    return log
@@ -4,6 +4,34 @@ import numpy as np
 import joblib
 from pathlib import Path
 import time
+try:
+    from .prediction_log import open_prediction_log
+    from .symptom_matrix import SymptomMatrix
+    from .data_cache import read_processed_csv, file_sha256
+    from .analytics_summary import SUMMARY_FILENAME, build_analytics_summary, data_fingerprint, load_summary, save_summary
+    from .tree_compiler import compile_model
+    from .prediction_cache import PredictionCache
+    from .pattern_index import INDEX_FILENAME, load_index
+    from .similar_cases import SimilarCaseIndex
+    from .tracing import TRACER, span
+    from .artifact_registry import MANIFEST_FILENAME, load_registered, version_mismatches
+    from .worker_pool import InferencePool, pool_size_from_env
+    from .multi_model import load_scorer, models_from_env, weights_from_env
+    from .cascade import cascade_from_env, load_cascade
+except ImportError:
+    from prediction_log import open_prediction_log
+    from symptom_matrix import SymptomMatrix
+    from data_cache import read_processed_csv, file_sha256
+    from analytics_summary import SUMMARY_FILENAME, build_analytics_summary, data_fingerprint, load_summary, save_summary
+    from tree_compiler import compile_model
+    from prediction_cache import PredictionCache
+    from pattern_index import INDEX_FILENAME, load_index
+    from similar_cases import SimilarCaseIndex
+    from tracing import TRACER, span
+    from artifact_registry import MANIFEST_FILENAME, load_registered, version_mismatches
+    from worker_pool import InferencePool, pool_size_from_env
+    from multi_model import load_scorer, models_from_env, weights_from_env
+    from cascade import cascade_from_env, load_cascade
 
 # ---------- Theme & Page ----------
 
@@ -103,6 +131,7 @@ footer { visibility: hidden; }
 
 def set_page(title: str, icon: str):
     st.set_page_config(page_title=title, page_icon=icon, layout="wide", initial_sidebar_state="expanded")
+    start_metrics_exporter()
 
 def inject_theme():
     st.markdown(THEME_CSS, unsafe_allow_html=True)
@@ -151,8 +180,42 @@ def safe_dataframe_display(df: pd.DataFrame, title: str = "Data", max_rows: int
 
 # ---------- Loaders ----------
 
+def find_base_dir(marker: Path) -> Path:
+    # Same probing order as the loaders below: cwd, repo root, Docker /app
+    for candidate in [Path.cwd(), Path(__file__).resolve().parent.parent, Path('/app')]:
+        if (candidate / marker).exists():
+            return candidate
+    return Path.cwd()
+
 @st.cache_resource
 def load_artifacts():
+    # models/manifest.json (python -m src.artifact_registry build) names every artifact with its
+    # hash; without one, fall back to probing the usual locations
+    loaded = None
+    manifest_path = find_base_dir(Path('models') / MANIFEST_FILENAME) / 'models' / MANIFEST_FILENAME
+    if manifest_path.exists():
+        try:
+            with span('load_artifacts.load_registered'):
+                loaded = load_registered(manifest_path)
+            for name, (recorded, installed) in version_mismatches(loaded['manifest']).items():
+                st.warning(f"Artifacts were built with {name} {recorded}; {installed or 'no version'} is installed")
+        except Exception as e:
+            st.warning(f"Could not load artifacts listed in {manifest_path}: {e}")
+            loaded = None
+    if loaded is None:
+        loaded = probe_artifacts()
+
+    with span('load_artifacts.compile_model'):
+        fast_model = compile_fast_model(loaded["model"])
+    return {
+        "model": loaded["model"],
+        "features": loaded["features"] or [],
+        "label_encoder": loaded["label_encoder"],
+        "fast_model": fast_model,
+        "model_version": loaded["model_version"] or "",
+    }
+
+def probe_artifacts():
     # Try multiple base directory strategies for deployment compatibility
     possible_base_dirs = [
         Path.cwd(),  # Current working directory (most reliable for deployment)
@@ -160,16 +223,17 @@ def load_artifacts():
         Path('/app'),  # Docker container app directory
     ]
     
-    # Find the correct base directory
-    base_dir = None
-    for candidate in possible_base_dirs:
-        if (candidate / 'models' / 'champion_model.pkl').exists():
-            base_dir = candidate
-            break
+    with span('load_artifacts.resolve_paths'):
+        # Find the correct base directory
+        base_dir = None
+        for candidate in possible_base_dirs:
+            if (candidate / 'models' / 'champion_model.pkl').exists():
+                base_dir = candidate
+                break
     
-    # If no base directory found, use current working directory
-    if base_dir is None:
-        base_dir = Path.cwd()
+        # If no base directory found, use current working directory
+        if base_dir is None:
+            base_dir = Path.cwd()
     
     candidates_model = [
         base_dir / 'models' / 'champion_model.pkl',
@@ -190,53 +254,80 @@ def load_artifacts():
         Path('data') / 'processed' / 'label_encoder.pkl',
     ]
 
-    model = None
-    try:
-        for p in candidates_model:
-            if p.exists():
-                model = joblib.load(p)
-                break
-    except Exception as e:
-        st.error(f"Failed to load model: {e}")
-
-    features = None
-    for p in candidates_features:
+    with span('load_artifacts.load_model'):
+        model = None
+        model_version = None
         try:
-            if p.exists() and p.suffix == '.pkl':
-                features = joblib.load(p)
-                break
-            if p.exists() and p.suffix == '.csv':
-                df_feats = pd.read_csv(p)
-                features = df_feats.iloc[:, 0].tolist() if df_feats.shape[1] == 1 else df_feats.columns.tolist()
-                break
-        except Exception:
-            continue
+            for p in candidates_model:
+                if p.exists():
+                    model = joblib.load(p)
+                    model_version = file_sha256(p)[:16]
+                    break
+        except Exception as e:
+            st.error(f"Failed to load model: {e}")
+
+    with span('load_artifacts.load_features'):
+        features = None
+        for p in candidates_features:
+            try:
+                if p.exists() and p.suffix == '.pkl':
+                    features = joblib.load(p)
+                    break
+                if p.exists() and p.suffix == '.csv':
+                    df_feats = pd.read_csv(p)
+                    features = df_feats.iloc[:, 0].tolist() if df_feats.shape[1] == 1 else df_feats.columns.tolist()
+                    break
+            except Exception:
+                continue
 
-    label_encoder = None
-    try:
-        for p in candidates_label:
-            if p.exists():
-                label_encoder = joblib.load(p)
-                break
-    except Exception as e:
-        st.warning(f"Could not load label encoder: {e}")
-
-    # Debug information for deployment troubleshooting
-    debug_info = {
-        "base_dir": str(base_dir),
-        "model_found": model is not None,
-        "features_found": features is not None and len(features) > 0,
-        "label_encoder_found": label_encoder is not None,
-        "model_path": str(next((p for p in candidates_model if p.exists()), "Not found")),
-        "features_path": str(next((p for p in candidates_features if p.exists()), "Not found")),
-        "label_encoder_path": str(next((p for p in candidates_label if p.exists()), "Not found"))
-    }
+    with span('load_artifacts.load_label_encoder'):
+        label_encoder = None
+        try:
+            for p in candidates_label:
+                if p.exists():
+                    label_encoder = joblib.load(p)
+                    break
+        except Exception as e:
+            st.warning(f"Could not load label encoder: {e}")
+
+    with span('load_artifacts.debug_info'):
+        # Debug information for deployment troubleshooting
+        debug_info = {
+            "base_dir": str(base_dir),
+            "model_found": model is not None,
+            "features_found": features is not None and len(features) > 0,
+            "label_encoder_found": label_encoder is not None,
+            "model_path": str(next((p for p in candidates_model if p.exists()), "Not found")),
+            "features_path": str(next((p for p in candidates_features if p.exists()), "Not found")),
+            "label_encoder_path": str(next((p for p in candidates_label if p.exists()), "Not found"))
+        }
     
     # Log debug info in case of issues (only show in development)
     if model is None or not features:
         st.warning(f"Debug info: {debug_info}")
-    
-    return {"model": model, "features": features or [], "label_encoder": label_encoder}
+
+    return {
+        "model": model,
+        "features": features or [],
+        "label_encoder": label_encoder,
+        "model_version": model_version,
+    }
+
+def compile_fast_model(model):
+    # NumPy node-table version of the champion for single-row scoring; only used if it
+    # reproduces the original probabilities on a probe batch
+    if model is None:
+        return None
+    try:
+        compiled = compile_model(model)
+        rng = np.random.default_rng(0)
+        probe = (rng.random((64, compiled.n_features_in_)) < 0.1).astype(np.int64)
+        probe = pd.DataFrame(probe, columns=compiled.feature_names_)
+        if np.allclose(np.asarray(model.predict_proba(probe)), compiled.predict_proba(probe), atol=1e-6):
+            return compiled
+    except Exception:
+        pass
+    return None
 
 @st.cache_data
 def load_training_data(expected_features: list[str] | None):
@@ -258,7 +349,9 @@ def load_training_data(expected_features: list[str] | None):
     if base_dir is None:
         base_dir = Path.cwd()
     def read_csv(path: Path):
-        return pd.read_csv(path) if path.exists() else None
+        # Served from data/processed/.cache once parsed; falls back to pd.read_csv
+        with span(f'load_training_data.read_csv.{path.stem}'):
+            return read_processed_csv(path)
     X_train = read_csv(base_dir / 'data' / 'processed' / 'X_train.csv')
     y_train = read_csv(base_dir / 'data' / 'processed' / 'y_train.csv')
     X_valid = read_csv(base_dir / 'data' / 'processed' / 'X_valid.csv')
@@ -281,15 +374,146 @@ def load_training_data(expected_features: list[str] | None):
         except Exception:
             pass
 
+    with span('load_training_data.concat'):
+        try:
+            if isinstance(X_train, pd.DataFrame) and isinstance(X_valid, pd.DataFrame):
+                X_all = pd.concat([X_train, X_valid], ignore_index=True)
+            else:
+                X_all = X_train if isinstance(X_train, pd.DataFrame) else X_valid
+        except Exception:
+            X_all = None
+
+    return X_train, y_train_s, X_valid, y_valid_s, X_all
+
+@st.cache_resource
+def load_symptom_matrix(expected_features: list[str] | None):
+    # Bit-packed counterpart of load_training_data's X_all/y_all, built chunk by chunk from the CSVs
+    proc = find_base_dir(Path('data') / 'processed' / 'X_train.csv') / 'data' / 'processed'
+    parts = []
+    for split in ('train', 'valid'):
+        X_path, y_path = proc / f'X_{split}.csv', proc / f'y_{split}.csv'
+        if X_path.exists():
+            parts.append(SymptomMatrix.from_csv(
+                X_path,
+                label_path=y_path if y_path.exists() else None,
+                columns=expected_features or None,
+            ))
+    return SymptomMatrix.concat(parts) if parts else None
+
+@st.cache_resource
+def load_analytics_summary(expected_features: list[str] | None):
+    # Precomputed Analytics aggregates; rebuilt (and re-saved) only when the processed data changes
+    base_dir = find_base_dir(Path('data') / 'processed' / 'X_train.csv')
+    fingerprint = data_fingerprint(base_dir, expected_features)
+    path = base_dir / 'models' / SUMMARY_FILENAME
+    summary = load_summary(path, fingerprint)
+    if summary is not None:
+        return summary
+    _, y_train, _, y_valid, X_all = load_training_data(expected_features)
+    if not isinstance(X_all, pd.DataFrame):
+        return None
+    if y_train is not None and y_valid is not None:
+        y_all = pd.concat([y_train, y_valid], ignore_index=True)
+    else:
+        y_all = y_train if y_train is not None else y_valid
+    with span('load_analytics_summary.build'):
+        summary = build_analytics_summary(X_all, decode_labels(y_all, load_artifacts()["label_encoder"]))
     try:
-        if isinstance(X_train, pd.DataFrame) and isinstance(X_valid, pd.DataFrame):
-            X_all = pd.concat([X_train, X_valid], ignore_index=True)
-        else:
-            X_all = X_train if isinstance(X_train, pd.DataFrame) else X_valid
+        save_summary(summary, path, fingerprint)
     except Exception:
-        X_all = None
+        pass
+    return summary
 
-    return X_train, y_train_s, X_valid, y_valid_s, X_all
+@st.cache_resource
+def load_pattern_index(expected_features: list[str] | None, model_version: str | None = None):
+    # Exact-pattern index built by `python -m src.pattern_index build`; ignored if built for other
+    # features or another model version (retrained, or updated by src.online_update)
+    index = load_index(find_base_dir(Path('models') / INDEX_FILENAME) / 'models' / INDEX_FILENAME)
+    if index is None or not index.matches(expected_features or None, model_version):
+        return None
+    return index
+
+@st.cache_resource
+def load_similar_case_index(expected_features: list[str] | None):
+    # Hamming-distance neighbour search over the packed training records
+    matrix = load_symptom_matrix(expected_features)
+    if matrix is None or len(matrix) == 0:
+        return None
+    with span('load_similar_case_index.build'):
+        return SimilarCaseIndex(matrix)
+
+@st.cache_resource
+def load_serving_model():
+    # Soft vote over the stored models named by SERVING_MODELS; otherwise the (compiled) champion.
+    # SERVING_CASCADE puts a cheap screening model in front of whichever of the two is served.
+    artifacts = load_artifacts()
+    model = artifacts["fast_model"] or artifacts["model"]
+    spec = models_from_env()
+    if spec and artifacts["features"]:
+        try:
+            with span('load_serving_model.load_scorer'):
+                scorer = load_scorer(
+                    find_base_dir(Path('models')) / 'models', spec, artifacts["features"],
+                    weights_from_env(), compile_members=compile_fast_model,
+                )
+            if scorer is not None:
+                model = scorer
+        except Exception as e:
+            st.warning(f"Could not load SERVING_MODELS={spec}, serving the champion: {e}")
+    cascade_path = cascade_from_env()
+    if cascade_path and model is not None and artifacts["features"]:
+        try:
+            with span('load_serving_model.load_cascade'):
+                path = Path(cascade_path)
+                if not path.is_absolute():
+                    path = find_base_dir(path) / path
+                version = getattr(model, "model_version", None) or artifacts.get("model_version", "")
+                cascade = load_cascade(path, model, artifacts["features"], version)
+            if cascade is not None:
+                return cascade
+            st.warning(f"SERVING_CASCADE: {cascade_path} not found; run `python -m src.cascade build`")
+        except Exception as e:
+            st.warning(f"Could not load the cascade screen {cascade_path}, serving without it: {e}")
+    return model
+
+@st.cache_resource
+def load_inference_pool():
+    # Worker processes for Predictor scoring when INFERENCE_WORKERS is set; None keeps scoring in-process
+    n_workers = pool_size_from_env()
+    if n_workers <= 0:
+        return None
+    artifacts = load_artifacts()
+    model = load_serving_model()
+    if model is None or not artifacts["features"]:
+        return None
+    try:
+        with span('load_inference_pool.start'):
+            return InferencePool(model, artifacts["features"], n_workers).warm_up()
+    except Exception as e:
+        st.warning(f"Inference workers unavailable, scoring in-process: {e}")
+        return None
+
+@st.cache_resource
+def load_prediction_cache():
+    # Shared by all sessions in this server process; keys include the model version
+    return PredictionCache()
+
+@st.cache_resource
+def load_prediction_log(db_path: str):
+    # One process-wide handle; connections are opened per session thread inside the log.
+    # A legacy predictions.csv next to the database is imported the first time it is created.
+    return open_prediction_log(db_path, Path(db_path).with_suffix('.csv'))
+
+# ---------- Metrics ----------
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_exporter():
+    # Exposes the tracing spans in Prometheus format when METRICS_PORT / METRICS_FILE are set
+    try:
+        return TRACER.configure_from_env()
+    except Exception as e:
+        st.warning(f"Metrics exporter not started: {e}")
+        return None
 
 # ---------- Misc ----------
 
@@ -0,0 +1,170 @@
+"""
+"Most similar past cases" search over bit-packed training records.
+
+Distance is the Hamming distance between symptom bitmasks: XOR the packed uint64
+words and popcount. Up to LSH_MIN_PATTERNS distinct patterns this is an exact vectorized
+scan. Beyond that a MinHash/LSH index (Jaccard similarity on the sets of present
+symptoms) proposes candidates, which are re-ranked by exact Hamming distance;
+if LSH yields fewer than k candidates the exact scan is used instead.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .symptom_matrix import SymptomMatrix, as_words, popcount, unpack_rows
+except ImportError:
+    from symptom_matrix import SymptomMatrix, as_words, popcount, unpack_rows
+
+# Above this many distinct patterns an exact scan no longer fits the ~10 ms budget (NumPy < 2 popcount)
+LSH_MIN_PATTERNS = 50_000
+DEFAULT_BANDS = 16
+DEFAULT_ROWS_PER_BAND = 4
+SIGNATURE_CHUNK_ROWS = 4096
+
+
+def hamming_distances(words: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Hamming distance from every packed row in `words` to one packed `query` row"""
+    return popcount(words ^ query).sum(axis=1, dtype=np.int32)
+
+
+def top_k(distances: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k smallest distances, nearest first (ties by row order)"""
+    k = min(k, len(distances))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    part = np.argpartition(distances, k - 1)[:k] if k < len(distances) else np.arange(len(distances))
+    return part[np.lexsort((part, distances[part]))]
+
+
+class MinHashLSH:
+    """Banded MinHash index over the sets of present symptoms"""
+
+    def __init__(self, n_symptoms: int, bands: int = DEFAULT_BANDS, rows_per_band: int = DEFAULT_ROWS_PER_BAND, seed: int = 42):
+        rng = np.random.default_rng(seed)
+        self.n_symptoms = n_symptoms
+        self.bands = bands
+        self.rows_per_band = rows_per_band
+        # Each hash function is a random permutation rank of the symptom positions
+        self.perms = np.stack([rng.permutation(n_symptoms) for _ in range(bands * rows_per_band)]).astype(np.int16)
+        self.tables = []
+
+    def signatures(self, bits: np.ndarray) -> np.ndarray:
+        out = np.empty((len(bits), len(self.perms)), dtype=np.int16)
+        for start in range(0, len(bits), SIGNATURE_CHUNK_ROWS):
+            X = np.unpackbits(bits[start:start + SIGNATURE_CHUNK_ROWS], axis=1, count=self.n_symptoms, bitorder='little').astype(bool)
+            ranks = np.where(X[:, None, :], self.perms[None, :, :], self.n_symptoms)
+            out[start:start + SIGNATURE_CHUNK_ROWS] = ranks.min(axis=2)
+        return out
+
+    def _band_keys(self, sig: np.ndarray, band: int) -> np.ndarray:
+        part = np.ascontiguousarray(sig[:, band * self.rows_per_band:(band + 1) * self.rows_per_band])
+        return part.view(np.dtype((np.void, part.shape[1] * part.itemsize))).ravel()
+
+    def fit(self, bits: np.ndarray) -> 'MinHashLSH':
+        sig = self.signatures(bits)
+        self.tables = []
+        for band in range(self.bands):
+            keys = self._band_keys(sig, band)
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            uniq, starts = np.unique(sorted_keys, return_index=True)
+            ends = np.append(starts[1:], len(sorted_keys))
+            self.tables.append((uniq, starts, ends, order))
+        return self
+
+    def candidates(self, query_bits: np.ndarray) -> np.ndarray:
+        sig = self.signatures(query_bits.reshape(1, -1))
+        found = []
+        for band, (uniq, starts, ends, order) in enumerate(self.tables):
+            key = self._band_keys(sig, band)[0]
+            i = np.searchsorted(uniq, key)
+            if i < len(uniq) and uniq[i] == key:
+                found.append(order[starts[i]:ends[i]])
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+
+class SimilarCaseIndex:
+    """k-nearest training records by Hamming distance.
+
+    Records are grouped by distinct symptom pattern first (the training data holds
+    far fewer patterns than rows), so the scan and the LSH index cover patterns and
+    each pattern expands to the records that share it.
+    """
+
+    def __init__(self, matrix: SymptomMatrix, lsh_min_patterns: int = LSH_MIN_PATTERNS):
+        self.matrix = matrix
+        keys = matrix.bits.view(np.dtype((np.void, matrix.bits.shape[1]))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+        self.pattern_bits = matrix.bits[first]
+        self.words = as_words(self.pattern_bits)
+        # Records of pattern p are members[offsets[p]:offsets[p + 1]], in row order
+        self.members = np.argsort(inverse, kind='stable')
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(inverse, minlength=len(first)))])
+        self.lsh = MinHashLSH(len(matrix.symptoms)).fit(self.pattern_bits) if len(first) >= lsh_min_patterns else None
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    @property
+    def n_patterns(self) -> int:
+        return len(self.words)
+
+    def _nearest_patterns(self, q: np.ndarray, query_bits: np.ndarray, k: int):
+        if self.lsh is not None:
+            cand = self.lsh.candidates(query_bits)
+            if len(cand) >= k:
+                dist = hamming_distances(self.words[cand], q)
+                best = top_k(dist, k)
+                return cand[best], dist[best]
+        dist = hamming_distances(self.words, q)
+        best = top_k(dist, k)
+        return best, dist[best]
+
+    def query_bits(self, query_bits: np.ndarray, k: int = 5, exclude: int | None = None):
+        """(record indices, Hamming distances) of the k closest records to a packed query row"""
+        query_bits = np.asarray(query_bits, dtype=np.uint8)
+        q = as_words(query_bits.reshape(1, -1))[0]
+        want = k + (1 if exclude is not None else 0)
+        # k patterns always cover at least k records
+        patterns, dists = self._nearest_patterns(q, query_bits, want)
+        idx, out = [], []
+        for p, d in zip(patterns, dists):
+            rows = self.members[self.offsets[p]:self.offsets[p + 1]]
+            if exclude is not None:
+                rows = rows[rows != exclude]
+            rows = rows[:k - len(idx)]
+            idx.extend(rows.tolist())
+            out.extend([int(d)] * len(rows))
+            if len(idx) >= k:
+                break
+        return np.asarray(idx, dtype=np.int64), np.asarray(out, dtype=np.int32)
+
+    def query(self, symptoms, k: int = 5, exclude: int | None = None):
+        return self.query_bits(self.matrix.mask(symptoms), k=k, exclude=exclude)
+
+    def query_row(self, i: int, k: int = 5):
+        """Nearest neighbours of stored record `i`, excluding itself"""
+        return self.query_bits(self.matrix.bits[i], k=k, exclude=i)
+
+    def describe(self, idx: np.ndarray, dists: np.ndarray, query_symptoms=None, label_encoder=None) -> pd.DataFrame:
+        """Table of neighbours: record id, diagnosis, Hamming distance, symptoms shared with the query"""
+        labels = self.matrix.labels
+        diagnosis = labels[idx] if labels is not None else np.full(len(idx), None)
+        if labels is not None and label_encoder is not None:
+            try:
+                diagnosis = label_encoder.inverse_transform(diagnosis.astype(int))
+            except Exception:
+                pass
+        present = unpack_rows(self.matrix.bits[idx], len(self.matrix.symptoms)).astype(bool)
+        names = np.asarray(self.matrix.symptoms, dtype=object)
+        query_mask = np.zeros(len(names), dtype=bool) if query_symptoms is None else np.isin(names, list(query_symptoms))
+        return pd.DataFrame({
+            'record': idx,
+            'diagnosis': diagnosis,
+            'hamming_distance': dists,
+            'shared_symptoms': (present & query_mask).sum(axis=1),
+            'symptoms': ['; '.join(names[p]) for p in present],
+        })
+
@@ -0,0 +1,211 @@
+"""
+Bit-packed symptom matrix.
+
+Symptom flags are stored 8 per byte (little bit order, so bit j of a row lives in
+byte j // 8 at position j % 8) instead of one int64 each; engineered count columns
+such as `symptom_count` are kept separately in the narrowest integer dtype. The
+packed rows double as bitmasks for pattern lookups and Hamming-distance search.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Set-bit count for every possible byte value; used when np.bitwise_count is unavailable (NumPy < 2)
+POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(a: np.ndarray) -> np.ndarray:
+    """Element-wise number of set bits for unsigned integer arrays"""
+    bitwise_count = getattr(np, 'bitwise_count', None)
+    if bitwise_count is not None:
+        return bitwise_count(a)
+    a = np.ascontiguousarray(a)
+    return POPCOUNT_TABLE[a.view(np.uint8)].reshape(a.shape + (a.itemsize,)).sum(axis=-1, dtype=np.uint8)
+
+
+def is_binary_column(s: pd.Series) -> bool:
+    if not pd.api.types.is_numeric_dtype(s):
+        return False
+    values = s.dropna().unique()
+    return len(values) <= 2 and set(np.asarray(values).tolist()) <= {0, 1}
+
+
+def pack_rows(X) -> np.ndarray:
+    """Pack an (n, m) 0/1 array into (n, ceil(m / 8)) uint8"""
+    X = np.asarray(X)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    return np.packbits(X.astype(bool, copy=False), axis=1, bitorder='little')
+
+
+def unpack_rows(bits: np.ndarray, n_symptoms: int) -> np.ndarray:
+    return np.unpackbits(bits, axis=1, count=n_symptoms, bitorder='little')
+
+
+def compact_labels(labels):
+    """Encoded class labels in the narrowest unsigned dtype that holds them"""
+    if labels is None:
+        return None
+    labels = np.asarray(labels)
+    if np.issubdtype(labels.dtype, np.integer) and labels.size and labels.min() >= 0:
+        return labels.astype(np.min_scalar_type(int(labels.max())))
+    return labels
+
+
+def as_words(bits: np.ndarray) -> np.ndarray:
+    """View packed rows as uint64 words (zero-padded to a multiple of 8 bytes)"""
+    n, width = bits.shape
+    padded = -(-width // 8) * 8
+    if padded != width:
+        bits = np.concatenate([bits, np.zeros((n, padded - width), dtype=np.uint8)], axis=1)
+    return np.ascontiguousarray(bits).view(np.uint64)
+
+
+class SymptomMatrix:
+    def __init__(self, bits: np.ndarray, symptoms: list[str], extra: pd.DataFrame | None = None,
+                 labels: np.ndarray | None = None, columns: list[str] | None = None):
+        self.bits = np.ascontiguousarray(bits, dtype=np.uint8)
+        self.symptoms = list(symptoms)
+        self.extra = extra if extra is not None else pd.DataFrame(index=pd.RangeIndex(len(self.bits)))
+        self.labels = labels
+        # Original column order, so to_frame() round-trips
+        self.columns = list(columns) if columns is not None else self.symptoms + list(self.extra.columns)
+        self._index = {name: j for j, name in enumerate(self.symptoms)}
+        self._words = None
+
+    # ---------- Construction ----------
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, labels=None, symptoms: list[str] | None = None) -> 'SymptomMatrix':
+        """Pack the 0/1 columns of `df`; other numeric columns are kept as compact integers"""
+        if symptoms is None:
+            symptoms = [c for c in df.columns if is_binary_column(df[c])]
+        else:
+            # A layout fixed elsewhere (e.g. by an earlier CSV chunk) must still hold 0/1 here, or packing would clip it
+            not_binary = [c for c in symptoms if not is_binary_column(df[c])]
+            if not_binary:
+                raise ValueError(f"Symptom columns are not 0/1: {', '.join(not_binary[:5])}"
+                                 f"{'...' if len(not_binary) > 5 else ''}")
+        extra_cols = [c for c in df.columns if c not in set(symptoms)]
+        extra = df[extra_cols].reset_index(drop=True)
+        for col in extra_cols:
+            if pd.api.types.is_integer_dtype(extra[col]):
+                extra[col] = pd.to_numeric(extra[col], downcast='integer')
+        bits = pack_rows(df[symptoms].to_numpy()) if symptoms else np.zeros((len(df), 0), dtype=np.uint8)
+        return cls(bits, symptoms, extra, compact_labels(labels), columns=list(df.columns))
+
+    @classmethod
+    def from_csv(cls, path, symptoms: list[str] | None = None, label_path=None, chunksize: int = 100_000,
+                 columns: list[str] | None = None) -> 'SymptomMatrix':
+        """Pack a CSV chunk by chunk so the full int64 frame never has to fit in memory"""
+        parts, extras, layout = [], [], None
+        wanted = set(columns or [])
+        usecols = (lambda c: c in wanted) if columns else None
+        for chunk in pd.read_csv(path, chunksize=chunksize, usecols=usecols):
+            if columns:
+                chunk = chunk[[c for c in columns if c in chunk.columns]]
+            if symptoms is None:
+                symptoms = [c for c in chunk.columns if is_binary_column(chunk[c])]
+            part = cls.from_frame(chunk, symptoms=symptoms)
+            parts.append(part.bits)
+            extras.append(part.extra)
+            layout = part.columns
+        labels = pd.read_csv(label_path).iloc[:, 0].to_numpy() if label_path is not None else None
+        bits = np.concatenate(parts) if parts else np.zeros((0, -(-len(symptoms or []) // 8)), dtype=np.uint8)
+        extra = pd.concat(extras, ignore_index=True) if extras else None
+        return cls(bits, symptoms or [], extra, compact_labels(labels), layout)
+
+    @classmethod
+    def concat(cls, parts: list['SymptomMatrix']) -> 'SymptomMatrix':
+        """Stack matrices that share the same symptom layout"""
+        first = parts[0]
+        labels = None
+        if all(p.labels is not None for p in parts):
+            labels = compact_labels(np.concatenate([p.labels for p in parts]))
+        return cls(
+            np.concatenate([p.bits for p in parts]),
+            first.symptoms,
+            pd.concat([p.extra for p in parts], ignore_index=True),
+            labels,
+            first.columns,
+        )
+
+    # ---------- Access ----------
+
+    def __len__(self) -> int:
+        return len(self.bits)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.bits), len(self.columns)
+
+    @property
+    def words(self) -> np.ndarray:
+        if self._words is None:
+            self._words = as_words(self.bits)
+        return self._words
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._index:
+            return self.extra[name].to_numpy()
+        j = self._index[name]
+        return (self.bits[:, j >> 3] >> (j & 7)) & 1
+
+    def rows(self, idx) -> pd.DataFrame:
+        """Decode the selected rows back to a regular 0/1 frame"""
+        idx = np.atleast_1d(np.asarray(idx))
+        df = pd.DataFrame(unpack_rows(self.bits[idx], len(self.symptoms)), columns=self.symptoms)
+        for col in self.extra.columns:
+            df[col] = self.extra[col].to_numpy()[idx]
+        return df[self.columns]
+
+    def row(self, i: int) -> pd.Series:
+        return self.rows([i]).iloc[0]
+
+    def to_frame(self) -> pd.DataFrame:
+        return self.rows(np.arange(len(self)))
+
+    def mask(self, symptoms) -> np.ndarray:
+        """Packed bitmask (one row) with the given symptoms set"""
+        row = np.zeros(len(self.symptoms), dtype=np.uint8)
+        for name in symptoms:
+            if name in self._index:
+                row[self._index[name]] = 1
+        return pack_rows(row)[0]
+
+    # ---------- Aggregations ----------
+
+    def row_counts(self) -> np.ndarray:
+        """Number of symptoms present per row"""
+        return popcount(self.words).sum(axis=1, dtype=np.int64)
+
+    def column_sums(self, rows=None) -> pd.Series:
+        """How many rows have each symptom (optionally over a boolean/index row selection)"""
+        bits = self.bits if rows is None else self.bits[rows]
+        sums = np.empty(bits.shape[1] * 8, dtype=np.int64)
+        for b in range(8):
+            sums[b::8] = ((bits >> b) & 1).sum(axis=0, dtype=np.int64)
+        return pd.Series(sums[:len(self.symptoms)], index=self.symptoms)
+
+    def column_means(self, rows=None) -> pd.Series:
+        n = len(self) if rows is None else int(np.count_nonzero(rows) if np.asarray(rows).dtype == bool else len(rows))
+        return self.column_sums(rows) / max(n, 1)
+
+    def count_matching(self, symptoms) -> int:
+        """Rows that contain every symptom in `symptoms`"""
+        m = as_words(self.mask(symptoms).reshape(1, -1))[0]
+        return int(np.all((self.words & m) == m, axis=1).sum())
+
+    def group_column_sums(self, labels=None) -> pd.DataFrame:
+        """Per-label symptom counts (labels x symptoms)"""
+        labels = self.labels if labels is None else np.asarray(labels)
+        classes = np.unique(labels)
+        return pd.DataFrame(
+            [self.column_sums(labels == c).to_numpy() for c in classes],
+            index=classes, columns=self.symptoms,
+        )
+
+    def memory_usage(self) -> int:
+        """Bytes held by the packed bits, extra columns and labels"""
+        total = self.bits.nbytes + int(self.extra.memory_usage(index=False).sum())
+        return total + (self.labels.nbytes if self.labels is not None else 0)
@@ -0,0 +1,195 @@
+"""
+Lightweight latency tracing for the Streamlit app.
+
+Named spans (`with span('predictor.predict_proba'):`) record their wall time into
+per-span histograms held by one process-wide tracer. The histograms are exported in
+Prometheus text format, either from a local HTTP endpoint or as a file that is
+rewritten periodically (node_exporter textfile-collector style):
+
+    METRICS_PORT=9464 streamlit run app.py          # → http://localhost:9464/metrics
+    METRICS_FILE=metrics/app.prom streamlit run app.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+METRIC_NAME = 'disease_app_span_duration_seconds'
+# Upper bounds in seconds; +Inf is implicit
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Recent samples kept per span for p50/p99 in snapshot()
+RESERVOIR_SIZE = 1024
+FLUSH_INTERVAL_SECONDS = 15.0
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, seconds: float):
+        i = 0
+        while i < len(self.buckets) and seconds > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+        self.recent.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self.recent:
+            return float('nan')
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Tracer:
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.metrics_file = None
+        self._last_flush = 0.0
+        self._server = None
+
+    def record(self, name: str, seconds: float):
+        flush = False
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram()
+            hist.observe(seconds)
+            if self.metrics_file and time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SECONDS:
+                # Claimed under the lock so only one session thread rewrites the file per interval
+                self._last_flush = time.monotonic()
+                flush = True
+        if flush:
+            # Runs in a span's finally: an unwritable METRICS_FILE must never surface in page code
+            try:
+                self.write_file()
+            except OSError as e:
+                print(f"⚠️ Could not write metrics to {self.metrics_file}: {e}", file=sys.stderr)
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def traced(self, name: str | None = None):
+        """Decorator form of span(); defaults to the function's qualified name"""
+        def wrap(fn):
+            span_name = name or fn.__qualname__
+
+            @wraps(fn)
+            def inner(*args, **kwargs):
+                with self.span(span_name):
+                    return fn(*args, **kwargs)
+            return inner
+        return wrap
+
+    def snapshot(self) -> dict:
+        """{span: {'count', 'sum', 'p50', 'p99'}} with times in seconds"""
+        with self._lock:
+            return {
+                name: {'count': h.count, 'sum': h.sum, 'p50': h.quantile(0.5), 'p99': h.quantile(0.99)}
+                for name, h in sorted(self._histograms.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    # ---------- Export ----------
+
+    def to_prometheus(self) -> str:
+        lines = [
+            f'# HELP {METRIC_NAME} Wall time of traced app stages.',
+            f'# TYPE {METRIC_NAME} histogram',
+        ]
+        with self._lock:
+            for name, h in sorted(self._histograms.items()):
+                label = f'span="{_escape(name)}"'
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    lines.append(f'{METRIC_NAME}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_bucket{{{label},le="+Inf"}} {h.count}')
+                lines.append(f'{METRIC_NAME}_sum{{{label}}} {h.sum:.9g}')
+                lines.append(f'{METRIC_NAME}_count{{{label}}} {h.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_file(self, path=None) -> Path | None:
+        path = Path(path or self.metrics_file) if (path or self.metrics_file) else None
+        if path is None:
+            return None
+        self._last_flush = time.monotonic()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so a scraper never reads a half-written file; the temporary name is unique
+        # per call, so concurrent writers never interleave in one file
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=path.parent, prefix=path.name + '.',
+                                         suffix='.tmp', delete=False) as tmp:
+            tmp.write(self.to_prometheus())
+        try:
+            os.chmod(tmp.name, 0o644)
+            os.replace(tmp.name, path)
+        except OSError:
+            Path(tmp.name).unlink(missing_ok=True)
+            raise
+        return path
+
+    def serve(self, port: int, host: str = '127.0.0.1'):
+        """Serve /metrics from a daemon thread; a no-op if already serving"""
+        if self._server is not None:
+            return self._server
+        tracer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = tracer.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=self._server.serve_forever, name='metrics-exporter', daemon=True).start()
+        return self._server
+
+    def configure_from_env(self):
+        """Start the exporter(s) requested by METRICS_PORT / METRICS_FILE"""
+        port = os.environ.get('METRICS_PORT')
+        if port:
+            self.serve(int(port), os.environ.get('METRICS_HOST', '127.0.0.1'))
+        if os.environ.get('METRICS_FILE'):
+            self.metrics_file = os.environ['METRICS_FILE']
+        return self
+
+
+# This module may be imported both as `src.tracing` and as `tracing`; share one tracer per process
+_other = sys.modules.get('tracing' if __name__ == 'src.tracing' else 'src.tracing')
+TRACER = getattr(_other, 'TRACER', None) or Tracer()
+span = TRACER.span
+traced = TRACER.traced
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Core-aware scheduler for model × fold training jobs.
+
+model_training.ipynb fits each family with n_jobs=-1 and then runs
+cross_val_score(cv=5) serially: single-threaded stages leave cores idle while the
+multi-threaded ones run several thread pools at once. Here every (model, fold) fit —
+plus one full fit per model for the train/valid scores and the saved artifact — is a
+separate job with an explicit thread count. Jobs start longest-first (costs come from
+the timings in championship_results.json) and a job is only started when its threads
+fit in the remaining core budget, so the total never exceeds `cores`. The last jobs
+to start take the spare cores left over once the queue drains.
+
+Folds are StratifiedKFold(cv) without shuffling, which is what cross_val_score(cv=5)
+uses for classifiers, so cv_mean / cv_std match the notebook's. Each fold's held-out
+predict_proba is kept as the model's out-of-fold predictions (`oof_proba`).
+
+    python -m src.train_scheduler --cores 8
+    python -m src.train_scheduler --models RandomForest LightGBM --sequential   # also time the notebook's serial loop
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold
+
+try:
+    from . import training
+except ImportError:
+    import training
+
+FULL_FIT = 'full'
+# Relative job cost when championship_results.json has no timing for a family
+DEFAULT_COST = 1.0
+
+
+def job_costs(models, results_path=None, cv: int = training.CV_FOLDS) -> dict:
+    """Estimated seconds per job for each model: recorded training_time / (cv + 1)"""
+    recorded = {}
+    if results_path and Path(results_path).exists():
+        recorded = json.loads(Path(results_path).read_text(encoding='utf-8')).get('all_model_results', {})
+    return {m: recorded.get(m, {}).get('training_time', DEFAULT_COST * (cv + 1)) / (cv + 1) for m in models}
+
+
+def _fit_job(estimator, X, y, fit_idx, score_idx, X_valid, y_valid):
+    start = time.perf_counter()
+    X_fit = X if fit_idx is None else X.iloc[fit_idx]
+    y_fit = y if fit_idx is None else y.iloc[fit_idx]
+    estimator.fit(X_fit, y_fit)
+    out = {'estimator': estimator}
+    if fit_idx is None:
+        out['train_acc'] = accuracy_score(y, np.asarray(estimator.predict(X)).ravel())
+        out['valid_acc'] = accuracy_score(y_valid, np.asarray(estimator.predict(X_valid)).ravel())
+    else:
+        # Held-out probabilities are kept so ensembles can be built and weighted without refitting
+        out['proba'] = np.asarray(estimator.predict_proba(X.iloc[score_idx]))
+        out['classes'] = np.asarray(estimator.classes_)
+        out['score'] = accuracy_score(y.iloc[score_idx], out['classes'][out['proba'].argmax(axis=1)])
+    out['seconds'] = time.perf_counter() - start
+    return out
+
+
+class TrainingScheduler:
+    def __init__(self, cores: int | None = None, cv: int = training.CV_FOLDS, costs: dict | None = None,
+                 verbose: bool = True):
+        self.cores = max(1, int(cores or os.cpu_count() or 1))
+        self.cv = cv
+        self.costs = costs or {}
+        self.verbose = verbose
+        self.timeline = []
+
+    def _threads_for(self, free: int, queued: int) -> int:
+        # One core per job while the queue is deeper than the free cores; spare cores go to the last jobs
+        return 1 if queued >= free else max(1, free // queued)
+
+    def run(self, models: dict, X_train: pd.DataFrame, y_train: pd.Series, X_valid, y_valid) -> dict:
+        """Fit and cross-validate `models` ({name: hyperparameters}); returns train_evaluate_model-style results"""
+        folds = list(StratifiedKFold(self.cv).split(X_train, y_train))
+        jobs = []
+        for name, params in models.items():
+            jobs.append((name, FULL_FIT, None, None, params))
+            for i, (fit_idx, score_idx) in enumerate(folds):
+                jobs.append((name, i, fit_idx, score_idx, params))
+        # Longest first keeps the slowest family from starting last
+        jobs.sort(key=lambda j: self.costs.get(j[0], DEFAULT_COST), reverse=True)
+
+        outcomes = {name: {} for name in models}
+        free = self.cores
+        running = {}
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.cores, thread_name_prefix='train-job') as pool:
+            while jobs or running:
+                while jobs and free > 0:
+                    name, fold, fit_idx, score_idx, params = jobs.pop(0)
+                    threads = self._threads_for(free, len(jobs) + 1)
+                    free -= threads
+                    estimator = training.build_model(name, params, n_jobs=threads)
+                    future = pool.submit(_fit_job, estimator, X_train, y_train, fit_idx, score_idx, X_valid, y_valid)
+                    running[future] = (name, fold, threads, time.perf_counter() - t0)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, fold, threads, started = running.pop(future)
+                    free += threads
+                    result = future.result()
+                    outcomes[name][fold] = result
+                    self.timeline.append({'model': name, 'fold': fold, 'threads': threads, 'start': started,
+                                          'end': time.perf_counter() - t0, 'seconds': result['seconds']})
+
+        classes = np.unique(y_train)
+        fold_ids = np.empty(len(X_train), dtype=np.int64)
+        for i, (_, score_idx) in enumerate(folds):
+            fold_ids[score_idx] = i
+        trained = {}
+        for name in models:
+            full = outcomes[name][FULL_FIT]
+            scores = np.array([outcomes[name][i]['score'] for i in range(len(folds))])
+            oof = np.zeros((len(X_train), len(classes)))
+            for i, (_, score_idx) in enumerate(folds):
+                o = outcomes[name][i]
+                oof[np.ix_(score_idx, np.searchsorted(classes, o['classes']))] = o['proba']
+            trained[name] = {
+                'model': full['estimator'],
+                'train_acc': full['train_acc'],
+                'valid_acc': full['valid_acc'],
+                'cv_mean': scores.mean(),
+                'cv_std': scores.std(),
+                # Summed job time: what this model costs when trained on its own
+                'training_time': sum(o['seconds'] for o in outcomes[name].values()),
+                'oof_proba': oof,
+                'oof_classes': classes,
+                'oof_folds': fold_ids,
+            }
+            if self.verbose:
+                r = trained[name]
+                print(f"   {name:<15} train {r['train_acc']:.4f} • valid {r['valid_acc']:.4f} • "
+                      f"CV {r['cv_mean']:.4f} ± {r['cv_std']:.4f} • {r['training_time']:.2f}s of job time")
+        return trained
+
+    def utilization(self) -> float:
+        """Core-seconds used / core-seconds available over the schedule's wall time"""
+        if not self.timeline:
+            return 0.0
+        wall = max(j['end'] for j in self.timeline)
+        return sum(j['seconds'] * j['threads'] for j in self.timeline) / (wall * self.cores) if wall else 0.0
+
+
+def recorded_baseline(results_path, models) -> float | None:
+    """Sequential training seconds for `models` as recorded by model_selection.ipynb"""
+    path = Path(results_path)
+    if not path.exists():
+        return None
+    recorded = json.loads(path.read_text(encoding='utf-8')).get('all_model_results', {})
+    times = [recorded[m]['training_time'] for m in models if m in recorded]
+    return sum(times) if len(times) == len(models) else None
+
+
+def main(argv=None):
+    """Train the model families as concurrent model × fold jobs under a core budget"""
+    parser = argparse.ArgumentParser(description="Core-aware model × fold training scheduler")
+    parser.add_argument('--cores', type=int, default=None, help="Core budget (default: all cores)")
+    parser.add_argument('--models', nargs='+', default=list(training.MODEL_PARAMS), choices=list(training.MODEL_PARAMS))
+    parser.add_argument('--cv', type=int, default=training.CV_FOLDS)
+    parser.add_argument('--results', default=str(Path('models') / 'championship_results.json'),
+                        help="Recorded sequential timings used for job costs and the speedup baseline")
+    parser.add_argument('--sequential', action='store_true', help="Also time the notebook's serial loop on this machine")
+    args = parser.parse_args(argv)
+
+    try:
+        from .data_cache import read_processed_csv
+    except ImportError:
+        from data_cache import read_processed_csv
+    processed = Path('data') / 'processed'
+    frames = [read_processed_csv(processed / n) for n in ('X_train_selected.csv', 'y_train.csv', 'X_valid_selected.csv', 'y_valid.csv')]
+    if any(f is None for f in frames):
+        print(f"❌ Selected training data missing in {processed}; run `python -m src.pipeline --only prepare features` first")
+        sys.exit(1)
+    X_train, y_train, X_valid, y_valid = frames
+    y_train, y_valid = y_train.iloc[:, 0], y_valid.iloc[:, 0]
+
+    scheduler = TrainingScheduler(args.cores, args.cv, job_costs(args.models, args.results, args.cv))
+    print(f"🧮 {scheduler.cores} core budget • {len(args.models)} models × ({args.cv} folds + full fit)")
+    start = time.perf_counter()
+    scheduler.run({m: {} for m in args.models}, X_train, y_train, X_valid, y_valid)
+    wall = time.perf_counter() - start
+    print(f"⏱️ Scheduled: {wall:.1f}s wall • core utilization {scheduler.utilization():.0%}")
+
+    baseline = recorded_baseline(args.results, args.models)
+    if baseline:
+        print(f"📄 Recorded sequential run ({args.results}): {baseline:.1f}s → {baseline / wall:.2f}x")
+    if args.sequential:
+        start = time.perf_counter()
+        for name in args.models:
+            training.train_evaluate_model(training.build_model(name), X_train, y_train, X_valid, y_valid, name, args.cv)
+        serial = time.perf_counter() - start
+        print(f"🐢 Notebook loop on this machine: {serial:.1f}s → {serial / wall:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Model definitions and the train/evaluate step from model_training.ipynb.
+
+MODEL_PARAMS holds the notebook's hyperparameters per family; build_model turns a
+(name, params) pair into an unfitted estimator, and train_evaluate_model fits it and
+records the same metrics the notebook writes to models/training_results.json.
+"""
+
+import time
+
+import numpy as np
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import cross_val_score
+
+SEED = 42
+CV_FOLDS = 5
+ENSEMBLE_SIZE = 3
+ENSEMBLE_NAME = 'VotingEnsemble'
+
+MODEL_PARAMS = {
+    'XGBoost': {'n_estimators': 300, 'max_depth': 6, 'learning_rate': 0.1, 'subsample': 0.8, 'colsample_bytree': 0.8},
+    'LightGBM': {'n_estimators': 300, 'max_depth': 6, 'learning_rate': 0.1, 'feature_fraction': 0.8},
+    'CatBoost': {'iterations': 300, 'depth': 6, 'learning_rate': 0.1},
+    'RandomForest': {'n_estimators': 300, 'max_depth': 12, 'min_samples_split': 5, 'min_samples_leaf': 2},
+}
+
+
+def build_model(name: str, params: dict | None = None, n_jobs: int = -1):
+    """Unfitted estimator for one model family; `params` override the notebook defaults"""
+    params = {**MODEL_PARAMS.get(name, {}), **(params or {})}
+    if name == 'XGBoost':
+        import xgboost as xgb
+        return xgb.XGBClassifier(**params, random_state=SEED, n_jobs=n_jobs, verbosity=0)
+    if name == 'LightGBM':
+        import lightgbm as lgb
+        return lgb.LGBMClassifier(**params, random_state=SEED, n_jobs=n_jobs, verbose=-1)
+    if name == 'CatBoost':
+        import catboost as cb
+        thread_count = n_jobs if n_jobs and n_jobs > 0 else -1
+        return cb.CatBoostClassifier(**params, random_state=SEED, verbose=False, thread_count=thread_count,
+                                     allow_writing_files=False)
+    if name == 'RandomForest':
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(**params, random_state=SEED, n_jobs=n_jobs)
+    raise ValueError(f"Unknown model family {name!r} (expected one of {', '.join(MODEL_PARAMS)})")
+
+
+def train_evaluate_model(model, X_tr, y_tr, X_val, y_val, name: str, cv: int = CV_FOLDS, verbose: bool = True) -> dict:
+    """Fit, score on train/valid and cross-validate one model, as in model_training.ipynb"""
+    start_time = time.time()
+    model.fit(X_tr, y_tr)
+    train_acc = accuracy_score(y_tr, model.predict(X_tr))
+    valid_acc = accuracy_score(y_val, np.asarray(model.predict(X_val)).ravel())
+    cv_scores = cross_val_score(model, X_tr, y_tr, cv=cv, scoring='accuracy')
+    results = {
+        'model': model,
+        'train_acc': train_acc,
+        'valid_acc': valid_acc,
+        'cv_mean': cv_scores.mean(),
+        'cv_std': cv_scores.std(),
+        'training_time': time.time() - start_time,
+    }
+    if verbose:
+        print(f"   {name:<15} train {train_acc:.4f} • valid {valid_acc:.4f} • "
+              f"CV {results['cv_mean']:.4f} ± {results['cv_std']:.4f} • {results['training_time']:.2f}s")
+    return results
+
+
+def training_summary(trained: dict) -> dict:
+    """models/training_results.json payload"""
+    return {
+        name: {
+            'train_accuracy': float(r['train_acc']),
+            'valid_accuracy': float(r['valid_acc']),
+            'cv_mean': float(r['cv_mean']),
+            'cv_std': float(r['cv_std']),
+            'training_time': float(r['training_time']),
+        }
+        for name, r in trained.items()
+    }
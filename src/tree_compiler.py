@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Compile fitted tree ensembles into flat NumPy node tables.
+
+A RandomForest becomes one set of arrays covering every node of every tree
+(feature, threshold, left/right child, leaf class distribution); evaluation walks
+all trees for all rows at once, one vectorized step per tree level. A CatBoost
+model is made of oblivious trees, so each tree reduces to `depth` (feature, border)
+pairs and a leaf table indexed by the bits of those comparisons.
+
+The compiled object exposes `predict_proba`, `predict` and `classes_`, so it can be
+passed anywhere the original model is used (see inference.predict_batch).
+
+    python -m src.tree_compiler models/model_randomforest.pkl --benchmark
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Rows evaluated together; bounds the (rows x trees x classes) leaf-value gather
+MAX_GATHER_ELEMENTS = 4_000_000
+
+
+class CompiledForest:
+    """Array-backed evaluator for sklearn RandomForest/ExtraTrees classifiers"""
+
+    kind = 'forest'
+    accepts_arrays = True
+
+    def __init__(self, feature, threshold, left, right, leaf_proba, roots, depth, classes, feature_names):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.depth = int(depth)
+        self.classes_ = np.asarray(classes)
+        self.feature_names_ = list(feature_names)
+        self.n_features_in_ = len(self.feature_names_)
+
+    @classmethod
+    def from_sklearn(cls, model) -> 'CompiledForest':
+        features, thresholds, lefts, rights, probas, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for est in model.estimators_:
+            t = est.tree_
+            n = t.node_count
+            is_leaf = t.children_left == -1
+            idx = np.arange(n)
+            # Leaves loop back to themselves so every row can take the same number of steps
+            features.append(np.where(is_leaf, 0, t.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, t.threshold).astype(np.float64))
+            lefts.append((np.where(is_leaf, idx, t.children_left) + offset).astype(np.int32))
+            rights.append((np.where(is_leaf, idx, t.children_right) + offset).astype(np.int32))
+            value = t.value[:, 0, :].astype(np.float64)
+            totals = value.sum(axis=1, keepdims=True)
+            probas.append(np.divide(value, totals, out=np.zeros_like(value), where=totals > 0).astype(np.float32))
+            roots.append(offset)
+            offset += n
+            depth = max(depth, t.max_depth)
+        names = getattr(model, 'feature_names_in_', None)
+        names = list(names) if names is not None else [str(i) for i in range(model.n_features_in_)]
+        return cls(
+            np.concatenate(features), np.concatenate(thresholds), np.concatenate(lefts),
+            np.concatenate(rights), np.concatenate(probas), np.asarray(roots, dtype=np.int32),
+            depth, model.classes_, names,
+        )
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict_proba(self, X) -> np.ndarray:
+        # sklearn evaluates trees on float32 inputs; do the same so borderline splits agree
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        out = np.empty((len(X), len(self.classes_)), dtype=np.float64)
+        step = max(1, MAX_GATHER_ELEMENTS // max(1, len(self.roots) * len(self.classes_)))
+        for start in range(0, len(X), step):
+            leaves = self._leaves(X[start:start + step])
+            out[start:start + step] = self.leaf_proba[leaves].mean(axis=1, dtype=np.float64)
+        return out
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+class CompiledObliviousEnsemble:
+    """Array-backed evaluator for CatBoost classifiers (oblivious trees, float features)"""
+
+    kind = 'oblivious'
+    accepts_arrays = True
+
+    def __init__(self, split_features, split_borders, leaf_values, scale, bias, classes, feature_names, multiclass):
+        self.split_features = split_features  # (trees, depth)
+        self.split_borders = split_borders    # (trees, depth)
+        self.leaf_values = leaf_values        # (trees, 2**depth, dim)
+        self.scale = float(scale)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.feature_names_ = list(feature_names)
+        self.n_features_in_ = len(self.feature_names_)
+        self.multiclass = bool(multiclass)
+
+    @classmethod
+    def from_catboost(cls, model) -> 'CompiledObliviousEnsemble':
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.json')
+            model.save_model(path, format='json')
+            with open(path, encoding='utf-8') as f:
+                spec = json.load(f)
+        float_features = spec['features_info'].get('float_features', [])
+        flat_index = [ff['flat_feature_index'] for ff in float_features]
+        trees = spec['oblivious_trees']
+        depths = {len(t['splits']) for t in trees}
+        if len(depths) != 1:
+            raise ValueError("Compiled CatBoost models need trees of a single depth")
+        depth = depths.pop()
+        if any(s.get('split_type') != 'FloatFeature' for t in trees for s in t['splits']):
+            raise ValueError("Only float-feature splits can be compiled")
+        split_features = np.array(
+            [[flat_index[s['float_feature_index']] for s in t['splits']] for t in trees], dtype=np.int32
+        ).reshape(len(trees), depth)
+        split_borders = np.array(
+            [[s['border'] for s in t['splits']] for t in trees], dtype=np.float64
+        ).reshape(len(trees), depth)
+        n_leaves = 1 << depth
+        dim = len(trees[0]['leaf_values']) // n_leaves
+        leaf_values = np.array([t['leaf_values'] for t in trees], dtype=np.float64).reshape(len(trees), n_leaves, dim)
+        scale, bias = spec.get('scale_and_bias', [1.0, [0.0] * dim])
+        loss = spec['model_info'].get('params', {}).get('loss_function', {}).get('type', '')
+        return cls(
+            split_features, split_borders, leaf_values, scale, np.atleast_1d(bias),
+            model.classes_, model.feature_names_, multiclass=(loss == 'MultiClass' or dim > 1),
+        )
+
+    def raw_scores(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        depth = self.split_features.shape[1]
+        weights = (1 << np.arange(depth)).astype(np.int64)
+        out = np.empty((len(X), self.leaf_values.shape[2]), dtype=np.float64)
+        tree_idx = np.arange(len(self.leaf_values))[None, :]
+        step = max(1, MAX_GATHER_ELEMENTS // max(1, self.leaf_values.shape[0] * self.leaf_values.shape[2]))
+        for start in range(0, len(X), step):
+            chunk = X[start:start + step]
+            # (rows, trees, depth) comparisons -> leaf index per tree; split d sets bit d
+            bits = chunk[:, self.split_features] > self.split_borders
+            leaf = bits.astype(np.int64) @ weights
+            out[start:start + step] = self.leaf_values[tree_idx, leaf].sum(axis=1)
+        return self.scale * out + self.bias
+
+    def predict_proba(self, X) -> np.ndarray:
+        raw = self.raw_scores(X)
+        if self.multiclass:
+            raw = raw - raw.max(axis=1, keepdims=True)
+            e = np.exp(raw)
+            return e / e.sum(axis=1, keepdims=True)
+        p = 1.0 / (1.0 + np.exp(-raw[:, 0]))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def compile_model(model):
+    """Compiled counterpart of a fitted RandomForest/ExtraTrees or CatBoost classifier"""
+    if isinstance(model, (CompiledForest, CompiledObliviousEnsemble)):
+        return model
+    if hasattr(model, 'estimators_') and all(hasattr(e, 'tree_') for e in getattr(model, 'estimators_', [])):
+        return CompiledForest.from_sklearn(model)
+    if type(model).__module__.startswith('catboost'):
+        return CompiledObliviousEnsemble.from_catboost(model)
+    raise TypeError(f"Don't know how to compile {type(model).__name__}")
+
+
+def max_abs_difference(model, compiled, X) -> float:
+    return float(np.max(np.abs(np.asarray(model.predict_proba(X)) - compiled.predict_proba(X))))
+
+
+def _latencies(fn, rows, repeats: int) -> np.ndarray:
+    times = []
+    for i in range(repeats):
+        row = rows[i % len(rows)]
+        start = time.perf_counter()
+        fn(row)
+        times.append(time.perf_counter() - start)
+    return np.array(times) * 1000.0
+
+
+def benchmark(model, compiled, X: pd.DataFrame, repeats: int = 200) -> pd.DataFrame:
+    """Single-row p50/p99 latency and batch throughput, original vs compiled"""
+    rows_df = [X.iloc[[i]] for i in range(min(len(X), 50))]
+    rows_np = [r.to_numpy() for r in rows_df]
+    table = []
+    for name, fn, rows, full in (
+        ('original', model.predict_proba, rows_df, X),
+        ('compiled', compiled.predict_proba, rows_np, X.to_numpy()),
+    ):
+        fn(rows[0])  # warm-up
+        lat = _latencies(fn, rows, repeats)
+        start = time.perf_counter()
+        fn(full)
+        batch_s = time.perf_counter() - start
+        table.append({
+            'model': name,
+            'single_row_p50_ms': float(np.percentile(lat, 50)),
+            'single_row_p99_ms': float(np.percentile(lat, 99)),
+            'batch_rows': int(len(X)),
+            'batch_rows_per_s': float(len(X) / batch_s) if batch_s > 0 else float('inf'),
+        })
+    return pd.DataFrame(table).set_index('model')
+
+
+def main(argv=None):
+    """Compile a model pickle and report agreement and latency against the original"""
+    parser = argparse.ArgumentParser(description="Compile a tree-ensemble model into NumPy node tables")
+    parser.add_argument('model', help="Pickled RandomForest or CatBoost model")
+    parser.add_argument('-o', '--output', default=None, help="Where to save the compiled model (default: <model>.compiled.pkl)")
+    parser.add_argument('--data', default=str(Path('data') / 'processed' / 'X_valid.csv'), help="Rows used for the agreement check and benchmark")
+    parser.add_argument('--benchmark', action='store_true', help="Print a latency comparison")
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    model = joblib.load(args.model)
+    start = time.perf_counter()
+    compiled = compile_model(model)
+    compile_s = time.perf_counter() - start
+    out = Path(args.output) if args.output else Path(args.model).with_suffix('.compiled.pkl')
+    joblib.dump(compiled, out)
+    print(f"✅ Compiled {type(model).__name__} in {compile_s:.2f}s → {out}")
+
+    if Path(args.data).exists():
+        X = pd.read_csv(args.data).reindex(columns=compiled.feature_names_, fill_value=0)
+        diff = max_abs_difference(model, compiled, X)
+        agree = float((np.asarray(model.predict_proba(X)).argmax(1) == compiled.predict_proba(X).argmax(1)).mean())
+        print(f"🔍 Max |Δ probability| on {len(X):,} rows: {diff:.2e} • label agreement {agree:.2%}")
+        if diff > 1e-6:
+            print("❌ Compiled model does not match the original")
+            sys.exit(1)
+        if args.benchmark:
+            print(benchmark(model, compiled, X, repeats=args.repeats).round(4).to_string())
+
+
+if __name__ == "__main__":
+    # Run from the importable module so pickled objects don't reference __main__
+    try:
+        from src.tree_compiler import main as _main
+    except ImportError:
+        from tree_compiler import main as _main
+    _main()
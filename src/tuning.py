@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Time-budgeted hyperparameter search with successive halving (Hyperband).
+
+model_training.ipynb fixes one configuration per family. Searching a grid with
+5-fold CV at full size costs minutes per point, so the search here spends most of
+its budget on cheap evaluations: the number of trees (n_estimators / iterations) is
+the resource, and each Hyperband bracket samples configurations across the four
+families, scores them with `cv`-fold log-loss at a fraction of the trees, and
+promotes the best 1/eta to eta× more trees until the notebook's tree count is
+reached. Accuracy is reported but not optimised: nearly every configuration scores
+≈1.0 on this data, while log-loss still separates them.
+
+Trials run on a process pool, one core each. Within a rung a trial also stops
+early, after any fold whose running loss is already worse than every trial that
+would be promoted. The budget is a hard wall-clock limit: when it expires the pool
+is terminated, in-flight trials are discarded and the best configuration of each
+family that completed a trial at its full notebook tree count is kept (families
+that only finished lower rungs are reported and left out). Those are then trained once more with the training
+scheduler (full fit + 5-fold CV, outside the budget) and written in the
+training_results.json format, with the parameters in best_params.json for
+`python -m src.pipeline --model-params models/tuning/best_params.json`.
+
+    python -m src.tuning --budget 600
+    python -m src.tuning --budget 120 --models RandomForest LightGBM --workers 4
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import StratifiedKFold
+
+try:
+    from . import training
+    from .ensemble import log_loss
+    from .train_scheduler import TrainingScheduler
+except ImportError:
+    import training
+    from ensemble import log_loss
+    from train_scheduler import TrainingScheduler
+
+SEED = training.SEED
+TUNING_DIR = Path('models') / 'tuning'
+ETA = 3
+SEARCH_CV = 3
+# Smallest tree count tried, as a fraction of the notebook's (1/9 with eta=3: 33 → 100 → 300 trees)
+MIN_RESOURCE_FRACTION = 1 / 9
+
+RESOURCE_PARAM = {'XGBoost': 'n_estimators', 'LightGBM': 'n_estimators', 'CatBoost': 'iterations',
+                  'RandomForest': 'n_estimators'}
+# ('int' | 'float' | 'log', low, high) or ('choice', options); unlisted parameters keep the notebook value
+SEARCH_SPACES = {
+    'XGBoost': {'max_depth': ('int', 3, 10), 'learning_rate': ('log', 0.03, 0.3), 'subsample': ('float', 0.6, 1.0),
+                'colsample_bytree': ('float', 0.5, 1.0), 'min_child_weight': ('log', 1, 10)},
+    'LightGBM': {'num_leaves': ('int', 15, 63), 'max_depth': ('int', 4, 12), 'learning_rate': ('log', 0.03, 0.3),
+                 'feature_fraction': ('float', 0.5, 1.0), 'min_child_samples': ('int', 5, 40)},
+    'CatBoost': {'depth': ('int', 4, 8), 'learning_rate': ('log', 0.03, 0.3), 'l2_leaf_reg': ('log', 1, 10)},
+    'RandomForest': {'max_depth': ('choice', [None, 8, 12, 16, 24]), 'min_samples_split': ('int', 2, 10),
+                     'min_samples_leaf': ('int', 1, 4), 'max_features': ('choice', ['sqrt', 'log2', 0.3, 0.5])},
+}
+
+
+class BudgetExhausted(Exception):
+    pass
+
+
+def sample_params(name: str, rng: np.random.Generator) -> dict:
+    params = {}
+    for key, (kind, *spec) in SEARCH_SPACES[name].items():
+        if kind == 'int':
+            params[key] = int(rng.integers(spec[0], spec[1] + 1))
+        elif kind == 'float':
+            params[key] = round(float(rng.uniform(*spec)), 3)
+        elif kind == 'log':
+            params[key] = round(float(np.exp(rng.uniform(np.log(spec[0]), np.log(spec[1])))), 4)
+        else:
+            params[key] = spec[0][int(rng.integers(len(spec[0])))]
+    return params
+
+
+def max_resource(name: str) -> int:
+    return training.MODEL_PARAMS[name][RESOURCE_PARAM[name]]
+
+
+# ---------- Worker side ----------
+
+_WORKER = {}
+
+
+def _init_worker(X, y, cv: int, threads: int):
+    classes = np.unique(y)
+    _WORKER.update(X=X, y=y, threads=threads, classes=classes, y_index=np.searchsorted(classes, np.asarray(y)),
+                   folds=list(StratifiedKFold(cv, shuffle=True, random_state=SEED).split(X, y)))
+
+
+def _evaluate(name: str, params: dict, stop_above: float | None) -> dict:
+    """cv-fold log-loss / accuracy of one configuration; gives up after a fold once it cannot be promoted"""
+    X, y, classes, y_index = _WORKER['X'], _WORKER['y'], _WORKER['classes'], _WORKER['y_index']
+    start = time.perf_counter()
+    losses, accs = [], []
+    for fit_idx, score_idx in _WORKER['folds']:
+        model = training.build_model(name, params, n_jobs=_WORKER['threads'])
+        model.fit(X.iloc[fit_idx], y.iloc[fit_idx])
+        proba = np.zeros((len(score_idx), len(classes)))
+        proba[:, np.searchsorted(classes, np.asarray(model.classes_).ravel())] = model.predict_proba(X.iloc[score_idx])
+        losses.append(log_loss(proba, y_index[score_idx]))
+        accs.append(float((proba.argmax(axis=1) == y_index[score_idx]).mean()))
+        if stop_above is not None and np.mean(losses) > stop_above and len(losses) < len(_WORKER['folds']):
+            break
+    return {'log_loss': float(np.mean(losses)), 'accuracy': float(np.mean(accs)), 'folds': len(losses),
+            'stopped': len(losses) < len(_WORKER['folds']), 'seconds': time.perf_counter() - start}
+
+
+# ---------- Search ----------
+
+class HyperbandSearch:
+    def __init__(self, models, budget: float, workers: int | None = None, cores: int | None = None,
+                 cv: int = SEARCH_CV, eta: int = ETA, min_fraction: float = MIN_RESOURCE_FRACTION,
+                 seed: int = SEED, verbose: bool = True):
+        self.models = list(models)
+        self.budget = float(budget)
+        self.cores = max(1, int(cores or os.cpu_count() or 1))
+        self.workers = max(1, min(int(workers or self.cores), self.cores))
+        self.cv = cv
+        self.eta = eta
+        self.s_max = int(math.floor(math.log(1 / min_fraction, eta) + 1e-9))
+        self.rng = np.random.default_rng(seed)
+        self.verbose = verbose
+        self.trials = []
+        self._defaults_pending = list(self.models)
+
+    def _configs(self, n: int) -> list[tuple[str, dict]]:
+        # The notebook's configuration of each family goes into the first bracket
+        configs = []
+        while self._defaults_pending and len(configs) < n:
+            configs.append((self._defaults_pending.pop(0), {}))
+        while len(configs) < n:
+            name = self.models[int(self.rng.integers(len(self.models)))]
+            configs.append((name, sample_params(name, self.rng)))
+        return configs
+
+    def _run_rung(self, pool, configs, fraction: float, keep: int, bracket: int, rung: int, deadline: float) -> list[dict]:
+        """Evaluate configs at `fraction` of the trees, at most `workers` in flight; returns the finished trials"""
+        queue = list(configs)
+        running, finished = [], []
+        while queue or running:
+            while queue and len(running) < self.workers:
+                name, params = queue.pop(0)
+                trial = {'model': name, 'params': params, 'bracket': bracket, 'rung': rung,
+                         'resource': max(1, int(round(max_resource(name) * fraction)))}
+                full = {**params, RESOURCE_PARAM[name]: trial['resource']}
+                complete = sorted(t['log_loss'] for t in finished if not t['stopped'])
+                # Stop a trial once it is worse than every config currently in line for promotion
+                cutoff = complete[keep - 1] if keep and len(complete) >= keep else None
+                running.append((trial, pool.apply_async(_evaluate, (name, full, cutoff))))
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise BudgetExhausted
+            for item in list(running):
+                trial, result = item
+                result.wait(min(0.05, remaining))
+                if result.ready():
+                    running.remove(item)
+                    trial.update(result.get())
+                    finished.append(trial)
+                    self.trials.append(trial)
+        return finished
+
+    def run(self, X: pd.DataFrame, y: pd.Series) -> list[dict]:
+        deadline = time.perf_counter() + self.budget
+        threads = max(1, self.cores // self.workers)
+        pool = multiprocessing.get_context().Pool(self.workers, initializer=_init_worker,
+                                                  initargs=(X, y, self.cv, threads))
+        bracket = 0
+        try:
+            while time.perf_counter() < deadline:
+                for s in range(self.s_max, -1, -1):
+                    n = int(math.ceil((self.s_max + 1) / (s + 1) * self.eta ** s))
+                    configs = self._configs(n)
+                    for i in range(s + 1):
+                        keep = int(n * self.eta ** -(i + 1)) if i < s else 0
+                        finished = self._run_rung(pool, configs, self.eta ** (i - s), keep, bracket, i, deadline)
+                        if self.verbose:
+                            best = min(finished, key=lambda t: t['log_loss'])
+                            print(f"   bracket {bracket} rung {i}: {len(finished)} configs at "
+                                  f"{self.eta ** (i - s):.0%} trees • best {best['model']} {best['log_loss']:.4f} "
+                                  f"• {self.budget - (deadline - time.perf_counter()):.0f}s used")
+                        if not keep:
+                            break
+                        ranked = sorted((t for t in finished if not t['stopped']), key=lambda t: t['log_loss'])
+                        configs = [(t['model'], t['params']) for t in ranked[:keep]]
+                        if not configs:
+                            break
+                    bracket += 1
+        except BudgetExhausted:
+            if self.verbose:
+                print(f"   ⏱️ Budget of {self.budget:.0f}s reached; in-flight trials discarded")
+        finally:
+            pool.terminate()
+            pool.join()
+        return self.trials
+
+    def best_trials(self) -> dict:
+        """{family: best completed trial}, preferring the most trees, then the lowest log-loss"""
+        best = {}
+        for t in self.trials:
+            if t['stopped']:
+                continue
+            current = best.get(t['model'])
+            if current is None or (t['resource'], -t['log_loss']) > (current['resource'], -current['log_loss']):
+                best[t['model']] = t
+        return best
+
+    def best_params(self) -> dict:
+        """{family: params} of each family whose best trial ran at the full notebook tree count.
+
+        A family that only finished low rungs is left out rather than emitted with a fraction of its trees;
+        the pipeline then trains it with the notebook parameters.
+        """
+        return {name: {**t['params'], RESOURCE_PARAM[name]: t['resource']}
+                for name, t in self.best_trials().items() if t['resource'] >= max_resource(name)}
+
+
+def trials_frame(trials: list[dict]) -> pd.DataFrame:
+    return pd.DataFrame([{**{k: v for k, v in t.items() if k != 'params'}, 'params': json.dumps(t['params'])}
+                         for t in trials])
+
+
+def main(argv=None):
+    """Hyperband search over the model families under a wall-clock budget"""
+    parser = argparse.ArgumentParser(description="Time-budgeted successive-halving hyperparameter search")
+    parser.add_argument('--base-dir', default='.')
+    parser.add_argument('--budget', type=float, default=600, help="Hard wall-clock limit for the search, in seconds")
+    parser.add_argument('--models', nargs='+', default=list(training.MODEL_PARAMS), choices=list(training.MODEL_PARAMS))
+    parser.add_argument('--workers', type=int, default=None, help="Parallel trials (default: one per core)")
+    parser.add_argument('--cv', type=int, default=SEARCH_CV, help="Folds per trial")
+    parser.add_argument('--eta', type=int, default=ETA, help="Keep 1/eta of the configs per rung")
+    parser.add_argument('--out-dir', default=str(TUNING_DIR))
+    parser.add_argument('--no-final', action='store_true', help="Skip the final full-CV training of the winners")
+    args = parser.parse_args(argv)
+
+    try:
+        from .pipeline import load_training_frames
+    except ImportError:
+        from pipeline import load_training_frames
+    base_dir = Path(args.base_dir)
+    try:
+        X_train, y_train, X_valid, y_valid = load_training_frames(base_dir)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    search = HyperbandSearch(args.models, args.budget, args.workers, cv=args.cv, eta=args.eta)
+    print(f"🔎 Hyperband over {', '.join(args.models)} • {args.budget:.0f}s budget • {search.workers} workers • "
+          f"{args.cv}-fold log-loss • eta={args.eta}")
+    start = time.perf_counter()
+    trials = search.run(X_train, y_train)
+    print(f"⏱️ Search: {time.perf_counter() - start:.1f}s wall • {len(trials)} trials "
+          f"({sum(t['stopped'] for t in trials)} stopped early)")
+    best = search.best_params()
+    partial = {name: t['resource'] for name, t in search.best_trials().items() if name not in best}
+    for name, resource in partial.items():
+        print(f"⚠️ {name} left out of best_params.json: its best trial reached {resource} of "
+              f"{max_resource(name)} {RESOURCE_PARAM[name]}; raise --budget to tune it")
+    if not best:
+        print("❌ No trial reached the full tree count within the budget; raise --budget")
+        sys.exit(1)
+
+    out_dir = base_dir / args.out_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+    trials_frame(trials).to_csv(out_dir / 'trials.csv', index=False)
+    (out_dir / 'best_params.json').write_text(json.dumps(best, indent=2), encoding='utf-8')
+    for name, params in best.items():
+        print(f"🏆 {name:<13} {json.dumps(params)}")
+    if args.no_final:
+        return
+
+    print(f"🚀 Final fit + {training.CV_FOLDS}-fold CV of the best configurations")
+    trained = TrainingScheduler(cv=training.CV_FOLDS).run(best, X_train, y_train, X_valid, y_valid)
+    (out_dir / 'training_results.json').write_text(json.dumps(training.training_summary(trained), indent=2),
+                                                   encoding='utf-8')
+    print(f"💾 {out_dir.as_posix()}/training_results.json, best_params.json, trials.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Eager warm-up for the Streamlit server.
+
+`@st.cache_resource` loaders run lazily, so without warm-up the first visitor after a
+deploy or restart pays for unpickling, the data loads and the first predict_proba.
+This launcher starts the Streamlit server and, as soon as its runtime exists, fills
+the same caches the pages use from a background thread, runs a dummy prediction
+through both the original and the compiled model, and then writes a readiness file.
+The Docker HEALTHCHECK tests that file, so the container reports healthy only once
+the model has actually answered.
+
+    python -m src.warmup app.py --server.port=8501 --server.headless=true
+    python -m src.warmup --check                     # exit 0 once warm-up has finished
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+READY_FILE = Path(os.environ.get('WARMUP_READY_FILE', Path(tempfile.gettempdir()) / 'disease-predictor.ready'))
+RUNTIME_WAIT_SECONDS = 120.0
+
+
+def clear_ready(path=READY_FILE):
+    Path(path).unlink(missing_ok=True)
+
+
+def mark_ready(report: dict, path=READY_FILE) -> Path:
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    tmp.replace(path)
+    return path
+
+
+def is_ready(path=READY_FILE) -> bool:
+    return Path(path).exists()
+
+
+def warm_up() -> dict:
+    """Fill every page's cached loaders and run one prediction; returns per-stage seconds"""
+    try:
+        from src import shared
+        from src.inference import predict_batch, predict_one
+    except ImportError:
+        import shared
+        from inference import predict_batch, predict_one
+    import pandas as pd
+
+    timings = {}
+
+    def stage(name, fn, *args):
+        start = time.perf_counter()
+        with shared.span(f'warmup.{name}'):
+            result = fn(*args)
+        timings[name] = time.perf_counter() - start
+        return result
+
+    artifacts = stage('load_artifacts', shared.load_artifacts)
+    model, features, label_encoder = artifacts["model"], artifacts["features"], artifacts["label_encoder"]
+    if model is None or not features:
+        raise RuntimeError("model or feature list missing")
+    # First inference allocates buffers and initializes the model library's native code
+    empty = pd.DataFrame([[0] * len(features)], columns=features)
+    stage('first_predict_proba', predict_batch, model, empty, label_encoder)
+    if artifacts.get("fast_model") is not None:
+        stage('first_predict_compiled', predict_one, artifacts["fast_model"], {}, features, label_encoder)
+    stage('load_training_data', shared.load_training_data, features)
+    stage('load_symptom_matrix', shared.load_symptom_matrix, features)
+    stage('load_pattern_index', shared.load_pattern_index, features)
+    stage('load_similar_case_index', shared.load_similar_case_index, features)
+    stage('load_analytics_summary', shared.load_analytics_summary, features)
+    stage('load_prediction_cache', shared.load_prediction_cache)
+    stage('load_serving_model', shared.load_serving_model)
+    stage('load_inference_pool', shared.load_inference_pool)
+    return timings
+
+
+def _wait_for_runtime(timeout: float = RUNTIME_WAIT_SECONDS) -> bool:
+    # st.cache_data only shares entries with the server once its runtime exists
+    from streamlit.runtime import Runtime
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if Runtime.exists():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def _background_warm_up(path=READY_FILE):
+    if not _wait_for_runtime():
+        print("⚠️ Warm-up skipped: Streamlit runtime did not start", flush=True)
+        return
+    start = time.perf_counter()
+    try:
+        timings = warm_up()
+    except Exception as e:
+        print(f"❌ Warm-up failed: {e}", flush=True)
+        return
+    total = time.perf_counter() - start
+    mark_ready({'ready_at': time.time(), 'warmup_seconds': total, 'stages': timings}, path)
+    print(f"✅ Warm-up finished in {total:.2f}s → {path}", flush=True)
+
+
+def main(argv=None):
+    """Start the Streamlit server with eager warm-up, or check readiness"""
+    parser = argparse.ArgumentParser(description="Run the Streamlit app with eager model warm-up")
+    parser.add_argument('script', nargs='?', default='app.py', help="Streamlit entry point")
+    parser.add_argument('--check', action='store_true', help="Exit 0 if warm-up has finished, 1 otherwise")
+    args, streamlit_args = parser.parse_known_args(argv)
+
+    if args.check:
+        sys.exit(0 if is_ready() else 1)
+
+    clear_ready()
+    threading.Thread(target=_background_warm_up, name='warmup', daemon=True).start()
+    from streamlit.web import cli as stcli
+    sys.argv = ['streamlit', 'run', args.script, *streamlit_args]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    main()
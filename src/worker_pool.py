@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Process-pool inference backend.
+
+Scoring runs in a pool of worker processes instead of the Streamlit script thread,
+so CPU-heavy predictions from many sessions do not hold the GIL that page rendering
+needs. Workers are started with `forkserver` (or `spawn` where that is unavailable)
+and each receives a pickled copy of the model: the Streamlit server already runs
+Tornado and other threads, which a plain fork would copy mid-flight. Scripts that
+create the pool before starting any threads can set INFERENCE_START_METHOD=fork to
+share the model copy-on-write instead; gc.freeze() is then held only while the
+workers are forked. A pool whose worker died (BrokenProcessPool) is replaced on
+the next request.
+
+The pool quacks like a fitted model (`predict_proba`, `classes_`), so it can be
+passed straight to inference.predict_one / predict_batch.
+
+    INFERENCE_WORKERS=4 streamlit run app.py             # Predictor scores through the pool
+    python -m src.worker_pool --model models/model_randomforest.pkl --workers 1 2 4
+"""
+
+import argparse
+import gc
+import multiprocessing as mp
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+try:
+    from .inference import model_input
+except ImportError:
+    from inference import model_input
+
+DEFAULT_TIMEOUT_SECONDS = 30.0
+
+# Set in each worker by _init_worker
+_worker_model = None
+_worker_features = None
+
+
+def _init_worker(model, features):
+    global _worker_model, _worker_features
+    _worker_model = model
+    _worker_features = features
+
+
+def _worker_predict_proba(X: np.ndarray) -> np.ndarray:
+    return np.asarray(_worker_model.predict_proba(model_input(_worker_model, X, _worker_features)))
+
+
+def default_start_method() -> str:
+    return os.environ.get('INFERENCE_START_METHOD') or (
+        'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn')
+
+
+class InferencePool:
+    accepts_arrays = True
+
+    def __init__(self, model, features: list[str], n_workers: int | None = None,
+                 start_method: str | None = None, timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        self.classes_ = np.asarray(getattr(model, 'classes_', []))
+        self.feature_names_ = list(features)
+        self.n_features_in_ = len(self.feature_names_)
+        self.n_workers = max(1, int(n_workers or os.cpu_count() or 1))
+        self.start_method = start_method or default_start_method()
+        self.timeout = timeout
+        self._model = model
+        self._lock = threading.Lock()
+        self.restarts = 0
+        self._executor = self._start()
+
+    def _start(self) -> ProcessPoolExecutor:
+        executor = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=mp.get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(self._model, self.feature_names_),
+        )
+        if self.start_method != 'fork':
+            return executor
+        # Objects that already exist are moved out of the collector's reach, so scans in the
+        # workers don't write to (and thereby un-share) the inherited model pages. A fork pool
+        # forks every worker on its first submission; the parent's objects are released after.
+        gc.collect()
+        gc.freeze()
+        try:
+            executor.submit(int).result(timeout=self.timeout)
+        finally:
+            gc.unfreeze()
+        return executor
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            # Several sessions may see the same broken pool; only the first replaces it
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._start()
+                self.restarts += 1
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        executor = self._executor
+        try:
+            return executor.submit(_worker_predict_proba, X).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            # A worker died (OOM kill, segfault); retry once on a fresh pool
+            self._restart(executor)
+            return self._executor.submit(_worker_predict_proba, X).result(timeout=self.timeout)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def warm_up(self):
+        """Start every worker and run one prediction in each"""
+        zeros = np.zeros((1, self.n_features_in_))
+        for f in [self._executor.submit(_worker_predict_proba, zeros) for _ in range(self.n_workers)]:
+            f.result(timeout=self.timeout)
+        return self
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def pool_size_from_env() -> int:
+    """INFERENCE_WORKERS: 0/unset keeps scoring in-process, 'auto' uses every core"""
+    value = os.environ.get('INFERENCE_WORKERS', '').strip().lower()
+    if value == 'auto':
+        return os.cpu_count() or 1
+    try:
+        return max(0, int(value or 0))
+    except ValueError:
+        return 0
+
+
+# ---------- Benchmark ----------
+
+def _ui_probe(stop: threading.Event, samples: list, work: int = 20_000, interval: float = 0.01):
+    # Stand-in for page rendering: a fixed amount of pure-Python work, timed repeatedly
+    while not stop.is_set():
+        start = time.perf_counter()
+        sum(i * i for i in range(work))
+        samples.append(time.perf_counter() - start)
+        time.sleep(interval)
+
+
+def benchmark(model, features: list[str], rows: np.ndarray, workers=(1, 2, 4), concurrency: int = 8) -> list[dict]:
+    """Throughput of single-row scoring and latency of concurrent UI work, in-process vs pool"""
+    backends = [('in-process', 0, model)]
+    for n in workers:
+        backends.append((f'pool x{n}', n, None))
+    results = []
+    for name, n, backend in backends:
+        pool = None
+        if backend is None:
+            pool = backend = InferencePool(model, features, n).warm_up()
+
+        def one(i):
+            backend.predict_proba(model_input(backend, rows[i % len(rows)].reshape(1, -1), features))
+
+        idle = []
+        stop = threading.Event()
+        probe = threading.Thread(target=_ui_probe, args=(stop, idle))
+        probe.start(); time.sleep(0.5); stop.set(); probe.join()
+
+        loaded = []
+        stop = threading.Event()
+        probe = threading.Thread(target=_ui_probe, args=(stop, loaded))
+        probe.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as ex:
+            list(ex.map(one, range(len(rows))))
+        seconds = time.perf_counter() - start
+        stop.set(); probe.join()
+        if pool is not None:
+            pool.shutdown()
+        results.append({
+            'backend': name,
+            'predictions_per_s': len(rows) / seconds,
+            'ui_idle_p50_ms': float(np.percentile(idle, 50) * 1000),
+            'ui_loaded_p50_ms': float(np.percentile(loaded, 50) * 1000),
+            'ui_loaded_p99_ms': float(np.percentile(loaded, 99) * 1000),
+        })
+    return results
+
+
+def main(argv=None):
+    """Benchmark the process pool against in-process scoring"""
+    parser = argparse.ArgumentParser(description="Process-pool inference benchmark")
+    parser.add_argument('--model', default=None, help="Model pickle (default: champion)")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent sessions submitting predictions")
+    args = parser.parse_args(argv)
+
+    try:
+        from .shared import load_artifacts
+        from .inference import model_features
+    except ImportError:
+        from shared import load_artifacts
+        from inference import model_features
+    import joblib
+    if args.model:
+        model = joblib.load(args.model)
+        features = model_features(model)
+    else:
+        artifacts = load_artifacts()
+        model, features = artifacts["model"], artifacts["features"]
+    if model is None or not features:
+        print("❌ Model or features are missing. Ensure artifacts exist in models/ and data/processed/ folders.")
+        sys.exit(1)
+
+    rng = np.random.default_rng(0)
+    rows = (rng.random((args.requests, len(features))) < 0.05).astype(np.float64)
+    print(f"🧮 {os.cpu_count()} CPU(s) • start method {default_start_method()}")
+    for r in benchmark(model, features, rows, args.workers, args.concurrency):
+        print(f"{r['backend']:>11}: {r['predictions_per_s']:8,.0f} pred/s • UI task p50 {r['ui_idle_p50_ms']:.2f} ms idle, "
+              f"{r['ui_loaded_p50_ms']:.2f} ms / p99 {r['ui_loaded_p99_ms']:.2f} ms under load")
+
+
+if __name__ == "__main__":
+    # Run from the importable module so workers can unpickle references to it
+    try:
+        from src.worker_pool import main as _main
+    except ImportError:
+        from worker_pool import main as _main
+    _main()